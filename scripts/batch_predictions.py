@@ -0,0 +1,33 @@
+# batch_predictions.py
+# Scores every property of a large input file with the trained pipeline.
+
+import os
+import sys
+
+import click
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.batch_scoring import score_file
+from src.instrumentation import configure_metrics, instrumented
+
+
+@click.command()
+@click.option('--model-file', type=str, help="Path to the trained model file (pickle format)", required=True)
+@click.option('--input', 'input_path', type=str, help="Path to the properties to score (.csv, .feather or .parquet)", required=True)
+@click.option('--output-file', type=str, help="Path to save the predictions CSV file", required=True)
+@click.option('--chunksize', type=int, default=100_000, help="Number of rows scored per chunk")
+@click.option('--n-jobs', type=int, default=None, help="Number of worker processes (defaults to every core)")
+@instrumented('score')
+def main(model_file, input_path, output_file, chunksize, n_jobs):
+    """
+    Scores a large file of properties in chunks across worker processes and
+    writes the predictions in input order.
+    """
+    configure_metrics()
+    stats = score_file(model_file, input_path, output_file, chunksize=chunksize, n_jobs=n_jobs)
+    print(f"✅ Scored {stats['rows']} properties in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,.0f} rows/sec). Predictions saved to {output_file}")
+
+
+if __name__ == '__main__':
+    main()
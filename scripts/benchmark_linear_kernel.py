@@ -0,0 +1,62 @@
+# benchmark_linear_kernel.py
+# Compares the compiled linear kernel against pipeline.predict on the processed data.
+
+import os
+import pickle
+import sys
+import time
+
+import click
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.io_utils import read_processed
+from src.linear_kernel import compile_pipeline
+from src.instrumentation import configure_metrics, instrumented
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@click.command()
+@click.option('--model-file', type=str, default="results/models/ridge_pipeline.pickle", help="Path to the trained model file (pickle format)")
+@click.option('--data', type=str, default="data/processed/Clean_2023_Property_Tax_Assessment.csv", help="Path to processed data to score")
+@click.option('--repeat', type=int, default=20, help="Number of timed repetitions per batch size (best is reported)")
+@instrumented('benchmark_linear_kernel')
+def main(model_file, data, repeat):
+    """
+    Times pipeline.predict and the compiled kernel at several batch sizes and
+    checks that their predictions agree.
+    """
+    configure_metrics()
+    with open(model_file, 'rb') as f:
+        pipeline = pickle.load(f)
+    kernel = compile_pipeline(pipeline)
+    X = read_processed(data).drop(columns=["assess_2022"])
+
+    max_difference = np.abs(pipeline.predict(X) - kernel.predict(X)).max()
+    print(f"Max absolute difference over {len(X)} rows: {max_difference:.3g}")
+
+    rows = []
+    for batch_size in (1, 100, 10_000, len(X)):
+        batch = X.head(batch_size)
+        pipeline_time = best_time(lambda: pipeline.predict(batch), repeat)
+        kernel_time = best_time(lambda: kernel.predict(batch), repeat)
+        rows.append({
+            'batch_size': batch_size,
+            'pipeline_ms': round(pipeline_time * 1000, 3),
+            'kernel_ms': round(kernel_time * 1000, 3),
+            'speedup': round(pipeline_time / kernel_time, 1),
+        })
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
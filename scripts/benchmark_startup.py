@@ -0,0 +1,95 @@
+# benchmark_startup.py
+# Measures start-up and import time of each `housing` subcommand.
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(SCRIPTS_DIR)
+sys.path.append(SCRIPTS_DIR)
+sys.path.append(ROOT)
+from housing import SUBCOMMANDS
+from src.instrumentation import configure_metrics, instrumented
+
+HEAVY_PACKAGES = ['pandas', 'numpy', 'sklearn', 'scipy', 'altair', 'altair_ally', 'pyarrow']
+
+# "import time: self [us] | cumulative | imported package"
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def wall_time(args, repeat):
+    """
+    Returns the median wall time in milliseconds of running `python args`.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def import_times(args):
+    """
+    Returns the total import time and the cumulative import time of each heavy package, in milliseconds.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    total, packages = 0, {}
+    for match in IMPORT_LINE.finditer(result.stderr):
+        cumulative, indent, name = int(match.group(1)), len(match.group(2)), match.group(3)
+        if indent == 1:
+            total += cumulative
+            if name in HEAVY_PACKAGES:
+                packages[name] = round(cumulative / 1000, 1)
+        elif name in HEAVY_PACKAGES and name not in packages:
+            packages[name] = round(cumulative / 1000, 1)
+    return round(total / 1000, 1), packages
+
+
+@click.command()
+@click.option('--repeat', type=int, default=5, help="Number of runs per command (the median is reported)")
+@click.option('--model-file', type=str, default="results/models/ridge_pipeline.json", help="Model used to time scoring the ten example houses")
+@click.option('--results-to', type=str, default=None, help="Optional JSON file to save the measurements to")
+@instrumented('benchmark_startup')
+def main(repeat, model_file, results_to):
+    """
+    Times `housing <subcommand> --help`, which imports exactly what the
+    subcommand needs, against a bare interpreter, and times scoring the ten
+    example houses end to end.
+    """
+    configure_metrics()
+    housing = os.path.join("scripts", "housing.py")
+    cases = {'python (no imports)': ['-c', 'pass'], 'housing --help': [housing, '--help']}
+    cases.update({f"housing {name} --help": [housing, name, '--help'] for name in SUBCOMMANDS})
+    cases['housing predict (10 houses)'] = [housing, 'predict', '--model-file', model_file,
+                                            '--output-file', os.path.join("results", "tables", "startup_benchmark_predictions.csv")]
+
+    rows = []
+    for label, args in cases.items():
+        total_import, packages = import_times(args)
+        rows.append({'command': label, 'wall_ms': round(wall_time(args, repeat), 1),
+                     'import_ms': total_import, 'heavy_imports': ", ".join(sorted(packages)) or "-"})
+    os.remove(os.path.join(ROOT, "results", "tables", "startup_benchmark_predictions.csv"))
+
+    width = max(len(row['command']) for row in rows)
+    print(f"{'command':<{width}}  {'wall_ms':>8}  {'import_ms':>9}  heavy_imports")
+    for row in rows:
+        print(f"{row['command']:<{width}}  {row['wall_ms']:>8}  {row['import_ms']:>9}  {row['heavy_imports']}")
+
+    if results_to:
+        with open(results_to, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'repeat': repeat, 'results': rows}, f, indent=2)
+        print(f"✅ Results saved to {results_to}")
+
+
+if __name__ == '__main__':
+    main()
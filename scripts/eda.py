@@ -1,102 +1,73 @@
 # eda.py
 import click
 import os
-import pandas as pd
-import altair as alt
-import altair_ally as aly
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.eda_utils import create_combined_bar_chart
+from src.eda_utils import (create_categorical_density_chart, create_categorical_scatter_chart,
+                           create_combined_bar_chart, create_correlation_chart, create_distribution_chart)
+from src.chart_export import export_charts
+from src.io_utils import read_processed
+from src.instrumentation import configure_metrics, instrumented
 
 @click.command()
 @click.option('--processed-data', type=str, help="Path to processed data file")
 @click.option('--plot-to', type=str, help="Path to directory where the plots will be saved")
-def main(processed_data, plot_to):
+@click.option('--scatter-mode', type=click.Choice(['auto', 'points', 'density']), default='auto',
+              help="Draw scatter plots point by point or as density grids; 'auto' uses grids above 5000 rows")
+@click.option('--n-jobs', type=int, default=None, help="Number of processes exporting charts (defaults to one per chart)")
+@instrumented('eda')
+def main(processed_data, plot_to, scatter_mode, n_jobs):
     """
     Creates bar charts, scatter plots, and distribution plots for categorical features 
     and saves the combined plots as separate files.
+
+    Counts, histogram bins, KDE curves and correlations are aggregated in
+    pandas/NumPy first, so the charts embed small tables instead of every row.
+    The charts are then exported to PNG concurrently.
     """
+    configure_metrics()
     # Load the processed data
-    housing_df = pd.read_csv(processed_data)
+    housing_df = read_processed(processed_data)
+    density = scatter_mode == 'density' or (scatter_mode == 'auto' and len(housing_df) > 5000)
     
-    # Create and save the combined bar chart for categorical features
+    # Create the combined bar chart for categorical features
     bar_chart_combined = create_combined_bar_chart(
         df=housing_df,
         chart_title="Counts of Categorical Features"
     )
     bar_chart_file = os.path.join(plot_to, "categorical_features_counts.png")
-    bar_chart_combined.save(bar_chart_file, scale_factor=2.0)
 
     # Create scatter plots for house value assessment per categorical feature
-    grg = alt.Chart(housing_df).mark_point().encode(
-        x=alt.X('garage', title='Garage'),
-        y=alt.Y('assess_2022', title='House value'),
-    )
-
-    frp = alt.Chart(housing_df).mark_point().encode(
-        x=alt.X('firepl', title='Fireplace'),
-        y=alt.Y('assess_2022', title='House value'),
-    )
-
-    bst = alt.Chart(housing_df).mark_point().encode(
-        x=alt.X('bsmt', title='Basement'),
-        y=alt.Y('assess_2022', title='House value'),
-    )
-
-    bdl = alt.Chart(housing_df).mark_point().encode(
-        x=alt.X('bdevl', title='Building evaluation'),
-        y=alt.Y('assess_2022', title='House value'),
-    )
-
-    scatter_chart_combined = (grg | frp | bst | bdl).properties(
-        title="House Value Assessment per Categorical Feature"
+    scatter_chart = create_categorical_density_chart if density else create_categorical_scatter_chart
+    scatter_chart_combined = scatter_chart(
+        housing_df,
+        chart_title="House Value Assessment per Categorical Feature"
     )
     scatter_chart_file = os.path.join(plot_to, "categorical_features_scatter.png")
-    scatter_chart_combined.save(scatter_chart_file, scale_factor=2.0)
 
-    # Create a scatter plot for property size vs. assessment values
-    scatter = alt.Chart(housing_df).mark_point().encode(
-        y=alt.Y('meters', title="Property size (meters)"),
-        x=alt.X('assess_2022', title="Assessment Value"),
-        color=alt.Color('meters', title="Property size (meters)", scale=alt.Scale(scheme='viridis'))
-    ).properties(
-        title="Scatter Plot of Property Size and Assessment Values (2022)"
-    )
-
-    # Create a histogram and KDE plot for the 'assess_2022' column
-    histogram = alt.Chart(housing_df).mark_bar().encode(
-        alt.X("assess_2022:Q", bin=alt.Bin(maxbins=2000), title="Assessment Value").scale(domain=(0, 2000000), clamp=True),
-        alt.Y("count():Q", title="Frequency"),
-    ).properties(
-        title="Distribution of House Assessment Values (2022)"
-    )
-
-    kde = alt.Chart(housing_df).transform_density(
-        "assess_2022",
-        as_=["assess_2022", "density"], 
-        counts=True
-    ).mark_line(color="red").encode(
-        alt.X("assess_2022:Q", title="Assessment Value").scale(domain=(0, 2000000), clamp=True),
-        alt.Y("density:Q", title="Density")
-    ).properties(
-        title="Line Plot of KDE House Assessment Values (2022)"
-    )
-
-    # Combine the histogram, KDE plot, and scatter plot
-    combined_chart = histogram | kde | scatter
+    # Combine the histogram, KDE plot, and the property size vs. assessment value scatter plot
+    combined_chart = create_distribution_chart(housing_df, density=density)
     distribution_chart_file = os.path.join(plot_to, "distribution_charts.png")
-    combined_chart.save(distribution_chart_file, scale_factor=2.0)
 
     # Correlation chart
     df = housing_df.copy()
-    df['garage'] = df['garage'].map({'N': 0, 'Y': 1})
-    df['firepl'] = df['firepl'].map({'N': 0, 'Y': 1})
-    df['bsmt'] = df['bsmt'].map({'N': 0, 'Y': 1})
-    df['bdevl'] = df['bdevl'].map({'N': 0, 'Y': 1})
-    cor_chart = aly.corr(df)
+    df['garage'] = (df['garage'] == 'Y').astype(int)
+    df['firepl'] = (df['firepl'] == 'Y').astype(int)
+    df['bsmt'] = (df['bsmt'] == 'Y').astype(int)
+    df['bdevl'] = (df['bdevl'] == 'Y').astype(int)
+    cor_chart = create_correlation_chart(df)
     cor_chart_file = os.path.join(plot_to, "correlation_chart.png")
-    cor_chart.save(cor_chart_file, scale_factor=2.0)
+
+    # Export every chart in parallel
+    timings = export_charts({
+        bar_chart_file: bar_chart_combined,
+        scatter_chart_file: scatter_chart_combined,
+        distribution_chart_file: combined_chart,
+        cor_chart_file: cor_chart,
+    }, scale_factor=2.0, n_jobs=n_jobs)
+    for chart_file in (bar_chart_file, scatter_chart_file, distribution_chart_file, cor_chart_file):
+        print(f"✅ {os.path.basename(chart_file)} rendered in {timings[chart_file]:.2f}s")
+    print(f"✅ Charts exported in {timings['total_seconds']:.2f}s (specs built in {timings['spec_seconds']:.2f}s)")
 
 if __name__ == '__main__':
     main()
-
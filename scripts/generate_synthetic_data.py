@@ -0,0 +1,54 @@
+# Generate synthetic property data for scale testing
+
+# generate_synthetic_data.py
+
+import os
+import time
+import click
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.io_utils import read_processed
+from src.synthetic_data import SyntheticModel, fit_synthetic_model, write_synthetic_csv
+from src.instrumentation import configure_metrics, instrumented
+
+
+@click.command()
+@click.option('--fit-from', type=str, default="data/processed/Clean_2023_Property_Tax_Assessment.csv",
+              help="Cleaned data the generator is fitted to")
+@click.option('--model-from', type=str, default=None, help="Load a fitted generator (JSON) instead of fitting one")
+@click.option('--save-model-to', type=str, default=None, help="Save the fitted generator as JSON, to share without the data")
+@click.option('--write-to', type=str, help="Path of the synthetic CSV")
+@click.option('--n-rows', type=int, default=1_000_000, help="Number of rows to generate")
+@click.option('--chunksize', type=int, default=1_000_000, help="Rows generated and written at a time")
+@click.option('--seed', type=int, default=123, help="Random seed")
+@click.option('--duplicate-rate', type=float, default=0.0, help="Share of rows that duplicate another row")
+@click.option('--nan-rate', type=float, default=0.0, help="Share of missing cells in each column")
+@click.option('--outlier-rate', type=float, default=0.0, help="Share of rows with an extreme size or value")
+
+@instrumented('synth')
+def main(fit_from, model_from, save_model_to, write_to, n_rows, chunksize, seed, duplicate_rate, nan_rate, outlier_rate):
+    """Writes synthetic data with the schema of the raw data, e.g. to exercise the clean stage at scale
+    ----------------
+
+    Example: main(write_to="data/synthetic/housing_10M.csv", n_rows=10_000_000, duplicate_rate=0.01)
+    """
+    configure_metrics()
+    if model_from:
+        model = SyntheticModel.load(model_from)
+    else:
+        model = fit_synthetic_model(read_processed(fit_from))
+        print(f"✅ Generator fitted to {model.n_rows} rows of {fit_from}.")
+    if save_model_to:
+        model.save(save_model_to)
+        print(f"✅ Generator saved to {save_model_to}.")
+
+    if write_to:
+        start = time.perf_counter()
+        written = write_synthetic_csv(model, write_to, n_rows, chunksize=chunksize, seed=seed,
+                                      duplicate_rate=duplicate_rate, nan_rate=nan_rate, outlier_rate=outlier_rate)
+        print(f"✅ {written} synthetic rows written to {write_to} in {time.perf_counter() - start:.1f}s.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# housing.py
+# Single entry point for the analysis scripts. Each subcommand's script (and
+# with it pandas, sklearn or altair) is only imported when that subcommand runs.
+
+import importlib.util
+import os
+
+import click
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Subcommand name to (script file, one-line help)
+SUBCOMMANDS = {
+    'load': ("load_data.py", "Download the raw property assessment data."),
+    'clean': ("clean_data.py", "Validate, deduplicate and split the raw data."),
+    'preprocess': ("preprocess_data.py", "Fit and save the preprocessor."),
+    'fit': ("model_fitting.py", "Cross-validate and fit the Ridge pipeline."),
+    'search': ("search_models.py", "Search regressors and hyperparameters by successive halving."),
+    'update': ("update_model.py", "Update the saved Ridge pipeline with new training rows."),
+    'predict': ("predictions.py", "Predict the ten example houses."),
+    'eda': ("eda.py", "Save the exploratory data analysis charts."),
+    'score': ("batch_predictions.py", "Score a large file of properties in chunks."),
+    'serve': ("serve_predictions.py", "Serve valuations over HTTP."),
+    'pipeline': ("run_pipeline.py", "Run every stage, skipping unchanged ones."),
+    'synth': ("generate_synthetic_data.py", "Generate synthetic raw data for scale testing."),
+}
+
+
+def load_script_command(script):
+    """
+    Imports a script from the scripts directory and returns its click command.
+    """
+    path = os.path.join(SCRIPTS_DIR, script)
+    spec = importlib.util.spec_from_file_location(f"housing_{os.path.splitext(script)[0]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.main
+
+
+class LazyGroup(click.Group):
+    """
+    Click group whose subcommands are imported on first use.
+
+    Listing the subcommands (`housing --help`) only needs their names and
+    one-line help, so it imports nothing beyond click.
+    """
+
+    def list_commands(self, ctx):
+        return list(SUBCOMMANDS)
+
+    def get_command(self, ctx, name):
+        if name not in SUBCOMMANDS:
+            return None
+        script, short_help = SUBCOMMANDS[name]
+        return _LazyCommand(name, script, short_help)
+
+
+class _LazyCommand(click.Command):
+    """
+    Placeholder that imports the real command only when it is invoked.
+
+    Every argument, including --help, is passed through to the real command.
+    """
+
+    def __init__(self, name, script, short_help):
+        super().__init__(name, short_help=short_help, add_help_option=False,
+                         context_settings={'ignore_unknown_options': True, 'allow_extra_args': True})
+        self.script = script
+
+    def invoke(self, ctx):
+        command = load_script_command(self.script)
+        return command.main(ctx.args, prog_name=ctx.command_path, standalone_mode=False)
+
+
+@click.group(cls=LazyGroup)
+def housing():
+    """
+    Strathcona house value predictor.
+    """
+
+
+if __name__ == '__main__':
+    housing()
@@ -10,14 +10,23 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.load_data_util import load_csv
+from src.instrumentation import configure_metrics, instrumented
 
 @click.command()
 @click.option('--url', type=str, help="URL of dataset to be downloaded")
 @click.option('--write-to', type=str, help="Path to directory where raw data will be written to")
 @click.option('--filename', type=str, help="File name for csv to be created")
+@click.option('--compress', is_flag=True, default=False, help="Store the file gzip-compressed (use a .csv.gz file name)")
+@click.option('--sha256', type=str, default=None, help="Expected SHA-256 checksum of the downloaded file")
 
-def main(url, write_to, filename):
-    load_csv(url, write_to, filename)
+@instrumented('load')
+def main(url, write_to, filename, compress, sha256):
+    configure_metrics()
+    result = load_csv(url, write_to, filename, compress=compress, sha256=sha256)
+    if result['status'] == 'not_modified':
+        print(f"✅ {result['path']} is up to date with the server.")
+    else:
+        print(f"✅ {result['path']} {result['status']} ({result['bytes'] / 1e6:.1f} MB, sha256 {result['sha256']}).")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+# load_test_server.py
+# Measures latency percentiles and throughput of the valuation server under concurrency.
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import click
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.scoring_server import http_request
+from src.instrumentation import configure_metrics, instrumented, record_rows
+
+
+def random_houses(n, seed):
+    rng = np.random.default_rng(seed)
+    flags = rng.choice(['Y', 'N'], size=(n, 4))
+    meters = rng.uniform(60, 250, n).round(2)
+    return [{'meters': float(meters[i]), 'garage': flags[i, 0], 'firepl': flags[i, 1],
+             'bsmt': flags[i, 2], 'bdevl': flags[i, 3]} for i in range(n)]
+
+
+async def client(host, port, houses, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for house in houses:
+            start = time.perf_counter()
+            status, _ = await http_request(reader, writer, 'POST', '/predict', house)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, concurrency, requests, seed):
+    houses = random_houses(requests, seed)
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, houses[i::concurrency], latencies, failures)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, server_metrics = await http_request(reader, writer, 'GET', '/metrics')
+    writer.close()
+    return latencies, failures, elapsed, server_metrics
+
+
+@click.command()
+@click.option('--host', type=str, default="127.0.0.1", help="Host of the running server")
+@click.option('--port', type=int, default=8000, help="Port of the running server")
+@click.option('--concurrency', type=int, default=32, help="Number of concurrent keep-alive clients")
+@click.option('--requests', type=int, default=5000, help="Total number of single-property requests")
+@click.option('--seed', type=int, default=123, help="Random seed for the generated properties")
+@instrumented('load_test')
+def main(host, port, concurrency, requests, seed):
+    """
+    Sends single-property requests from concurrent clients and reports
+    client-side p50/p99 latency and throughput alongside the server metrics.
+    """
+    configure_metrics()
+    latencies, failures, elapsed, server_metrics = asyncio.run(run_load(host, port, concurrency, requests, seed))
+    record_rows(len(latencies))
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"✅ {len(latencies)} requests from {concurrency} clients in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:,.0f} requests/sec)")
+    print(f"Latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+    if failures:
+        print(f"❌ {len(failures)} requests failed")
+    print("Server metrics:")
+    print(json.dumps(server_metrics, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,23 +4,33 @@ import click
 import os
 import pandas as pd
 import pickle
+import sys
 from sklearn.linear_model import RidgeCV
 from sklearn.dummy import DummyRegressor
 
-from sklearn.model_selection import cross_validate
 from sklearn.pipeline import make_pipeline
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.io_utils import iter_processed, read_processed
+from src.model_fitting_util import cross_validate_models, fit_ridge_out_of_core, ridge_statistics
+from src.online_update import save_model
+from src.instrumentation import configure_metrics, instrumented
+
 @click.command()
 @click.option('--train-data', type=str, help="Path to the training CSV file")
 @click.option('--test-data', type=str, help="Path to the testing CSV file")
 @click.option('--preprocessor', type=str, help="Path to preprocessor object")
 @click.option('--results-to', type=str, help="Path to directory where results will be saved")
 @click.option('--seed', type=int, default=123, help="Random seed for reproducibility")
-def main(train_data, test_data, preprocessor, results_to, seed):
+@click.option('--n-jobs', type=int, default=-1, help="Number of processes for cross-validation (-1 uses every core)")
+@click.option('--chunksize', type=int, default=None, help="Fit Ridge out of core from chunks of this many rows (skips cross-validation)")
+@instrumented('fit')
+def main(train_data, test_data, preprocessor, results_to, seed, n_jobs, chunksize):
     """
     Fits a Ridge regression model using a preprocessor pipeline,
     performs cross-validation, and evaluates the model on the test set.
     """
+    configure_metrics()
     # Set random seed
     import numpy as np
     np.random.seed(seed)
@@ -28,54 +38,55 @@ def main(train_data, test_data, preprocessor, results_to, seed):
     # Ensure results directory exists
     os.makedirs(results_to, exist_ok=True)
 
-    # Load training and testing data
-    train_df = pd.read_csv(train_data)
-    test_df = pd.read_csv(test_data)
-
-    # Separate features and target
-    X_train = train_df.drop(columns=["assess_2022"])
-    y_train = train_df["assess_2022"]
-    X_test = test_df.drop(columns=["assess_2022"])
-    y_test = test_df["assess_2022"]
-
     # Load preprocessor
     with open(preprocessor, 'rb') as f:
         preprocessor_obj = pickle.load(f)
 
-    # Define Ridge regression pipeline
-    pipeline = make_pipeline(preprocessor_obj, RidgeCV())
-
-    # Perform cross-validation
-    cross_val_results = pd.DataFrame(
-        cross_validate(pipeline, X_train, y_train, cv=5, return_train_score=True)
-    ).agg(['mean', 'std']).round(3).T
-
-    # Save cross-validation results
-    results_file = os.path.join(results_to, "cross_val_results.csv")
-    cross_val_results.to_csv(results_file)
-
-    # Fit the pipeline to the training data
-    pipeline.fit(X_train, y_train)
-
-    # Evaluate the pipeline on the test data
-    test_score = pipeline.score(X_test, y_test)
-
-    # Save the trained model
-    model_file = os.path.join(results_to, "ridge_pipeline.pickle")
-    with open(model_file, 'wb') as f:
-        pickle.dump(pipeline, f)
-
-    # Dummy model for comparison purposes
-    dummy_pipe = make_pipeline(preprocessor_obj, DummyRegressor())
-
-    dummy_cross_val_results = pd.DataFrame(
-        cross_validate(dummy_pipe, X_train, y_train, cv=5, return_train_score=True)
-    ).agg(['mean', 'std']).round(3).T
-
-    dummy_results_file = os.path.join(results_to, "dummy_cross_val_results.csv")
-    dummy_cross_val_results.to_csv(dummy_results_file)
+    if chunksize:
+        # Fit Ridge from streamed sufficient statistics without loading the training data whole
+        pipeline, stats = fit_ridge_out_of_core(
+            preprocessor_obj, lambda: iter_processed(train_data, chunksize=chunksize), return_statistics=True
+        )
+        print(f"✅ Ridge fitted out of core (alpha={pipeline[-1].alpha_}); cross-validation skipped.")
+    else:
+        # Load training and testing data
+        train_df = read_processed(train_data)
+        test_df = read_processed(test_data)
+
+        # Separate features and target
+        X_train = train_df.drop(columns=["assess_2022"])
+        y_train = train_df["assess_2022"]
+        X_test = test_df.drop(columns=["assess_2022"])
+        y_test = test_df["assess_2022"]
+
+        # Cross-validate Ridge regression and a dummy model for comparison on shared folds
+        cv_results = cross_validate_models(
+            {"ridge": RidgeCV(), "dummy": DummyRegressor()},
+            preprocessor_obj, X_train, y_train, cv=5, n_jobs=n_jobs
+        )
+
+        # Save cross-validation results
+        results_file = os.path.join(results_to, "cross_val_results.csv")
+        cv_results["ridge"].to_csv(results_file)
+        dummy_results_file = os.path.join(results_to, "dummy_cross_val_results.csv")
+        cv_results["dummy"].to_csv(dummy_results_file)
+
+        # Define Ridge regression pipeline
+        pipeline = make_pipeline(preprocessor_obj, RidgeCV())
+
+        # Fit the pipeline to the training data
+        pipeline.fit(X_train, y_train)
+
+        # Evaluate the pipeline on the test data
+        test_score = pipeline.score(X_test, y_test)
+
+        # Gather the statistics that later online updates start from
+        stats = ridge_statistics(pipeline[:-1], train_df)
+
+    # Save the trained model as version 1, with a pickle-free copy that scoring
+    # workers can load without sklearn and the statistics to update it with
+    save_model(pipeline, stats, results_to, version=1)
 
-        
 if __name__ == '__main__':
     main()
 
@@ -1,20 +1,22 @@
 import pandas as pd
 import os
-import altair as alt
 import click
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.prediction import make_predictions  # Import the function
+from src.instrumentation import configure_metrics, instrumented
 
 @click.command()
-@click.option('--model-file', type=str, help="Path to the trained model file (pickle format)", required=True)
+@click.option('--model-file', type=str, help="Path to the trained model file (pickle or .json artifact)", required=True)
 @click.option('--output-file', type=str, help="Path to save the predictions CSV file", required=True)
-@click.option('--plot-to', type=str, help="Path to save the visualization", required=True)
+@click.option('--plot-to', type=str, default=None, help="Path to save the visualization (skipped if omitted)")
+@instrumented('predict')
 def main(model_file, output_file, plot_to):
     """
     Predicts housing prices for a given dataset using a pre-trained pipeline model
     and saves visualizations of predictions.
     """
+    configure_metrics()
     # Input data (the 10 house examples)
     ten_houses = {
         'meters': [174.23, 132.76, 90.82, 68.54, 221.30, 145.03, 102.96, 164.28, 142.79, 115.94],
@@ -35,7 +37,13 @@ def main(model_file, output_file, plot_to):
     print(f"Predictions saved to {output_file}")
     print(result_df)
 
-    # Generate visualizations
+    if plot_to is None:
+        return
+
+    # Generate visualizations; altair is only imported when a plot is requested
+    import altair as alt
+    from src.chart_export import export_charts
+
     mtrs = alt.Chart(result_df).mark_line().encode(
         x=alt.X('meters', title="Property size"),
         y=alt.Y('Predicted_Values', title='Predicted Values'),
@@ -93,8 +101,8 @@ def main(model_file, output_file, plot_to):
     plot_dir = os.path.dirname(plot_to)
     if not os.path.exists(plot_dir):
         os.makedirs(plot_dir)
-    combined_chart.save(plot_to, scale_factor=2.0)
-    print(f"Visualization saved to {plot_to}")
+    timings = export_charts({plot_to: combined_chart}, scale_factor=2.0)
+    print(f"Visualization saved to {plot_to} (rendered in {timings[plot_to]:.2f}s)")
 
 if __name__ == '__main__':
     main()
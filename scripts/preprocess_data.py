@@ -11,21 +11,25 @@ import pandas as pd
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.preprocess_utils import create_preprocessor, validate_categorical_levels
+from src.io_utils import read_processed
+from src.instrumentation import configure_metrics, instrumented
 
 @click.command()
 @click.option('--train-data', type=str, help="Path to train data")
 @click.option('--write-to', type=str, help="Path to directory where preprocessed data will be written to")
+@instrumented('preprocess')
 def main(train_data, write_to):
     """
     Preprocesses and validates data, then writes preprocessor to disk using Pickle.
     """
-    # Load the training data
-    train_df = pd.read_csv(train_data)
-
+    configure_metrics()
     # Define feature categories
     categorical_features = ['garage', 'firepl', 'bsmt', 'bdevl']
     numeric_features = ['meters']
 
+    # Load only the feature columns of the training data
+    train_df = read_processed(train_data, columns=categorical_features + numeric_features)
+
     # Validate categorical feature levels
     validate_categorical_levels(train_df, categorical_features, expected_values={'Y', 'N'})
 
@@ -0,0 +1,77 @@
+# run_benchmarks.py
+# Times and memory-profiles each pipeline stage on generated data and
+# compares the results with a stored baseline.
+
+import json
+import os
+import sys
+
+import click
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.benchmark_utils import BENCHMARKS, compare_to_baseline, run_benchmarks
+from src.instrumentation import configure_metrics, instrumented
+from src.synthetic_data import SyntheticModel
+
+
+@click.command()
+@click.option('--sizes', type=str, default="10000,100000,1000000", help="Comma-separated row counts (the nightly run adds 10000000)")
+@click.option('--benchmarks', 'names', type=str, default=None, help=f"Comma-separated benchmarks to run (default all: {', '.join(BENCHMARKS)})")
+@click.option('--repeat', type=int, default=3, help="Number of timed runs per benchmark (the median is reported)")
+@click.option('--results-to', type=str, default="results/benchmarks/latest.json", help="Path to save the results JSON")
+@click.option('--baseline', type=str, default="results/benchmarks/baseline.json", help="Path of the baseline results JSON")
+@click.option('--model-from', type=str, default=None, help="Generate the data with a fitted generator (JSON) instead of fitting one to the cleaned data")
+@click.option('--tolerance', type=float, default=0.2, help="Relative slowdown allowed before a result is a regression")
+@click.option('--update-baseline', is_flag=True, help="Save these results as the new baseline")
+@click.option('--require-baseline', is_flag=True, help="Exit with status 1 if there is no baseline to compare with")
+@instrumented('benchmark')
+def main(sizes, names, repeat, results_to, baseline, model_from, tolerance, update_baseline, require_baseline):
+    """
+    Runs the benchmark suite, saves the results as JSON and reports
+    regressions against the baseline. Exits with status 1 if any benchmark
+    regressed, or with --require-baseline if there is no baseline, so a
+    scheduled run can fail on it.
+    """
+    configure_metrics()
+    def progress(result):
+        print(f"✅ {result['benchmark']:<28} {result['rows']:>10,} rows  "
+              f"{result['median_seconds']:8.3f}s  {result['peak_mb']:9.1f} MB peak")
+
+    results = run_benchmarks(sizes=[int(size) for size in sizes.split(',')],
+                             names=names.split(',') if names else None, repeat=repeat, progress=progress,
+                             model=SyntheticModel.load(model_from) if model_from else None)
+
+    os.makedirs(os.path.dirname(results_to) or '.', exist_ok=True)
+    with open(results_to, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {results_to}")
+
+    if update_baseline:
+        os.makedirs(os.path.dirname(baseline) or '.', exist_ok=True)
+        with open(baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline updated: {baseline}")
+        return
+
+    if not os.path.exists(baseline):
+        if require_baseline:
+            print(f"❌ No baseline at {baseline}; run with --update-baseline to create one.")
+            sys.exit(1)
+        print(f"No baseline at {baseline}; run with --update-baseline to create one.")
+        return
+
+    with open(baseline) as f:
+        report = compare_to_baseline(results, json.load(f), tolerance=tolerance)
+    print(report.round(3).to_string(index=False))
+
+    regressions = report[report['status'] == 'regression']
+    if len(regressions):
+        print(f"❌ {len(regressions)} regression(s) beyond {tolerance:.0%}:")
+        for row in regressions.itertuples():
+            print(f"   {row.benchmark} at {row.rows:,} rows: {row.time_ratio:.2f}x time, {row.memory_ratio:.2f}x memory")
+        sys.exit(1)
+    print("✅ No regressions against the baseline.")
+
+
+if __name__ == '__main__':
+    main()
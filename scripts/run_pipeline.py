@@ -0,0 +1,116 @@
+# run_pipeline.py
+# Runs the analysis end to end, skipping stages whose inputs, code and
+# parameters have not changed since a cached run.
+
+import importlib.util
+import os
+import sys
+
+import click
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.pipeline_runner import Stage, python_command, run_pipeline
+from src.instrumentation import configure_metrics, instrumented
+
+RAW_DATA_URL = "https://hub.arcgis.com/api/v3/datasets/e3c5b04fccdc4ddd88059a8c0b6d8160_0/downloads/data?format=csv&spatialRefId=3776&where=1%3D1"
+
+
+def housing_stages(seed, threshold, report):
+    """
+    Returns the stages of the Strathcona analysis, mirroring the Makefile targets.
+    """
+    raw_file = "data/raw/Raw_2023_Property_Tax_Assessment.csv"
+    processed = "data/processed"
+    clean_file, train_file, test_file = (os.path.join(processed, name) for name in
+                                         ("Clean_2023_Property_Tax_Assessment.csv", "train.csv", "test.csv"))
+    models, figures, tables = "results/models", "results/figures", "results/tables"
+    preprocessor_file = os.path.join(models, "preprocessor.pickle")
+    model_file = os.path.join(models, "ridge_pipeline.pickle")
+    predictions_file = os.path.join(tables, "ten_houses_predictions.csv")
+    predictions_plot = os.path.join(figures, "predictions_visualization.png")
+
+    clean_outputs = [clean_file, train_file, test_file]
+    if importlib.util.find_spec("pyarrow") is not None:
+        clean_outputs += [os.path.splitext(path)[0] + ".feather" for path in clean_outputs]
+
+    stages = [
+        Stage(name="load",
+              command=python_command("scripts/load_data.py", url=RAW_DATA_URL, write_to="data/raw",
+                                     filename=os.path.basename(raw_file)),
+              outputs=[raw_file],
+              params={"url": RAW_DATA_URL},
+              code=["scripts/load_data.py"],
+              # The server's data can change under the same URL; the download is
+              # conditional, so an unchanged file costs one request
+              always_run=True),
+        Stage(name="clean",
+              command=python_command("scripts/clean_data.py", raw_data=raw_file, seed=seed,
+                                     write_to=processed, threshold=threshold),
+              inputs=[raw_file],
+              outputs=clean_outputs,
+              params={"seed": seed, "threshold": threshold},
+              code=["scripts/clean_data.py"]),
+        Stage(name="preprocess",
+              command=python_command("scripts/preprocess_data.py", train_data=train_file, write_to=models),
+              inputs=[train_file],
+              outputs=[preprocessor_file],
+              code=["scripts/preprocess_data.py"]),
+        Stage(name="eda",
+              command=python_command("scripts/eda.py", processed_data=clean_file, plot_to=figures),
+              inputs=[clean_file],
+              outputs=[os.path.join(figures, name) for name in
+                       ("categorical_features_counts.png", "categorical_features_scatter.png",
+                        "distribution_charts.png", "correlation_chart.png")],
+              code=["scripts/eda.py"]),
+        Stage(name="model",
+              command=python_command("scripts/model_fitting.py", train_data=train_file, test_data=test_file,
+                                     preprocessor=preprocessor_file, results_to=models, seed=seed),
+              inputs=[train_file, test_file, preprocessor_file],
+              outputs=[os.path.join(models, "cross_val_results.csv"), model_file,
+                       os.path.join(models, "ridge_pipeline.json"), os.path.join(models, "ridge_statistics.npz"),
+                       os.path.join(models, "dummy_cross_val_results.csv")],
+              params={"seed": seed},
+              code=["scripts/model_fitting.py"]),
+        Stage(name="predict",
+              command=python_command("scripts/predictions.py", model_file=model_file,
+                                     output_file=predictions_file, plot_to=predictions_plot),
+              inputs=[model_file],
+              outputs=[predictions_file, predictions_plot],
+              code=["scripts/predictions.py"]),
+    ]
+
+    if report:
+        report_file = "notebook/strathcona_house_value_predictor.qmd"
+        stages.append(
+            Stage(name="report",
+                  command=["quarto", "render", report_file],
+                  inputs=[report_file, "notebook/references.bib"] + [
+                      path for stage in stages[1:] for path in stage.outputs if not path.endswith(".feather")],
+                  outputs=["notebook/strathcona_house_value_predictor.html",
+                           "notebook/strathcona_house_value_predictor.pdf"])
+        )
+    return stages
+
+
+@click.command()
+@click.option('--cache-dir', type=str, default=".pipeline_cache", help="Directory of the artifact cache")
+@click.option('--seed', type=int, default=123, help="Random seed used to split the data and fit the model")
+@click.option('--threshold', type=int, default=5000, help="Outlier threshold of the clean stage")
+@click.option('--force', type=str, multiple=True, help="Name of a stage to re-run even if it is cached (repeatable)")
+@click.option('--report/--no-report', default=True, help="Whether to render the Quarto report")
+@instrumented('pipeline')
+def main(cache_dir, seed, threshold, force, report):
+    """
+    Runs the pipeline, restoring the outputs of unchanged stages from the cache.
+    """
+    configure_metrics()
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    statuses = run_pipeline(housing_stages(seed, threshold, report), os.path.join(root, cache_dir),
+                            force=set(force), cwd=root)
+    ran = [name for name, status in statuses.items() if status == 'ran']
+    print(f"✅ Pipeline complete: {len(ran)} stage(s) ran, {len(statuses) - len(ran)} restored from cache.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# Search over regressors and their hyperparameters by successive halving
+
+# search_models.py
+
+import os
+import click
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.io_utils import read_processed
+from src.model_search import SEARCH_SPACE, search_candidates, successive_halving_search
+from src.instrumentation import configure_metrics, instrumented
+
+
+@click.command()
+@click.option('--train-data', type=str, default="data/processed/train.csv", help="Path to the training CSV file")
+@click.option('--results-to', type=str, default="results/models", help="Directory where the leaderboard is written")
+@click.option('--models', type=click.Choice(list(SEARCH_SPACE)), multiple=True,
+              help="Model families to search (repeatable); all of them by default")
+@click.option('--factor', type=int, default=3, help="Candidates kept and rows added per round: 1/factor and factor times")
+@click.option('--min-rows', type=int, default=200, help="Rows of the first round, at least")
+@click.option('--cv', type=int, default=5, help="Number of cross-validation folds")
+@click.option('--n-jobs', type=int, default=-1, help="Number of worker processes (-1 uses every core)")
+@click.option('--seed', type=int, default=123, help="Random seed of the row subsamples")
+@instrumented('search')
+def main(train_data, results_to, models, factor, min_rows, cv, n_jobs, seed):
+    """Cross-validates every model of the search space by successive halving and writes the leaderboard
+    ----------------
+
+    Example: main(train_data="data/processed/train.csv", results_to="results/models", models=["ridge", "knn"])
+    """
+    configure_metrics()
+    categorical_features = ['garage', 'firepl', 'bsmt', 'bdevl']
+    numeric_features = ['meters']
+    train_df = read_processed(train_data, columns=categorical_features + numeric_features + ['assess_2022'])
+
+    candidates = search_candidates(models=models)
+    leaderboard, history = successive_halving_search(
+        train_df, categorical_features, numeric_features, candidates,
+        factor=factor, min_rows=min_rows, cv=cv, n_jobs=n_jobs, seed=seed
+    )
+
+    os.makedirs(results_to, exist_ok=True)
+    leaderboard_file = os.path.join(results_to, "model_search_leaderboard.csv")
+    leaderboard.to_csv(leaderboard_file, index=False)
+    history.to_csv(os.path.join(results_to, "model_search_history.csv"), index=False)
+
+    print(f"✅ {len(candidates)} candidates searched in {history['round'].nunique()} rounds; leaderboard saved to {leaderboard_file}.")
+    print(leaderboard.head(5)[['rank', 'model', 'params', 'n_rows', 'mean_test_score']].to_string(index=False))
+
+if __name__ == '__main__':
+    main()
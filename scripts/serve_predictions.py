@@ -0,0 +1,43 @@
+# serve_predictions.py
+# Serves valuations over HTTP, scoring concurrent requests in micro-batches.
+
+import asyncio
+import os
+import sys
+
+import click
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.prediction import Predictor
+from src.scoring_server import ScoringServer
+from src.instrumentation import configure_metrics, instrumented, record_rows
+
+
+@click.command()
+@click.option('--model-file', type=str, default="results/models/ridge_pipeline.pickle", help="Path to the trained model file (pickle format)")
+@click.option('--host', type=str, default="127.0.0.1", help="Interface to listen on")
+@click.option('--port', type=int, default=8000, help="Port to listen on")
+@click.option('--max-batch-size', type=int, default=64, help="Largest number of properties scored in one predict call")
+@click.option('--max-wait-ms', type=float, default=2.0, help="Longest time a request waits for its batch to fill")
+@click.option('--compiled/--no-compiled', default=False, help="Score with the compiled linear kernel instead of the pipeline")
+@instrumented('serve')
+def main(model_file, host, port, max_batch_size, max_wait_ms, compiled):
+    """
+    Loads the pipeline once and serves POST /predict, GET /metrics and GET /health.
+    """
+    configure_metrics()
+    server = ScoringServer(Predictor(model_file, compiled=compiled),
+                           max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    print(f"✅ Serving {model_file} on http://{host}:{port} "
+          f"(batches of up to {max_batch_size}, {max_wait_ms} ms window)")
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    except KeyboardInterrupt:
+        print("Server stopped.")
+    finally:
+        # The serve step spans the server's lifetime; its rows are the properties scored
+        record_rows(server.batcher.rows)
+
+
+if __name__ == '__main__':
+    main()
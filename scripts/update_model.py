@@ -0,0 +1,51 @@
+# Update the saved Ridge model with new training rows
+
+# update_model.py
+
+import os
+import click
+import sys
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.io_utils import read_processed
+from src.online_update import update_saved_model
+from src.instrumentation import configure_metrics, instrumented
+
+
+@click.command()
+@click.option('--new-data', type=str, multiple=True, required=True,
+              help="CSV file(s) of new training rows, e.g. data/processed/increments/train_batch_1.csv")
+@click.option('--model-dir', type=str, default="results/models", help="Directory of the saved model")
+@click.option('--reselect-alpha', is_flag=True, help="Pick alpha again by generalized cross-validation")
+@click.option('--train-data', type=str, default=None,
+              help="All training rows (new ones included), to compare the update with a full refit")
+@click.option('--test-data', type=str, default=None, help="Holdout rows for the comparison with a full refit")
+@instrumented('update')
+def main(new_data, model_dir, reselect_alpha, train_data, test_data):
+    """Folds new training rows into the saved model without refitting it, and optionally reports the drift from a full refit
+    ----------------
+
+    Example: main(new_data=["data/processed/increments/train_batch_1.csv"], model_dir="results/models",
+                  train_data="data/processed/train.csv", test_data="data/processed/test.csv")
+    """
+    configure_metrics()
+    new_df = pd.concat([read_processed(path) for path in new_data], ignore_index=True)
+    train_df = read_processed(train_data) if train_data and test_data else None
+    test_df = read_processed(test_data) if train_data and test_data else None
+
+    summary = update_saved_model(model_dir, new_df, alpha_selection="gcv" if reselect_alpha else "fixed",
+                                 train_data=train_df, holdout=test_df)
+    if summary['new_rows'] == 0:
+        print(f"✅ No new rows: model left at version {summary['model_version']}.")
+        return
+    print(f"✅ Model updated to version {summary['model_version']} with {summary['new_rows']} new rows "
+          f"({summary['total_rows']} in total, alpha={summary['alpha']}) in {summary['update_seconds']:.2f}s.")
+    if 'holdout_r2_refit' in summary:
+        print(f"✅ Holdout R^2 {summary['holdout_r2_online']:.4f} (full refit: {summary['holdout_r2_refit']:.4f} "
+              f"in {summary['refit_seconds']:.2f}s); predictions differ by "
+              f"{summary['prediction_gap_relative']:.3%} of the mean value on average.")
+
+if __name__ == '__main__':
+    main()
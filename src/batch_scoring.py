@@ -0,0 +1,113 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import instrumented, record_rows
+from src.io_utils import iter_csv_typed
+from src.prediction import FEATURES, Predictor
+
+_worker_predictor = None
+
+
+def iter_input(input_path, chunksize=100_000):
+    """
+    Yields an input file of properties in chunks.
+
+    CSV files are parsed chunk by chunk, with the schema dtypes for the
+    housing columns (see `iter_csv_typed`). Feather/Arrow files are memory-mapped
+    and Parquet files are read batch by batch, so only one chunk is held at
+    a time.
+
+    Parameters:
+        input_path (str): Path to a .csv, .feather, .arrow or .parquet file.
+        chunksize (int): Number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the input.
+    """
+    extension = os.path.splitext(input_path)[1].lower()
+    if extension in ('.feather', '.arrow'):
+        import pyarrow.feather as feather
+        table = feather.read_table(input_path, memory_map=True)
+        for start in range(0, table.num_rows, chunksize):
+            yield table.slice(start, chunksize).to_pandas()
+    elif extension == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from iter_csv_typed(input_path, chunksize=chunksize)
+
+
+def _init_worker(model_file):
+    global _worker_predictor
+    _worker_predictor = Predictor(model_file)
+
+
+def _score_chunk(features):
+    return _worker_predictor.predict(features)
+
+
+@instrumented()
+def score_file(model_file, input_path, output_file, chunksize=100_000, n_jobs=None):
+    """
+    Scores every property of a large input file and writes the predictions incrementally.
+
+    Chunks are scored across worker processes that each load the model once.
+    At most two chunks per worker are in flight, and results are written in
+    input order as soon as the oldest chunk is done, so memory stays bounded.
+
+    Parameters:
+        model_file (str): Path to the trained pipeline (pickle format).
+        input_path (str): Path to the properties to score, see `iter_input`.
+        output_file (str): Path to the CSV file of inputs plus 'Predicted_Values'.
+        chunksize (int): Number of rows per chunk.
+        n_jobs (int): Number of worker processes; None uses every core, 1 scores in-process.
+
+    Returns:
+        dict: Number of rows, elapsed seconds and rows per second.
+    """
+    start = time.perf_counter()
+    n_jobs = n_jobs or os.cpu_count()
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    n_rows = 0
+    header = True
+
+    def write(chunk, predictions):
+        nonlocal n_rows, header
+        chunk = chunk.copy(deep=False)
+        chunk['Predicted_Values'] = np.round(predictions, 2)
+        chunk.to_csv(output_file, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        n_rows += len(chunk)
+        record_rows(len(chunk))
+
+    if n_jobs == 1:
+        predictor = Predictor(model_file)
+        for chunk in iter_input(input_path, chunksize):
+            write(chunk, predictor.predict(chunk[FEATURES]))
+    else:
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(model_file,)) as pool:
+            for chunk in iter_input(input_path, chunksize):
+                pending.append((chunk, pool.submit(_score_chunk, chunk[FEATURES])))
+                if len(pending) >= 2 * n_jobs:
+                    done_chunk, future = pending.popleft()
+                    write(done_chunk, future.result())
+            while pending:
+                done_chunk, future = pending.popleft()
+                write(done_chunk, future.result())
+
+    if header:
+        # Empty input: still leave a file with the expected columns
+        pd.DataFrame(columns=FEATURES + ['Predicted_Values']).to_csv(output_file, index=False)
+
+    elapsed = time.perf_counter() - start
+    return {'rows': n_rows, 'seconds': elapsed, 'rows_per_second': n_rows / elapsed if elapsed else float('inf')}
@@ -0,0 +1,220 @@
+import contextlib
+import io
+import os
+import pickle
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import metrics_suspended
+from src.io_utils import read_processed
+from src.synthetic_data import FLAGS, fit_synthetic_model, generate_frame
+
+# Cleaned data the benchmark data generator is fitted to, by default
+FIT_DATA = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed', 'Clean_2023_Property_Tax_Assessment.csv')
+
+
+def _setup_drop_outliers(df, workdir):
+    from src.clean_data_util import drop_outliers
+    return lambda: drop_outliers(df, threshold=5000)
+
+
+def _setup_validation(df, workdir):
+    from src.preprocess_utils import validate_categorical_levels
+    from src.validation_utils import validate
+
+    def run():
+        validate(df)
+        validate_categorical_levels(df, FLAGS, {'Y', 'N'})
+    return run
+
+
+def _setup_preprocessor(df, workdir):
+    from src.preprocess_utils import create_preprocessor
+    X = df.drop(columns=['assess_2022'])
+    return lambda: create_preprocessor(FLAGS, ['meters']).fit_transform(X)
+
+
+def _setup_cross_validation(df, workdir):
+    from sklearn.linear_model import RidgeCV
+    from sklearn.pipeline import make_pipeline
+    from src.model_fitting_util import perform_cross_validation_and_save
+    from src.preprocess_utils import create_preprocessor
+
+    X, y = df.drop(columns=['assess_2022']), df['assess_2022']
+    pipeline = make_pipeline(create_preprocessor(FLAGS, ['meters']), RidgeCV())
+    results_path = os.path.join(workdir, "cross_val_results.csv")
+    return lambda: perform_cross_validation_and_save(pipeline, X, y, results_path, cv=5)
+
+
+def _setup_predictions(df, workdir):
+    from sklearn.linear_model import RidgeCV
+    from sklearn.pipeline import make_pipeline
+    from src.prediction import make_predictions
+    from src.preprocess_utils import create_preprocessor
+
+    X, y = df.drop(columns=['assess_2022']), df['assess_2022']
+    model_file = os.path.join(workdir, "ridge_pipeline.pickle")
+    with open(model_file, 'wb') as f:
+        pickle.dump(make_pipeline(create_preprocessor(FLAGS, ['meters']), RidgeCV()).fit(X, y), f)
+    return lambda: make_predictions(model_file, X)
+
+
+def _setup_eda_charts(df, workdir):
+    from src.eda_utils import (create_categorical_density_chart, create_combined_bar_chart,
+                               create_correlation_chart, create_distribution_chart)
+    numeric = df.assign(**{flag: (df[flag] == 'Y').astype(int) for flag in FLAGS})
+
+    def run():
+        # Building the specs includes aggregating and serializing the chart data
+        create_combined_bar_chart(df, "Counts").to_dict()
+        create_categorical_density_chart(df, "Values").to_dict()
+        create_distribution_chart(df, density=True).to_dict()
+        create_correlation_chart(numeric).to_dict()
+    return run
+
+
+# Benchmark name to a setup function returning the callable to time
+BENCHMARKS = {
+    'drop_outliers': _setup_drop_outliers,
+    'validation': _setup_validation,
+    'preprocessor_fit_transform': _setup_preprocessor,
+    'cross_validation': _setup_cross_validation,
+    'make_predictions': _setup_predictions,
+    'eda_charts': _setup_eda_charts,
+}
+
+
+def measure(func, repeat=3):
+    """
+    Times a callable and measures its peak Python memory allocation.
+
+    The timed runs and the memory run are separate, so tracing allocations
+    does not slow the timings down.
+
+    Parameters:
+        func (callable): Function to measure, called without arguments.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        dict: 'median_seconds', 'min_seconds' and 'peak_mb'.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'peak_mb': peak / 1e6,
+    }
+
+
+def environment_info():
+    """
+    Returns the interpreter, library versions and machine a benchmark ran on.
+    """
+    versions = {}
+    for package in ('numpy', 'pandas', 'scikit-learn', 'altair'):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'libraries': versions,
+    }
+
+
+def run_benchmarks(sizes=(10_000, 100_000, 1_000_000), names=None, repeat=3, seed=123, progress=None, model=None):
+    """
+    Runs every benchmark at every row count.
+
+    The data is drawn from the synthetic data generator (see
+    `generate_frame`), fitted to the cleaned data unless a fitted
+    generator is given.
+
+    Parameters:
+        sizes (tuple): Row counts of the generated data.
+        names (list): Benchmarks to run; defaults to all of BENCHMARKS.
+        repeat (int): Number of timed runs per benchmark and size.
+        seed (int): Random seed of the generated data.
+        progress (callable): Optional function called with each result as it completes.
+        model (SyntheticModel): Generator of the data; fitted to FIT_DATA if None.
+
+    Returns:
+        dict: 'environment' and a list of 'results' with 'benchmark', 'rows',
+        'median_seconds', 'min_seconds', 'peak_mb' and 'rows_per_second'.
+    """
+    names = list(names or BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {sorted(unknown)}")
+
+    if model is None:
+        model = fit_synthetic_model(read_processed(FIT_DATA))
+
+    results = []
+    for n_rows in sizes:
+        df = generate_frame(model, n_rows, np.random.default_rng(seed))
+        for name in names:
+            # The stages' own progress messages are silenced so the results stay readable, and their
+            # metrics are suspended so writing them isn't part of the timings
+            with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()), \
+                    metrics_suspended():
+                result = {'benchmark': name, 'rows': n_rows,
+                          **measure(BENCHMARKS[name](df, workdir), repeat)}
+            result['rows_per_second'] = n_rows / result['median_seconds']
+            results.append(result)
+            if progress:
+                progress(result)
+    return {'environment': environment_info(), 'repeat': repeat, 'seed': seed, 'results': results}
+
+
+def compare_to_baseline(current, baseline, tolerance=0.2):
+    """
+    Compares benchmark results with a stored baseline.
+
+    Parameters:
+        current (dict): Output of `run_benchmarks`.
+        baseline (dict): Earlier output of `run_benchmarks`.
+        tolerance (float): Relative slowdown (or growth in peak memory) allowed
+            before a result counts as a regression.
+
+    Returns:
+        pd.DataFrame: One row per benchmark and row count, with the baseline and
+        current median time and peak memory, their ratios and a 'status' of
+        'regression', 'improvement', 'ok' or 'new'.
+    """
+    keys = ['benchmark', 'rows']
+    columns = keys + ['median_seconds', 'peak_mb']
+    report = pd.DataFrame(current['results'])[columns].merge(
+        pd.DataFrame(baseline['results'], columns=columns), on=keys, how='left', suffixes=('', '_baseline')
+    )
+    report['time_ratio'] = report['median_seconds'] / report['median_seconds_baseline']
+    report['memory_ratio'] = report['peak_mb'] / report['peak_mb_baseline']
+
+    slower = (report['time_ratio'] > 1 + tolerance) | (report['memory_ratio'] > 1 + tolerance)
+    faster = report['time_ratio'] < 1 - tolerance
+    report['status'] = np.select([report['median_seconds_baseline'].isna(), slower, faster],
+                                 ['new', 'regression', 'improvement'], default='ok')
+    return report[keys + ['median_seconds_baseline', 'median_seconds', 'time_ratio',
+                          'peak_mb_baseline', 'peak_mb', 'memory_ratio', 'status']]
@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+
+
+def category_counts(df, column):
+    """
+    Counts the rows at each level of a categorical column.
+
+    Parameters:
+        df (pd.DataFrame): The data.
+        column (str): Name of the categorical column.
+
+    Returns:
+        pd.DataFrame: One row per level, with the level under `column` and its 'count'.
+    """
+    counts = df[column].value_counts(sort=False, dropna=False)
+    return pd.DataFrame({column: counts.index.astype(str), 'count': counts.to_numpy()})
+
+
+def distinct_points(df, columns):
+    """
+    Collapses rows that would be drawn as the same point.
+
+    Parameters:
+        df (pd.DataFrame): The data.
+        columns (list): Columns encoded as point positions.
+
+    Returns:
+        pd.DataFrame: One row per distinct combination of `columns`, with the number of rows it stands for in 'count'.
+    """
+    points = df.groupby(list(columns), observed=True, sort=False).size().reset_index(name='count')
+    for column in columns:
+        if isinstance(points[column].dtype, pd.CategoricalDtype):
+            points[column] = points[column].astype(str)
+    return points
+
+
+def nice_bin_step(low, high, maxbins):
+    """
+    Returns the bin width Vega-Lite chooses for `bin=alt.Bin(maxbins=...)` over [low, high].
+    """
+    span = high - low
+    if span <= 0:
+        return 1.0
+    step = 10.0 ** (round(np.log10(span)) - np.ceil(np.log10(maxbins)))
+    while np.ceil(span / step) > maxbins:
+        step *= 10
+    for divisor in (5, 2):
+        if span / (step / divisor) <= maxbins:
+            step /= divisor
+    return step
+
+
+def histogram_table(values, maxbins=2000, domain=None):
+    """
+    Bins values the way Vega-Lite's `bin=alt.Bin(maxbins=...)` would.
+
+    Parameters:
+        values (array-like): Values to bin.
+        maxbins (int): Largest number of bins over the range of the values.
+        domain (tuple): If given, only bins overlapping this range are returned.
+
+    Returns:
+        pd.DataFrame: 'bin_start', 'bin_end' and 'count' of every non-empty bin.
+    """
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    step = nice_bin_step(values.min(), values.max(), maxbins)
+    start = np.floor(values.min() / step) * step
+    bins = np.floor((values - start) / step).astype("int64")
+    counts = np.bincount(bins)
+    table = pd.DataFrame({'bin_start': start + step * np.arange(len(counts)), 'count': counts})
+    table['bin_end'] = table['bin_start'] + step
+    table = table[table['count'] > 0]
+    if domain is not None:
+        table = table[(table['bin_end'] > domain[0]) & (table['bin_start'] < domain[1])]
+    return table[['bin_start', 'bin_end', 'count']].reset_index(drop=True)
+
+
+def scott_bandwidth(values):
+    """
+    Returns the normal-reference bandwidth used by Vega's density transform.
+    """
+    q1, q3 = np.percentile(values, [25, 75])
+    spread = min(np.std(values, ddof=1), (q3 - q1) / 1.34)
+    return 1.06 * spread * len(values) ** -0.2
+
+
+def kde_table(values, steps=200, extent=None, bandwidth=None, counts=True):
+    """
+    Gaussian kernel density estimate of values, evaluated from binned data.
+
+    The values are first spread over grid points a quarter of the bandwidth apart,
+    and the kernel is summed over the occupied grid points rather than over rows,
+    so the cost does not grow with the number of values.
+
+    Parameters:
+        values (array-like): Values to estimate the density of.
+        steps (int): Number of evenly spaced points the curve is evaluated at.
+        extent (tuple): Range the curve is evaluated over; defaults to the range of the values.
+        bandwidth (float): Kernel bandwidth; defaults to `scott_bandwidth`.
+        counts (bool): Scale the density by the number of values, like Vega's `counts=True`.
+
+    Returns:
+        pd.DataFrame: 'value' and 'density' at each evaluation point.
+    """
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    bandwidth = bandwidth or scott_bandwidth(values)
+    low, high = values.min(), values.max()
+
+    # Linear binning: each value is shared between its two nearest grid points
+    n_bins = min(max(int(np.ceil((high - low) / (bandwidth / 4))), 1), 1 << 20)
+    position = (values - low) / ((high - low) / n_bins) if high > low else np.zeros(len(values))
+    left = np.minimum(position.astype("int64"), n_bins - 1)
+    right_share = position - left
+    bin_counts = (np.bincount(left, weights=1 - right_share, minlength=n_bins + 1)
+                  + np.bincount(left + 1, weights=right_share, minlength=n_bins + 1))
+    occupied = bin_counts > 0
+    centres = np.linspace(low, high, n_bins + 1)[occupied]
+
+    grid = np.linspace(*(extent or (low, high)), steps)
+    z = (grid[:, None] - centres[None, :]) / bandwidth
+    density = np.exp(-0.5 * z ** 2) @ bin_counts[occupied] / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    if counts:
+        density = density * len(values)
+    return pd.DataFrame({'value': grid, 'density': density})
+
+
+def correlation_table(df, methods=('pearson', 'spearman')):
+    """
+    Pairwise correlations of the numeric and boolean columns, in long format.
+
+    Only the lower triangle of each matrix is kept, as in `altair_ally.corr`.
+
+    Parameters:
+        df (pd.DataFrame): The data.
+        methods (tuple): Correlation methods accepted by `DataFrame.corr`.
+
+    Returns:
+        pd.DataFrame: 'method', 'index', 'variable' and 'value' of every pair.
+    """
+    numeric = df.select_dtypes(['number', 'boolean'])
+    tables = []
+    for method in methods:
+        matrix = numeric.corr(method)
+        mask = np.triu(np.ones(matrix.shape, dtype=bool))
+        table = matrix.mask(mask).rename_axis('index').reset_index().melt(id_vars='index').dropna()
+        tables.append(table.assign(method=method))
+    return pd.concat(tables, ignore_index=True)[['method', 'index', 'variable', 'value']]
+
+
+def grid_cells(x, y, bins, x_range, y_range):
+    """
+    Returns the flat index of the square grid cell each point falls in, or -1 outside the ranges.
+    """
+    x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+    column = np.floor((x - x_range[0]) / (x_range[1] - x_range[0]) * bins).astype("int64")
+    row = np.floor((y - y_range[0]) / (y_range[1] - y_range[0]) * bins).astype("int64")
+    # Points on the upper edges belong to the last cell, as in np.histogram2d
+    column[x == x_range[1]] = bins - 1
+    row[y == y_range[1]] = bins - 1
+    inside = (column >= 0) & (column < bins) & (row >= 0) & (row < bins)
+    return np.where(inside, row * bins + column, -1)
+
+
+def density_grid(df, x, y, bins=100, x_range=None, y_range=None):
+    """
+    Counts points in a bins x bins grid of square cells.
+
+    Parameters:
+        df (pd.DataFrame): The data.
+        x (str): Column on the horizontal axis.
+        y (str): Column on the vertical axis.
+        bins (int): Number of cells along each axis.
+        x_range (tuple): Range of x covered by the grid; defaults to the range of x.
+        y_range (tuple): Range of y covered by the grid; defaults to the range of y.
+
+    Returns:
+        pd.DataFrame: 'x_start', 'x_end', 'y_start', 'y_end' and 'count' of every
+        non-empty cell, so its size depends on the grid, not on the number of rows.
+    """
+    x_range = x_range or (df[x].min(), df[x].max())
+    y_range = y_range or (df[y].min(), df[y].max())
+    counts, x_edges, y_edges = np.histogram2d(df[x].to_numpy(dtype="float64"), df[y].to_numpy(dtype="float64"),
+                                              bins=bins, range=[x_range, y_range])
+    column, row = np.nonzero(counts)
+    return pd.DataFrame({
+        'x_start': x_edges[column], 'x_end': x_edges[column + 1],
+        'y_start': y_edges[row], 'y_end': y_edges[row + 1],
+        'count': counts[column, row].astype("int64"),
+    })
+
+
+def category_density(df, category, value, bins=100, value_range=None):
+    """
+    Counts the values of each level of a categorical column in shared bins.
+
+    Parameters:
+        df (pd.DataFrame): The data.
+        category (str): Categorical column.
+        value (str): Numeric column that is binned.
+        bins (int): Number of bins.
+        value_range (tuple): Range of the bins; defaults to the range of the values.
+
+    Returns:
+        pd.DataFrame: The level under `category`, 'value_start', 'value_end' and
+        'count' of every non-empty bin.
+    """
+    value_range = value_range or (df[value].min(), df[value].max())
+    edges = np.linspace(value_range[0], value_range[1], bins + 1)
+    tables = []
+    for level, values in df.groupby(category, observed=True, sort=True)[value]:
+        counts, _ = np.histogram(values.to_numpy(dtype="float64"), bins=edges)
+        occupied = np.nonzero(counts)[0]
+        tables.append(pd.DataFrame({category: str(level), 'value_start': edges[occupied],
+                                    'value_end': edges[occupied + 1], 'count': counts[occupied]}))
+    return pd.concat(tables, ignore_index=True)
+
+
+def stratified_sample(df, strata, max_per_stratum=1, seed=123):
+    """
+    Samples at most `max_per_stratum` rows from each stratum.
+
+    Sparse strata keep all their rows and dense strata are capped, so the
+    sample keeps outliers while its size is bounded by the number of strata.
+
+    Parameters:
+        df (pd.DataFrame): The data.
+        strata (array-like): Stratum of each row, e.g. the cells from `grid_cells`.
+        max_per_stratum (int): Largest number of rows kept per stratum.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: The sampled rows, in their original order.
+    """
+    order = np.random.default_rng(seed).permutation(len(df))
+    shuffled_strata = pd.Series(np.asarray(strata)[order])
+    keep = order[(shuffled_strata.groupby(shuffled_strata).cumcount() < max_per_stratum).to_numpy()]
+    return df.iloc[np.sort(keep)]
@@ -2,11 +2,24 @@
 # author: Thamer Aldawood
 # date: 2024-12-12
 
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
 import pandas as pd
-from sklearn.model_selection import train_test_split
 import numpy as np
 
-def main(raw_data, seed, write_to):
+from src.dtype_utils import memory_usage_report, to_compact
+from src.instrumentation import instrumented, record_rows, step
+from src.io_utils import (ProcessedWriter, iter_csv_typed, processed_size, read_csv_typed, truncate_processed,
+                          write_processed)
+from src.quantile_sketch import QuantileSketch
+from src.validation_utils import HOUSING_SCHEMA, Validator, find_duplicates, first_seen, row_hashes, validate
+
+@instrumented('clean_in_memory')
+def main(raw_data, seed, write_to, threshold=5000):
     """Cleans raw data and splits it into train and test data based on a given seed
     ----------------
 
@@ -16,148 +29,408 @@ def main(raw_data, seed, write_to):
     """
     np.random.seed(seed)
     ## Validation for correct data file format
-    file_path = raw_data
-
-    if not file_path.endswith(".csv"):
+    if not raw_data.endswith((".csv", ".csv.gz")):
         raise ValueError("File format not supported.")
     else: 
         print("✅ File format validation passed: File is a CSV.")
 
-    housing_df = pd.read_csv(raw_data)
-    housing_df = housing_df[['meters','garage','firepl','bsmt','bdevl','assess_2022']]   
-
-    ## Validation for correct column names
-    expected_cols = {"meters", "garage", "firepl", "bsmt", "bdevl", "assess_2022"}
-    actual_cols = set(housing_df.columns)
-
-    if actual_cols == expected_cols:
-        print("✅ Column name validation passed: All expected columns are present.")
-    else:
-        missing = expected_cols - actual_cols
-        extra = actual_cols - expected_cols
-        print("Column names validation failed:")
-        if missing:
-            print(f" Missing columns: {missing}")
-        if extra:
-            print(f" Extra columns: {extra}")
-
-    ## Validation for No Empty Observations
-    empty = housing_df.isna().all(axis = 1).sum()
-
-    if empty == 0:
-        print("✅ Empty observations validation passed: No empty rows.")
-    else:
-        print(f" Empty observations validation failed: Found {empty} empty rows.")
-
-    ## Validation for missingness not beyond expected threshold
-    expected_threshold = 0
-    missing = housing_df.isna().mean()
-
-    all_cols_passed = True
-
-    for col, percentage in missing.items():
-        if percentage > expected_threshold:
-            all_cols_passed = False
-            print(f"Column '{col}' exceeds the missingness expected threshold ({percentage:.2%} missing).")
-    if all_cols_passed:
-        print(f"✅ Missingness validation passed for all columns.")
+    with step('read_csv'):
+        # Only the schema columns are parsed, with their declared dtypes
+        housing_df = read_csv_typed(raw_data, columns=HOUSING_SCHEMA.columns)
+        record_rows(len(housing_df))
+    record_rows(len(housing_df))
 
-    ## Validation for correct data types in each column 
+    ## Validation of columns, emptiness, missingness, dtypes, duplicates and category levels
+    report, keep = validate(housing_df, HOUSING_SCHEMA)
+    print("\n".join(report.summary()))
 
-    expected_dtypes = { "meters": "float64","garage": "object","firepl": "object","bsmt": "object", "bdevl": "object","assess_2022": "int64"}
-
-    dtype_passed = True
-
-    for col, dtype in expected_dtypes.items():
-        if housing_df[col].dtypes != dtype:
-            dtype_passed = False
-            print(f"Data type validation failed: Column '{col}' is of type {housing_df[col].dtypes}, expected {dtype}.")
-    if dtype_passed:
-        print("✅ Data type validation passed for all columns.")
-
-    ## Validation for no duplicate observations
-    duplicates = housing_df.duplicated().sum()
-
-    if duplicates == 0:
-        print("✅ Duplicate observation validation passed: No duplicate rows found.")
-    else:
-        print(f"Duplicate observation validation failed: Found {duplicates} duplicate rows.")
+    if report.duplicate_rows:
         # Dropping duplicates
-        housing_df = housing_df.drop_duplicates()
+        housing_df = housing_df[keep]
         print("✅ Duplicates have been removed from the DataFrame.")
 
     ## Validation for no outliers or anomalous values
-    housing_df = drop_outliers(housing_df, 5000)
+    housing_df, bounds = drop_outliers(housing_df, threshold, return_bounds=True)
+
+    # Switching to compact dtypes before splitting and writing
+    compact_df = to_compact(housing_df)
+    usage = memory_usage_report(housing_df, compact_df).loc['total']
+    print(f"✅ Compact dtypes applied: {usage['before_bytes'] / 1e6:.1f} MB -> {usage['after_bytes'] / 1e6:.1f} MB in memory.")
+    housing_df = compact_df
 
     # Splitting our cleaned and validated data into training and test data
-    train_df, test_df = train_test_split(housing_df, test_size=0.3, random_state=seed)
+    # (sklearn is imported here so the chunked path and `housing clean --help` don't pay for it)
+    from sklearn.model_selection import train_test_split
+    with step('split', rows=len(housing_df)):
+        train_df, test_df = train_test_split(housing_df, test_size=0.3, random_state=seed)
 
-    # Define the categorical features and their expected values
-    categorical_features = ['garage', 'firepl', 'bsmt', 'bdevl']
-    expected_values = {'Y', 'N'}
+    # Writing results to disk
+    write_processed(housing_df, os.path.join(write_to, "Clean_2023_Property_Tax_Assessment.csv"))
+    write_processed(train_df, os.path.join(write_to, "train.csv"))
+    write_processed(test_df, os.path.join(write_to, "test.csv"))
 
-    # Initialize a flag to track validation status
-    all_categories_valid = True
+    # Recording what was kept, so later files can be ingested incrementally
+    save_ingest_state(write_to, row_hashes(housing_df), bounds, seed, test_size=0.3)
 
-    # Validate each categorical feature in the train_df
-    for feature in categorical_features:
-        unique_values = set(train_df[feature].dropna().unique())  # Get unique values excluding NaNs
-        unexpected_values = unique_values - expected_values  # Find unexpected values
+if __name__ == '__main__':
+    main()
 
-        if unexpected_values:
-            print(f"❌ Unexpected values in column '{feature}' in train_df: {unexpected_values}")
-            all_categories_valid = False
-        else:
-            print(f"✅ Category levels validation passed for column '{feature}' in train_df.")
+def iqr_bounds(q1, q3):
+    """Computes the 1.5 * IQR outlier bounds from the first and third quartiles
+    ----------------
 
-    # Final message
-    if all_categories_valid:
-        print("✅ All categorical columns in train_df have the expected levels ('Y' and 'N').")
-    else:
-        print("❌ Some categorical columns in train_df have unexpected values. Please review.")
+    Works on scalars, arrays and pandas Series alike.
 
-    # Writing results to disk
-    housing_df.to_csv(os.path.join(write_to, "Clean_2023_Property_Tax_Assessment.csv"), index=False)
-    train_df.to_csv(os.path.join(write_to, "train.csv"), index=False)
-    test_df.to_csv(os.path.join(write_to, "test.csv"), index=False)
+    Example: lower_bound, upper_bound = iqr_bounds(q1, q3)
+    """
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
 
-if __name__ == '__main__':
-    main()
 
-def drop_outliers(df, threshold):
+@instrumented(rows_from='df')
+def drop_outliers(df, threshold, method="exact", sketch_k=512, return_bounds=False):
     """Identify and drop outliers if the threshold is exceeded
     ----------------
 
+    The quartiles of every numeric column are computed together, either
+    exactly (`method="exact"`) or from a streaming quantile sketch
+    (`method="sketch"`), and rows are dropped with a single combined mask
+    over the columns whose outlier count exceeds the threshold. With
+    `return_bounds=True`, the (lower, upper) bounds applied to each of
+    those columns are returned too.
+
     Example: drop_outliers(
     df,
     5000,
     )
     """
+    # Any numeric dtype, compact ones included; the schema's numeric columns only, when the data has them
+    numeric = df.select_dtypes(include="number").columns
+    cols = [col for col in numeric if HOUSING_SCHEMA.dtypes.get(col) in ("float64", "int64")] or numeric
+    values = df[cols]
+
+    if method == "exact":
+        quartiles = values.quantile([0.25, 0.75])
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+    elif method == "sketch":
+        sketches = {col: QuantileSketch(k=sketch_k, seed=0).update(values[col]) for col in cols}
+        quartiles = {col: sketch.quantile([0.25, 0.75]) for col, sketch in sketches.items()}
+        q1 = pd.Series({col: q[0] for col, q in quartiles.items()}, dtype="float64")
+        q3 = pd.Series({col: q[1] for col, q in quartiles.items()}, dtype="float64")
+    else:
+        raise ValueError(f"Unknown quantile method: {method}")
+
+    lower_bound, upper_bound = iqr_bounds(q1, q3)
+    is_outlier = (values < lower_bound) | (values > upper_bound)
+    num_outliers = is_outlier.sum()
+    exceeded = num_outliers.index[num_outliers > threshold]
 
-    outliers_detected = False
-
-    for col in df.select_dtypes(include=["float64", "int64"]).columns:
-        q1 = df[col].quantile(0.25)
-        q3 = df[col].quantile(0.75)
-        iqr = q3 - q1
-        lower_bound = q1 - 1.5 * iqr
-        upper_bound = q3 + 1.5 * iqr
-
-        outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
-        num_outliers = len(outliers)
-        
-        if num_outliers > threshold:
-            outliers_detected = True
-            print(f"Outlier validation failed: Column '{col}' has {num_outliers} outliers (threshold: {threshold}).")
-            # Dropping the outliers
-            df = df[~((df[col] < lower_bound) | (df[col] > upper_bound))]
-            print(f"✅ Outliers in column '{col}' have been removed from the DataFrame.")
-        elif num_outliers > 0:
-            print(f"Warning: Column '{col}' has {num_outliers} outliers, within acceptable threshold ({threshold}).")
-
-    if not outliers_detected:
+    for col, count in num_outliers.items():
+        if col in exceeded:
+            print(f"Outlier validation failed: Column '{col}' has {count} outliers (threshold: {threshold}).")
+        elif count > 0:
+            print(f"Warning: Column '{col}' has {count} outliers, within acceptable threshold ({threshold}).")
+
+    bounds = {col: (float(lower_bound[col]), float(upper_bound[col])) for col in exceeded}
+    if len(exceeded) == 0:
         print("✅ Outlier validation passed: No columns exceed the outlier threshold.")
-    else:
+        return (df, bounds) if return_bounds else df
+
+    # Dropping the outliers of every offending column at once
+    df = df[~is_outlier[exceeded].any(axis=1).to_numpy()]
+    print("✅ Outliers exceeding the threshold have been removed.")
+
+    return (df, bounds) if return_bounds else df
+
+PROCESSED_FILES = ("Clean_2023_Property_Tax_Assessment.csv", "train.csv", "test.csv")
+
+
+def _duplicate_mask(duplicates, start, n):
+    # Rows start..start+n that are in the sorted duplicate row numbers
+    mask = np.zeros(n, dtype=bool)
+    lo, hi = np.searchsorted(duplicates, [start, start + n])
+    mask[duplicates[lo:hi] - start] = True
+    return mask
+
+
+def _iter_spilled(path, chunksize):
+    # (first row number, values) blocks of a float64 column spilled with ndarray.tofile
+    with open(path, 'rb') as f:
+        start = 0
+        while True:
+            values = np.fromfile(f, dtype="float64", count=chunksize)
+            if len(values) == 0:
+                return
+            yield start, values
+            start += len(values)
+
+
+@instrumented('clean_in_chunks')
+def clean_in_chunks(raw_data, seed, write_to, chunksize=100_000, threshold=5000, test_size=0.3, approx_quantiles=True):
+    """Cleans raw data in bounded memory and splits it into train and test data
+    ----------------
+
+    The raw CSV is streamed twice in chunks of `chunksize` rows. The first
+    pass gathers validation statistics and spills the row hashes and numeric
+    columns to a temporary directory in `write_to`. Duplicates are then found
+    on disk (see `find_duplicates`) and the outlier bounds are computed from
+    the spilled, deduplicated numeric values. The second pass drops
+    duplicates and outliers, assigns every row to train or test with a
+    generator seeded by `seed`, and appends it to the output files.
+
+    Memory is bounded by the chunk size, plus 8 bytes per duplicate row; the
+    disk holds 24 bytes per row while the function runs. Outlier bounds come
+    from quantile sketches, so outlier counts are estimates. With
+    `approx_quantiles=False` they are exact, but every unique numeric value
+    is held in memory (16 bytes per unique row).
+
+    Example: clean_in_chunks("../data/raw/Raw_2023_Property_Tax_Assessment.csv",
+    522,
+    "../data/processed",
+    chunksize=100_000)
+    """
+    if not raw_data.endswith((".csv", ".csv.gz")):
+        raise ValueError("File format not supported.")
+    print("✅ File format validation passed: File is a CSV.")
+
+    columns = HOUSING_SCHEMA.columns
+    numeric_cols = [col for col, dtype in HOUSING_SCHEMA.dtypes.items() if dtype != "object"]
+
+    with tempfile.TemporaryDirectory(prefix=".clean_", dir=write_to) as work_dir:
+        hash_path = os.path.join(work_dir, "hashes.bin")
+        spill_paths = {col: os.path.join(work_dir, f"{col}.bin") for col in numeric_cols}
+
+        # First pass: gather validation statistics, spilling what the later steps need
+        validator = Validator(HOUSING_SCHEMA, deduplicate=False)
+        with step('first_pass'), contextlib.ExitStack() as stack:
+            hashes_out = stack.enter_context(open(hash_path, 'wb'))
+            spills = {col: stack.enter_context(open(path, 'wb')) for col, path in spill_paths.items()}
+            for chunk in iter_csv_typed(raw_data, chunksize=chunksize, columns=columns):
+                record_rows(len(chunk))
+                validator.update(chunk)
+                row_hashes(chunk).tofile(hashes_out)
+                for col, spill in spills.items():
+                    if col in chunk.columns:
+                        chunk[col].to_numpy(dtype="float64", na_value=np.nan).tofile(spill)
+
+        index_path = os.path.join(work_dir, "row_hashes.npy")
+        with step('deduplicate'):
+            duplicates = find_duplicates(hash_path, work_dir, chunksize=chunksize, index_path=index_path)
+
+        report = validator.report
+        report.duplicate_rows = len(duplicates)
+        record_rows(report.n_rows)
+        print("\n".join(report.summary()))
+        del validator
+
+        # Outlier bounds over the deduplicated data
+        bounds = {}
+        for col, path in spill_paths.items():
+            if os.path.getsize(path) == 0:
+                continue
+            sketch, values = QuantileSketch(seed=seed), []
+            for start, block in _iter_spilled(path, chunksize):
+                block = block[~_duplicate_mask(duplicates, start, len(block))]
+                if approx_quantiles:
+                    sketch.update(block)
+                else:
+                    values.append(block)
+            if approx_quantiles:
+                lower_bound, upper_bound = iqr_bounds(*sketch.quantile([0.25, 0.75]))
+                num_outliers = sketch.count_outside(lower_bound, upper_bound)
+            else:
+                values = np.concatenate(values)
+                lower_bound, upper_bound = iqr_bounds(*np.nanquantile(values, [0.25, 0.75]))
+                num_outliers = int(((values < lower_bound) | (values > upper_bound)).sum())
+            del values
+            if num_outliers > threshold:
+                bounds[col] = (lower_bound, upper_bound)
+                print(f"Outlier validation failed: Column '{col}' has {num_outliers} outliers (threshold: {threshold}).")
+            elif num_outliers > 0:
+                print(f"Warning: Column '{col}' has {num_outliers} outliers, within acceptable threshold ({threshold}).")
+
+        # Second pass: drop duplicates and outliers, split and write progressively
+        rng = np.random.default_rng(seed)
+        paths = [os.path.join(write_to, name) for name in PROCESSED_FILES]
+
+        with step('second_pass'), \
+                ProcessedWriter(paths[0]) as clean_writer, \
+                ProcessedWriter(paths[1]) as train_writer, \
+                ProcessedWriter(paths[2]) as test_writer:
+            start = 0
+            for chunk in iter_csv_typed(raw_data, chunksize=chunksize, columns=columns):
+                record_rows(len(chunk))
+                keep = ~_duplicate_mask(duplicates, start, len(chunk))
+                start += len(chunk)
+                for col, (lower_bound, upper_bound) in bounds.items():
+                    keep &= ~((chunk[col] < lower_bound) | (chunk[col] > upper_bound)).to_numpy()
+                chunk = to_compact(chunk[keep])
+                is_test = rng.random(len(chunk)) < test_size
+
+                clean_writer.write(chunk)
+                train_writer.write(chunk[~is_test])
+                test_writer.write(chunk[is_test])
+
+        save_ingest_state(write_to, index_path, bounds, seed, test_size)
+    if report.duplicate_rows:
+        print("✅ Duplicates have been removed from the DataFrame.")
+    if bounds:
         print("✅ Outliers exceeding the threshold have been removed.")
 
-    return df
\ No newline at end of file
+
+def ingest_state_paths(write_to):
+    """Returns the paths of the row hash index and the ingest state kept next to the processed data
+    ----------------
+
+    Example: hash_path, state_path = ingest_state_paths("../data/processed")
+    """
+    return os.path.join(write_to, "row_hashes.npy"), os.path.join(write_to, "ingest_state.json")
+
+
+def save_ingest_state(write_to, hashes, bounds, seed, test_size, batches=0, clean_id=None):
+    """Saves the sorted row hashes of the processed data and the settings needed to extend it
+    ----------------
+
+    `hashes` is an array of row hashes, or the path of a .npy file of
+    sorted unique hashes (see `find_duplicates`), which is moved into place.
+    Both files are written to temporary paths and then renamed, so an
+    interrupted run leaves the previous state intact. A full clean gets a
+    new `clean_id`, which incremental ingests carry over.
+
+    Example: save_ingest_state("../data/processed", row_hashes(clean_df), {}, 522, 0.3)
+    """
+    hash_path, state_path = ingest_state_paths(write_to)
+    if isinstance(hashes, str):
+        shutil.move(hashes, hash_path + ".tmp")
+    else:
+        with open(hash_path + ".tmp", "wb") as f:
+            np.save(f, np.unique(np.asarray(hashes, dtype=np.uint64)))
+    state = {"bounds": {col: [float(lower), float(upper)] for col, (lower, upper) in bounds.items()},
+             "seed": seed, "test_size": test_size, "batches": batches, "clean_id": clean_id or uuid.uuid4().hex}
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(hash_path + ".tmp", hash_path)
+    os.replace(state_path + ".tmp", state_path)
+
+
+def _pending_paths(write_to):
+    # Marker of an ingest in progress, and the hash index it started from
+    return os.path.join(write_to, "ingest_pending.json"), os.path.join(write_to, "row_hashes.pending.npy")
+
+
+def _recover_interrupted_ingest(write_to, state):
+    """Rolls back a batch whose ingest was interrupted before its state was saved
+    ----------------
+
+    The marker records the sizes of the processed files and the hash index
+    before the batch. If the saved state doesn't include the batch, the
+    files are cut back to those sizes, the index is restored and the batch's
+    increment is removed, so the batch can be ingested again.
+
+    Example: _recover_interrupted_ingest("../data/processed", state)
+    """
+    marker_path, index_backup = _pending_paths(write_to)
+    if os.path.exists(marker_path):
+        with open(marker_path) as f:
+            marker = json.load(f)
+        if marker["clean_id"] == state.get("clean_id") and marker["batch"] > state["batches"]:
+            for name, (csv_bytes, cache_rows) in marker["files"].items():
+                truncate_processed(os.path.join(write_to, name), csv_bytes, cache_rows)
+            if os.path.exists(index_backup):
+                os.replace(index_backup, ingest_state_paths(write_to)[0])
+            if os.path.exists(marker["increment"]):
+                os.remove(marker["increment"])
+            print(f"✅ Rolled back the interrupted ingest of batch {marker['batch']}.")
+        os.remove(marker_path)
+    if os.path.exists(index_backup):
+        os.remove(index_backup)
+
+
+@instrumented('ingest')
+def ingest_incremental(new_data, write_to, chunksize=100_000):
+    """Cleans only the rows of a new file that are not already in the processed data, and appends them
+    ----------------
+
+    A full clean (`main` or `clean_in_chunks`) saves the sorted hashes of
+    the rows it processed and the outlier bounds it applied. A new assessment roll
+    or a correction file is then validated as usual, but only rows whose
+    hash is not in the index are kept. The stored outlier bounds are
+    applied to them, they are split into train and test with a generator
+    seeded by the original seed and the batch number, and they are appended
+    to the processed files. The batch's training rows are also written on
+    their own to `increments/train_batch_<n>.csv`, for online model updates
+    (no file is written for a batch without new training rows).
+    Before appending, the sizes of the processed files are recorded in
+    `ingest_pending.json`; if the ingest is interrupted before its state is
+    saved, the next run rolls the partial batch back and ingests it again.
+    Rows have no key, so a corrected row is added as a new row next to the
+    version it corrects.
+
+    Example: ingest_incremental("../data/raw/Corrections_2024.csv", "../data/processed")
+    """
+    if not new_data.endswith((".csv", ".csv.gz")):
+        raise ValueError("File format not supported.")
+    hash_path, state_path = ingest_state_paths(write_to)
+    if not (os.path.exists(hash_path) and os.path.exists(state_path)):
+        raise FileNotFoundError(f"No ingest state in {write_to}: run a full clean first.")
+    with open(state_path) as f:
+        state = json.load(f)
+    _recover_interrupted_ingest(write_to, state)
+    with step('load_index'):
+        seen = np.load(hash_path)
+        n_indexed = len(seen)
+
+    batch = state["batches"] + 1
+    rng = np.random.default_rng([state["seed"], batch])
+    validator = Validator(HOUSING_SCHEMA)
+    n_new, n_outliers = 0, 0
+
+    paths = [os.path.join(write_to, name) for name in PROCESSED_FILES]
+    increment_path = os.path.join(write_to, "increments", f"train_batch_{batch}.csv")
+    os.makedirs(os.path.dirname(increment_path), exist_ok=True)
+
+    # Recording where the processed files end, in case the batch is interrupted
+    clean_id = state.get("clean_id") or uuid.uuid4().hex
+    marker_path, index_backup = _pending_paths(write_to)
+    try:
+        os.link(hash_path, index_backup)
+    except OSError:
+        shutil.copy2(hash_path, index_backup)
+    marker = {"clean_id": state.get("clean_id"), "batch": batch, "increment": increment_path,
+              "files": {name: processed_size(path) for name, path in zip(PROCESSED_FILES, paths)}}
+    with open(marker_path + ".tmp", "w") as f:
+        json.dump(marker, f, indent=2)
+    os.replace(marker_path + ".tmp", marker_path)
+
+    with ProcessedWriter(paths[0], append=True) as clean_writer, \
+            ProcessedWriter(paths[1], append=True) as train_writer, \
+            ProcessedWriter(paths[2], append=True) as test_writer, \
+            ProcessedWriter(increment_path) as increment_writer:
+        for chunk in iter_csv_typed(new_data, chunksize=chunksize, columns=HOUSING_SCHEMA.columns):
+            record_rows(len(chunk))
+            validator.update(chunk)
+            keep, seen = first_seen(row_hashes(chunk), seen)
+            n_new += int(keep.sum())
+            for col, (lower_bound, upper_bound) in state["bounds"].items():
+                outlier = ((chunk[col] < lower_bound) | (chunk[col] > upper_bound)).to_numpy()
+                n_outliers += int((keep & outlier).sum())
+                keep &= ~outlier
+            chunk = to_compact(chunk[keep])
+            is_test = rng.random(len(chunk)) < state["test_size"]
+
+            clean_writer.write(chunk)
+            train_writer.write(chunk[~is_test])
+            test_writer.write(chunk[is_test])
+            if (~is_test).any():
+                increment_writer.write(chunk[~is_test])
+
+    report = validator.report
+    print("\n".join(report.summary()))
+    bounds = {col: tuple(bound) for col, bound in state["bounds"].items()}
+    save_ingest_state(write_to, seen, bounds, state["seed"], state["test_size"], batches=batch, clean_id=clean_id)
+    os.remove(marker_path)
+    os.remove(index_backup)
+    print(f"✅ Incremental ingest: {report.n_rows} rows read, {report.n_rows - n_new} already processed, "
+          f"{n_outliers} outliers dropped, {n_new - n_outliers} appended ({n_indexed} rows were indexed).")
+    return {"rows": report.n_rows, "appended": n_new - n_outliers, "known": report.n_rows - n_new,
+            "outliers": n_outliers, "increment": increment_path if os.path.exists(increment_path) else None}
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from src.validation_utils import HOUSING_SCHEMA
+
+
+def compact_dtypes(df, float32=False):
+    """
+    Returns the compact dtype of every housing column present in a dataframe.
+
+    Y/N flags (and any other column with declared levels) become categoricals
+    with one-byte codes, whose values are still the original 'Y'/'N' strings
+    so fitted encoders and prediction inputs keep working. Their categories
+    are the schema's levels, whatever values a chunk holds, so data
+    converted chunk by chunk gets identical dtypes. Integer targets
+    become int32 when every value fits, and stay int64 otherwise. With `float32=True`, meters and the target become float32.
+
+    Parameters:
+        df (pd.DataFrame): The housing data.
+        float32 (bool): Whether to store numeric columns as float32.
+
+    Returns:
+        dict: Column name to dtype, for the columns of `df` that can be compacted.
+    """
+    dtypes = {}
+    for col in df.columns:
+        if col in HOUSING_SCHEMA.levels:
+            # Always the schema's levels, so every chunk of a file gets the same categories;
+            # unexpected values become NaN (validation reports them)
+            dtypes[col] = pd.CategoricalDtype(sorted(HOUSING_SCHEMA.levels[col]))
+        elif col in HOUSING_SCHEMA.dtypes and pd.api.types.is_numeric_dtype(df[col]):
+            if float32:
+                dtypes[col] = "float32"
+            elif pd.api.types.is_integer_dtype(df[col]) and _fits_int32(df[col]):
+                dtypes[col] = "int32"
+    return dtypes
+
+
+def _fits_int32(values):
+    # Casting a larger value to int32 would wrap around silently
+    bounds = np.iinfo("int32")
+    return values.empty or (bounds.min <= values.min() and values.max() <= bounds.max)
+
+
+def to_compact(df, float32=False):
+    """
+    Converts a housing dataframe to the compact in-memory representation.
+
+    Parameters:
+        df (pd.DataFrame): The housing data.
+        float32 (bool): Whether to store numeric columns as float32.
+
+    Returns:
+        pd.DataFrame: The same data with compact dtypes.
+    """
+    return df.astype(compact_dtypes(df, float32=float32))
+
+
+def memory_usage_report(before, after):
+    """
+    Compares the memory used by two versions of the same dataframe.
+
+    Parameters:
+        before (pd.DataFrame): The original dataframe.
+        after (pd.DataFrame): The compacted dataframe.
+
+    Returns:
+        pd.DataFrame: Bytes per column before and after, with a 'total' row.
+    """
+    report = pd.DataFrame({
+        'before_bytes': before.memory_usage(index=False, deep=True),
+        'after_bytes': after.memory_usage(index=False, deep=True)
+    })
+    report.loc['total'] = report.sum()
+    report['ratio'] = (report['before_bytes'] / report['after_bytes']).round(1)
+    return report
@@ -1,9 +1,28 @@
 import altair as alt
+import numpy as np
+import pandas as pd
 
+from src.chart_data import (category_counts, category_density, correlation_table, density_grid, distinct_points,
+                            grid_cells, histogram_table, kde_table, stratified_sample)
+from src.instrumentation import instrumented
+
+# Categorical features and their axis titles, in chart order
+CATEGORICAL_TITLES = {
+    'garage': 'Garage',
+    'firepl': 'Fireplace',
+    'bsmt': 'Basement',
+    'bdevl': 'Building evaluation',
+}
+
+
+@instrumented(rows_from='df')
 def create_combined_bar_chart(df, chart_title):
     """
     Creates a combined bar chart for categorical features in the dataframe.
 
+    The counts are computed up front, so each chart embeds one row per
+    level rather than the raw data.
+
     Parameters:
         df (pd.DataFrame): The dataframe containing the categorical data.
         chart_title (str): The title for the combined chart.
@@ -11,28 +30,231 @@ def create_combined_bar_chart(df, chart_title):
     Returns:
         alt.Chart: The combined Altair bar chart.
     """
-    grg0 = alt.Chart(df).mark_bar().encode(
-        x=alt.X('garage', title='Garage'),
-        y=alt.Y('count()', title='House value')
+    charts = [
+        alt.Chart(category_counts(df, feature)).mark_bar().encode(
+            x=alt.X(feature, title=title),
+            y=alt.Y('count:Q', title='House value')
+        )
+        for feature, title in CATEGORICAL_TITLES.items()
+    ]
+
+    combined_chart = alt.hconcat(*charts).properties(
+        title=chart_title
     )
 
-    frp0 = alt.Chart(df).mark_bar().encode(
-        x=alt.X('firepl', title='Fireplace'),
-        y=alt.Y('count()', title='House value')
+    return combined_chart
+
+
+@instrumented(rows_from='df')
+def create_categorical_scatter_chart(df, chart_title, target='assess_2022'):
+    """
+    Creates side-by-side scatter plots of the target per categorical feature.
+
+    Rows drawn at the same position are collapsed into one point first.
+
+    Parameters:
+        df (pd.DataFrame): The dataframe containing the features and target.
+        chart_title (str): The title for the combined chart.
+        target (str): Column plotted on the y axis.
+
+    Returns:
+        alt.HConcatChart: The combined Altair scatter plots.
+    """
+    charts = [
+        alt.Chart(distinct_points(df, [feature, target])).mark_point().encode(
+            x=alt.X(feature, title=title),
+            y=alt.Y(target, title='House value'),
+        )
+        for feature, title in CATEGORICAL_TITLES.items()
+    ]
+    return alt.hconcat(*charts).properties(title=chart_title)
+
+
+@instrumented(rows_from='df')
+def create_distribution_chart(df, target='assess_2022', domain=(0, 2_000_000), density=False):
+    """
+    Creates the histogram and KDE of the target next to a scatter plot of property size against it.
+
+    The histogram bins and the KDE curve are computed in NumPy, so their
+    specs hold a fixed number of rows however large the data is.
+
+    Parameters:
+        df (pd.DataFrame): The dataframe containing 'meters' and the target.
+        target (str): Column whose distribution is plotted.
+        domain (tuple): Range of target values shown on the x axes.
+        density (bool): Draw the scatter plot with `create_density_scatter`.
+
+    Returns:
+        alt.HConcatChart: The histogram, KDE and scatter plot.
+    """
+    histogram = alt.Chart(histogram_table(df[target], maxbins=2000, domain=domain)).mark_bar().encode(
+        alt.X("bin_start:Q", bin="binned", title="Assessment Value").scale(domain=domain, clamp=True),
+        alt.X2("bin_end:Q"),
+        alt.Y("count:Q", title="Frequency"),
+    ).properties(
+        title="Distribution of House Assessment Values (2022)"
     )
 
-    bst0 = alt.Chart(df).mark_bar().encode(
-        x=alt.X('bsmt', title='Basement'),
-        y=alt.Y('count()', title='House value')
+    kde = alt.Chart(kde_table(df[target], extent=domain)).mark_line(color="red").encode(
+        alt.X("value:Q", title="Assessment Value").scale(domain=domain, clamp=True),
+        alt.Y("density:Q", title="Density")
+    ).properties(
+        title="Line Plot of KDE House Assessment Values (2022)"
     )
 
-    bdl0 = alt.Chart(df).mark_bar().encode(
-        x=alt.X('bdevl', title='Building evaluation'),
-        y=alt.Y('count()', title='House value')
+    if density:
+        scatter = create_density_scatter(
+            df, target, 'meters', x_title="Assessment Value", y_title="Property size (meters)",
+            title="Density of Property Size and Assessment Values (2022)"
+        )
+        return histogram | kde | scatter
+
+    scatter = alt.Chart(distinct_points(df, ['meters', target])).mark_point().encode(
+        y=alt.Y('meters', title="Property size (meters)"),
+        x=alt.X(target, title="Assessment Value"),
+        color=alt.Color('meters', title="Property size (meters)", scale=alt.Scale(scheme='viridis'))
+    ).properties(
+        title="Scatter Plot of Property Size and Assessment Values (2022)"
     )
 
-    combined_chart = alt.hconcat(grg0, frp0, bst0, bdl0).properties(
-        title=chart_title
+    return histogram | kde | scatter
+
+
+@instrumented(rows_from='df')
+def create_correlation_chart(df, methods=('pearson', 'spearman')):
+    """
+    Creates correlation dot plots in the layout of `altair_ally.corr`, from a precomputed correlation table.
+
+    Parameters:
+        df (pd.DataFrame): Numeric (and boolean) columns to correlate.
+        methods (tuple): Correlation methods accepted by `DataFrame.corr`.
+
+    Returns:
+        alt.ConcatChart: One correlation plot per method.
+    """
+    correlations = correlation_table(df, methods)
+    charts = []
+    for number, method in enumerate(methods):
+        table = correlations[correlations['method'] == method].drop(columns='method')
+        table = table.sort_values('variable', ascending=False)
+        variable_order = table['variable'].value_counts().index.tolist()
+        index_order = table['index'].value_counts().index.tolist()
+        charts.append(
+            alt.Chart(table, mark='circle', title=f'{method.capitalize()} correlations')
+            .transform_calculate(abs_value='abs(datum.value)')
+            .encode(
+                alt.X('index', sort=index_order, title=''),
+                alt.Y('variable', sort=variable_order[::-1], title='',
+                      axis=alt.Axis(labels=False) if number > 0 else alt.Axis()),
+                alt.Color('value', title='', scale=alt.Scale(domain=[-1, 1], scheme='blueorange')),
+                alt.Size('abs_value:Q', scale=alt.Scale(domain=[0, 1]), legend=None),
+                [alt.Tooltip('value', format='.2f').title('corr'), alt.Tooltip('index').title('x'),
+                 alt.Tooltip('variable').title('y')]
+            )
+        )
+    return alt.concat(*charts).resolve_axis(y='shared').configure_view(strokeWidth=0)
+
+
+# Most points overlaid on a density grid; Altair refuses charts with more than 5000 rows by default
+MAX_OVERLAY_POINTS = 1000
+
+
+def _sparse_points(df, cell_counts, cells, sparse_count, seed):
+    """
+    Keeps one point per grid cell holding at most `sparse_count` rows, to overlay outliers on a density grid.
+    """
+    sparse = cell_counts[cells] <= sparse_count
+    points = stratified_sample(df[sparse], cells[sparse], max_per_stratum=1, seed=seed)
+    if len(points) > MAX_OVERLAY_POINTS:
+        points = points.sample(MAX_OVERLAY_POINTS, random_state=seed).sort_index()
+    return points
+
+
+@instrumented(rows_from='df')
+def create_density_scatter(df, x, y, x_title, y_title, title, bins=70, sparse_count=2, seed=123):
+    """
+    Creates a density-rasterized scatter plot: a grid of cells colored by their number of points.
+
+    Points in cells holding at most `sparse_count` rows are still drawn
+    individually (one per cell, at most MAX_OVERLAY_POINTS), so outliers stay
+    visible. The spec holds at most bins * bins cells plus the overlay,
+    whatever the number of rows in `df`; the default of 70 bins keeps the
+    grid under Altair's 5000-row limit.
+
+    Parameters:
+        df (pd.DataFrame): The data.
+        x (str): Column on the horizontal axis.
+        y (str): Column on the vertical axis.
+        x_title (str): Title of the horizontal axis.
+        y_title (str): Title of the vertical axis.
+        title (str): Title of the chart.
+        bins (int): Number of cells along each axis (at most 70 to stay under Altair's row limit).
+        sparse_count (int): Largest cell count whose points are overlaid.
+        seed (int): Random seed of the overlay sample.
+
+    Returns:
+        alt.LayerChart: The density grid with the overlaid points.
+    """
+    x_range, y_range = (df[x].min(), df[x].max()), (df[y].min(), df[y].max())
+    grid = density_grid(df, x, y, bins=bins, x_range=x_range, y_range=y_range)
+    cells = grid_cells(df[x], df[y], bins, x_range, y_range)
+    cell_counts = np.bincount(cells, minlength=bins * bins)
+    points = _sparse_points(df[[x, y]], cell_counts, cells, sparse_count, seed)
+
+    density = alt.Chart(grid).mark_rect().encode(
+        x=alt.X('x_start:Q', title=x_title),
+        x2='x_end:Q',
+        y=alt.Y('y_start:Q', title=y_title),
+        y2='y_end:Q',
+        color=alt.Color('count:Q', title="Properties", scale=alt.Scale(type='log', scheme='viridis'))
     )
+    overlay = alt.Chart(points).mark_point(size=20, color='black', opacity=0.6).encode(
+        x=f'{x}:Q',
+        y=f'{y}:Q',
+    )
+    return (density + overlay).properties(title=title)
 
-    return combined_chart
+
+@instrumented(rows_from='df')
+def create_categorical_density_chart(df, chart_title, target='assess_2022', bins=200, sparse_count=2, seed=123):
+    """
+    Creates the per-category value plots as binned strips colored by their number of properties.
+
+    Like `create_density_scatter`, values in bins holding at most
+    `sparse_count` rows are also drawn as points.
+
+    Parameters:
+        df (pd.DataFrame): The dataframe containing the features and target.
+        chart_title (str): The title for the combined chart.
+        target (str): Column plotted on the y axis.
+        bins (int): Number of bins along the y axis.
+        sparse_count (int): Largest bin count whose points are overlaid.
+        seed (int): Random seed of the overlay sample.
+
+    Returns:
+        alt.HConcatChart: One binned strip chart per categorical feature.
+    """
+    value_range = (df[target].min(), df[target].max())
+    edges = np.linspace(value_range[0], value_range[1], bins + 1)
+    charts = []
+    for feature, title in CATEGORICAL_TITLES.items():
+        strips = category_density(df, feature, target, bins=bins, value_range=value_range)
+        # One cell per (level, value bin), numbered like the strips
+        levels = pd.Categorical(df[feature]).codes.astype("int64")
+        value_bin = np.clip(np.searchsorted(edges, df[target].to_numpy(), side='right') - 1, 0, bins - 1)
+        cells = levels * bins + value_bin
+        cell_counts = np.bincount(cells)
+        points = _sparse_points(df[[feature, target]].astype({feature: str}), cell_counts, cells, sparse_count, seed)
+
+        density = alt.Chart(strips).mark_rect().encode(
+            x=alt.X(f'{feature}:N', title=title),
+            y=alt.Y('value_start:Q', title='House value'),
+            y2='value_end:Q',
+            color=alt.Color('count:Q', title="Properties", scale=alt.Scale(type='log', scheme='viridis'))
+        )
+        overlay = alt.Chart(points).mark_point(color='black', opacity=0.6).encode(
+            x=alt.X(f'{feature}:N', title=title),
+            y=alt.Y(f'{target}:Q', title='House value'),
+        )
+        charts.append(density + overlay)
+    return alt.hconcat(*charts).properties(title=chart_title)
@@ -0,0 +1,249 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Metrics file of every step; set it to an empty string to turn the metrics off
+METRICS_ENV = "HOUSING_METRICS_FILE"
+# Shared by a script and the scripts it starts, so one run's records can be grouped
+RUN_ID_ENV = "HOUSING_RUN_ID"
+DEFAULT_METRICS_FILE = "results/metrics/stages.jsonl"
+
+_metrics_file = None
+_suspended = False
+_active_steps = contextvars.ContextVar('active_steps', default=())
+# Running steps of every thread, which share the process's peak memory
+_running_steps = set()
+_running_lock = threading.Lock()
+
+
+def configure_metrics(path=DEFAULT_METRICS_FILE):
+    """
+    Sets the JSON lines file the steps of this process are appended to.
+
+    Until it is called, steps are measured but not written. The
+    HOUSING_METRICS_FILE environment variable takes precedence over `path`.
+
+    Parameters:
+        path (str): Metrics file, or None to stop writing.
+
+    Returns:
+        str: The metrics file in use, or None.
+    """
+    global _metrics_file
+    _metrics_file = os.environ.get(METRICS_ENV, path) or None
+    return _metrics_file
+
+
+@contextmanager
+def metrics_suspended():
+    """
+    Turns the steps of this process into no-ops for the duration of the block.
+
+    Nothing is measured or written, e.g. while a benchmark times code that
+    is itself instrumented.
+    """
+    global _suspended
+    previous, _suspended = _suspended, True
+    try:
+        yield
+    finally:
+        _suspended = previous
+
+
+def run_id():
+    """
+    Returns the id of the current run, creating it (and exporting it to child processes) if needed.
+    """
+    return os.environ.setdefault(RUN_ID_ENV, uuid.uuid4().hex[:12])
+
+
+def _peak_rss_bytes():
+    # VmHWM is the peak resident set size since the last reset, on Linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _reset_peak_rss():
+    # Only supported on Linux; elsewhere peaks are measured since the process started
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _start_peak(current):
+    """
+    Resets the peak memory for a new step, first folding the peak so far into every running step.
+
+    The peak is shared by the whole process, so a reset would otherwise lose
+    what enclosing steps, and steps of other threads, used before it.
+    """
+    with _running_lock:
+        peak = _peak_rss_bytes()
+        for running in _running_steps:
+            running.peak = max(running.peak, peak)
+        _reset_peak_rss()
+        _running_steps.add(current)
+
+
+def _finish_peak(current):
+    with _running_lock:
+        _running_steps.discard(current)
+        return max(_peak_rss_bytes(), current.peak)
+
+
+class Step:
+    """
+    Measurements of one running step, as yielded by `step`.
+
+    Attributes:
+        name (str): Name of the step.
+        path (str): Names of the enclosing steps and this one, joined by '/'.
+        rows (int): Rows processed so far, or None if not counted.
+        fields (dict): Extra values written with the record.
+        record (dict): The written record, once the step has finished.
+    """
+
+    def __init__(self, name, path, rows=None, fields=None):
+        self.name = name
+        self.path = path
+        self.rows = rows
+        self.fields = fields or {}
+        self.record = None
+        # Peak memory of the step before later resets, see `_start_peak`
+        self.peak = 0
+
+    def add_rows(self, n):
+        self.rows = (self.rows or 0) + int(n)
+
+
+@contextmanager
+def step(name, rows=None, **fields):
+    """
+    Measures a block of code and appends its metrics to the configured file.
+
+    Records wall time, CPU time of the process, peak resident memory and,
+    when known, the rows processed and rows per second. Steps nest: a step
+    started inside another one is recorded under its parent's path, and the
+    parent's peak includes its children's, and any earlier peak of its own.
+    Steps running concurrently in other threads count towards each other's
+    peaks, as they share the process's memory. Child processes are not
+    counted.
+
+    Parameters:
+        name (str): Name of the step.
+        rows (int): Rows processed, if known up front; see also `record_rows`.
+        **fields: Extra JSON-serializable values written with the record.
+
+    Yields:
+        Step: The running step, whose `rows` can be updated.
+    """
+    if _suspended:
+        yield Step(name, name, rows, fields)
+        return
+    parents = _active_steps.get()
+    current = Step(name, "/".join([parent.name for parent in parents] + [name]), rows, fields)
+    token = _active_steps.set(parents + (current,))
+    run = run_id()
+
+    _start_peak(current)
+    started_at = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    status = 'ok'
+    try:
+        yield current
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        wall_seconds = time.perf_counter() - start_wall
+        cpu_seconds = time.process_time() - start_cpu
+        peak = _finish_peak(current)
+        _active_steps.reset(token)
+
+        current.record = {
+            'run_id': run,
+            'step': current.path,
+            'name': name,
+            'status': status,
+            'started_at': started_at,
+            'wall_seconds': round(wall_seconds, 6),
+            'cpu_seconds': round(cpu_seconds, 6),
+            'peak_rss_mb': round(peak / 1e6, 1),
+            'rows': current.rows,
+            'rows_per_second': round(current.rows / wall_seconds, 1) if current.rows and wall_seconds > 0 else None,
+            'pid': os.getpid(),
+            **current.fields,
+        }
+        _write(current.record)
+
+
+def _write(record):
+    if not _metrics_file:
+        return
+    directory = os.path.dirname(_metrics_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # One short append per record, so concurrent scripts don't interleave lines
+    with open(_metrics_file, 'a') as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+def record_rows(n):
+    """
+    Adds `n` to the rows processed by the innermost running step, if any.
+    """
+    steps = _active_steps.get()
+    if steps:
+        steps[-1].add_rows(n)
+
+
+def instrumented(name=None, rows_from=None):
+    """
+    Decorator running a function inside a `step`.
+
+    Parameters:
+        name (str): Name of the step; defaults to the function's name.
+        rows_from (str): Argument whose length is the number of rows processed, e.g. 'df'.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(func):
+        signature = inspect.signature(func) if rows_from else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows = None
+            if rows_from:
+                data = signature.bind(*args, **kwargs).arguments.get(rows_from)
+                rows = len(data) if hasattr(data, '__len__') else None
+            with step(name or func.__name__, rows=rows):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def read_metrics(path=DEFAULT_METRICS_FILE):
+    """
+    Reads a metrics file into a dataframe, one row per recorded step.
+    """
+    import pandas as pd
+    return pd.read_json(path, lines=True)
@@ -0,0 +1,351 @@
+import os
+
+import pandas as pd
+
+from src.dtype_utils import to_compact
+from src.instrumentation import instrumented, record_rows
+from src.validation_utils import HOUSING_SCHEMA
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; everything falls back to CSV
+    pa = None
+
+# Parse types of the schema dtypes: integers are parsed nullable, so missing
+# values reach validation rather than failing the parse
+PANDAS_PARSE_TYPES = {"float64": "float64", "int64": "Int64", "object": str}
+
+
+def columnar_path(csv_path):
+    """
+    Returns the path of the Feather file cached next to a processed CSV file.
+
+    Parameters:
+        csv_path (str): Path to the processed CSV file.
+
+    Returns:
+        str: The same path with a .feather extension.
+    """
+    return os.path.splitext(csv_path)[0] + ".feather"
+
+
+def _arrow_types(schema):
+    types = {"float64": pa.float64(), "int64": pa.int64(), "object": pa.string()}
+    return {col: types[dtype] for col, dtype in schema.dtypes.items() if dtype in types}
+
+
+def _csv_options(schema, columns, block_size=None):
+    read_options = pa_csv.ReadOptions(use_threads=True, **({'block_size': block_size} if block_size else {}))
+    convert_options = pa_csv.ConvertOptions(column_types=_arrow_types(schema), include_columns=columns or [],
+                                            strings_can_be_null=True)
+    return {'read_options': read_options, 'convert_options': convert_options}
+
+
+def _from_nullable(df):
+    # Nullable integers from the C engine become int64, or float64 when values are missing, as pandas infers them
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.Int64Dtype):
+            df[col] = df[col].astype("float64" if df[col].isna().any() else "int64")
+    return df
+
+
+def _parse_error(path, error):
+    return ValueError(f"Type error while parsing {path}: {error}")
+
+
+def read_csv_typed(path, columns=None, schema=HOUSING_SCHEMA, engine=None):
+    """
+    Reads a CSV file with the dtypes declared by a schema, parsing only the requested columns.
+
+    With pyarrow the file is parsed by its multi-threaded reader; otherwise
+    pandas' C engine is used. Values that don't parse as their declared type
+    fail the read instead of being inferred as strings. Missing values are
+    allowed, so an integer column with gaps comes back as float64 and is
+    reported by validation. Columns outside the schema are inferred.
+    Compressed files (e.g. .csv.gz) are decompressed on the fly.
+
+    Parameters:
+        path (str): Path to the CSV file.
+        columns (list, optional): Columns to read, in the order returned. Reads all columns if None.
+        schema (Schema): Declares the dtype of the schema columns.
+        engine (str, optional): 'pyarrow' or 'c'; defaults to pyarrow when it is installed.
+
+    Returns:
+        pd.DataFrame: The parsed columns.
+
+    Raises:
+        ValueError: If a value can't be parsed as its column's type, or a requested column is missing.
+    """
+    engine = engine or ('pyarrow' if pa is not None else 'c')
+    if engine == 'pyarrow':
+        try:
+            table = pa_csv.read_csv(pa.input_stream(path, compression='detect'), **_csv_options(schema, columns))
+        except (pa.ArrowInvalid, pa.ArrowKeyError) as error:
+            raise _parse_error(path, error) from None
+        return table.to_pandas()
+
+    dtypes = {col: PANDAS_PARSE_TYPES[dtype] for col, dtype in schema.dtypes.items() if dtype in PANDAS_PARSE_TYPES}
+    try:
+        df = pd.read_csv(path, usecols=columns, dtype=dtypes, engine='c')
+    except (ValueError, TypeError) as error:
+        raise _parse_error(path, error) from None
+    return _from_nullable(df[columns] if columns else df)
+
+
+def iter_csv_typed(path, chunksize=100_000, columns=None, schema=HOUSING_SCHEMA, engine=None):
+    """
+    Yields a CSV file in chunks of `chunksize` rows, parsed like `read_csv_typed`.
+
+    Parameters:
+        path (str): Path to the CSV file.
+        chunksize (int): Number of rows per chunk (the last chunk may be shorter).
+        columns (list, optional): Columns to read. Reads all columns if None.
+        schema (Schema): Declares the dtype of the schema columns.
+        engine (str, optional): 'pyarrow' or 'c'; defaults to pyarrow when it is installed.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks.
+    """
+    engine = engine or ('pyarrow' if pa is not None else 'c')
+    if engine == 'pyarrow':
+        # Blocks of roughly a chunk each (at ~64 bytes per row), regrouped into exact chunks
+        block_size = min(max(chunksize * 64, 1 << 20), 1 << 28)
+        try:
+            reader = pa_csv.open_csv(pa.input_stream(path, compression='detect'),
+                                     **_csv_options(schema, columns, block_size))
+            batches, n_buffered = [], 0
+            for batch in reader:
+                batches.append(batch)
+                n_buffered += batch.num_rows
+                while n_buffered >= chunksize:
+                    table = pa.Table.from_batches(batches)
+                    yield table.slice(0, chunksize).to_pandas()
+                    batches = table.slice(chunksize).to_batches()
+                    n_buffered -= chunksize
+            if n_buffered:
+                yield pa.Table.from_batches(batches).to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowKeyError) as error:
+            raise _parse_error(path, error) from None
+        return
+
+    dtypes = {col: PANDAS_PARSE_TYPES[dtype] for col, dtype in schema.dtypes.items() if dtype in PANDAS_PARSE_TYPES}
+    try:
+        for chunk in pd.read_csv(path, usecols=columns, dtype=dtypes, engine='c', chunksize=chunksize):
+            yield _from_nullable(chunk[columns] if columns else chunk)
+    except (ValueError, TypeError) as error:
+        raise _parse_error(path, error) from None
+
+
+@instrumented(rows_from='df')
+def write_processed(df, csv_path):
+    """
+    Writes a processed dataframe as CSV and, when pyarrow is available,
+    as an uncompressed Feather file that can be memory-mapped on read.
+
+    Parameters:
+        df (pd.DataFrame): The processed data.
+        csv_path (str): Path to the CSV file to write.
+    """
+    df.to_csv(csv_path, index=False)
+    if pa is not None:
+        feather.write_feather(df.reset_index(drop=True), columnar_path(csv_path), compression="uncompressed")
+
+
+@instrumented()
+def read_processed(csv_path, columns=None):
+    """
+    Reads a processed data file, preferring its Feather cache.
+
+    The Feather file is memory-mapped and only the requested columns are
+    materialized. It is used only if it is at least as new as the CSV
+    file, so a CSV edited or regenerated by hand is never shadowed.
+    Either way the result uses the compact housing dtypes.
+
+    Parameters:
+        csv_path (str): Path to the processed CSV file.
+        columns (list, optional): Columns to read. Reads all columns if None.
+
+    Returns:
+        pd.DataFrame: The processed data.
+    """
+    cache = columnar_path(csv_path)
+    if (pa is not None and os.path.exists(cache)
+            and (not os.path.exists(csv_path) or os.path.getmtime(cache) >= os.path.getmtime(csv_path))):
+        df = feather.read_table(cache, columns=columns, memory_map=True).to_pandas()
+    else:
+        df = read_csv_typed(csv_path, columns=columns)
+    record_rows(len(df))
+    return to_compact(df)
+
+
+def iter_processed(csv_path, chunksize=100_000, columns=None):
+    """
+    Yields a processed data file in chunks, preferring its Feather cache.
+
+    From the Feather cache, record batches are sliced out of the
+    memory-mapped file, so only one chunk is materialized at a time.
+
+    Parameters:
+        csv_path (str): Path to the processed CSV file.
+        chunksize (int): Number of rows per chunk.
+        columns (list, optional): Columns to read. Reads all columns if None.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks with compact dtypes.
+    """
+    cache = columnar_path(csv_path)
+    if (pa is not None and os.path.exists(cache)
+            and (not os.path.exists(csv_path) or os.path.getmtime(cache) >= os.path.getmtime(csv_path))):
+        table = feather.read_table(cache, columns=columns, memory_map=True)
+        for start in range(0, table.num_rows, chunksize):
+            yield to_compact(table.slice(start, chunksize).to_pandas())
+    else:
+        for chunk in iter_csv_typed(csv_path, chunksize=chunksize, columns=columns):
+            yield to_compact(chunk)
+
+
+def _resolve_null_types(schema):
+    # Columns without a single value are typed null by Arrow, which no later chunk could be cast to
+    types = _arrow_types(HOUSING_SCHEMA)
+    return pa.schema([field.with_type(types[field.name]) if pa.types.is_null(field.type) and field.name in types
+                      else field for field in schema], metadata=schema.metadata)
+
+
+class ProcessedWriter:
+    """
+    Appends chunks to a processed CSV file and its Feather cache.
+
+    The first non-empty chunk fixes the Arrow schema; later chunks are cast
+    to it. Columns it holds no values for (e.g. all missing) take their
+    type from the housing schema. If a chunk cannot be cast, the Feather cache is abandoned and only the
+    CSV file is written, so readers fall back to it.
+
+    With `append=True`, chunks are added after the existing rows of the
+    files. An Arrow file can't be extended in place, so its record batches
+    are copied (memory-mapped) into a new cache that replaces it on close.
+
+    Example:
+        with ProcessedWriter("../data/processed/train.csv") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, csv_path, append=False):
+        self.csv_path = csv_path
+        self._header = not (append and os.path.exists(csv_path))
+        self._writer = None
+        self._schema = None
+        self._columnar = pa is not None
+        self._existing = None
+        cache = columnar_path(csv_path)
+        if not self._header:
+            if self._columnar and os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(csv_path):
+                self._existing = feather.read_table(cache, memory_map=True)
+            else:
+                # Without an up-to-date cache to extend, readers fall back to the CSV file
+                self._columnar = False
+        if self._existing is None and os.path.exists(cache):
+            os.remove(cache)
+
+    def write(self, df):
+        df.to_csv(self.csv_path, mode="w" if self._header else "a", header=self._header, index=False)
+        self._header = False
+        if not self._columnar:
+            return
+
+        if self._writer is None and self._existing is None and len(df) == 0:
+            # An empty chunk has no types to fix the schema with
+            return
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        try:
+            if self._writer is None:
+                self._schema = self._existing.schema if self._existing is not None else _resolve_null_types(table.schema)
+                self._writer = pa.ipc.new_file(self._target(), self._schema,
+                                               options=pa.ipc.IpcWriteOptions(compression=None))
+                if self._existing is not None:
+                    self._writer.write_table(self._existing)
+            self._writer.write_table(table.cast(self._schema))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            print(f"Columnar cache disabled for {self.csv_path}: chunk does not match schema {self._schema}.")
+            self._abandon()
+
+    def _target(self):
+        # An appended cache is built next to the one it extends
+        return columnar_path(self.csv_path) + (".tmp" if self._existing is not None else "")
+
+    def _abandon(self):
+        self._columnar = False
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for path in {self._target(), columnar_path(self.csv_path)}:
+            if os.path.exists(path):
+                os.remove(path)
+        self._existing = None
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            if self._existing is not None:
+                self._existing = None
+                os.replace(columnar_path(self.csv_path) + ".tmp", columnar_path(self.csv_path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def processed_size(csv_path):
+    """
+    Returns the size of a processed CSV file and the rows of its Feather cache, to restore them with `truncate_processed`.
+
+    Parameters:
+        csv_path (str): Path to the processed CSV file.
+
+    Returns:
+        tuple: Bytes of the CSV file, and rows of its Feather cache (None
+        without pyarrow or an up-to-date cache).
+    """
+    cache = columnar_path(csv_path)
+    rows = None
+    if pa is not None and os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(csv_path):
+        rows = feather.read_table(cache, columns=[], memory_map=True).num_rows
+    return os.path.getsize(csv_path), rows
+
+
+def truncate_processed(csv_path, csv_bytes, cache_rows):
+    """
+    Cuts a processed CSV file and its Feather cache back to the sizes returned by `processed_size`.
+
+    Rows appended after those sizes were recorded are dropped, e.g. by an
+    interrupted append. A cache that can't be cut back is removed, so
+    readers fall back to the CSV file.
+
+    Parameters:
+        csv_path (str): Path to the processed CSV file.
+        csv_bytes (int): Size of the CSV file to restore.
+        cache_rows (int): Rows of the Feather cache to restore, or None to remove the cache.
+    """
+    with open(csv_path, 'r+b') as f:
+        f.truncate(csv_bytes)
+    cache = columnar_path(csv_path)
+    if os.path.exists(cache + ".tmp"):
+        os.remove(cache + ".tmp")
+    if not os.path.exists(cache):
+        return
+    table = feather.read_table(cache, memory_map=True) if pa is not None and cache_rows is not None else None
+    if table is None or table.num_rows < cache_rows:
+        os.remove(cache)
+    elif table.num_rows > cache_rows:
+        with pa.ipc.new_file(cache + ".tmp", table.schema, options=pa.ipc.IpcWriteOptions(compression=None)) as writer:
+            writer.write_table(table.slice(0, cache_rows))
+        del table
+        os.replace(cache + ".tmp", cache)
+    else:
+        # Unchanged, but it must stay at least as new as the truncated CSV file to be used
+        os.utime(cache)
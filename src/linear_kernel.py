@@ -0,0 +1,158 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+class LinearKernel:
+    """
+    Pure-NumPy scoring kernel equivalent to a fitted one-hot/scaler/linear pipeline.
+
+    The encoder, scaler and linear model are folded into one slope per
+    numeric feature plus an intercept table with one entry per combination
+    of categorical levels (16 entries for the four Y/N flags), so scoring is
+    `table[combination] + numeric @ slopes`.
+
+    Attributes:
+        categorical_features (list): Names of the categorical features.
+        categories (list): Levels of each categorical feature, in encoder order.
+        numeric_features (list): Names of the numeric features.
+        slopes (np.ndarray): Weight of each raw (unscaled) numeric feature.
+        table (np.ndarray): Intercept for every combination of categorical levels.
+    """
+
+    def __init__(self, categorical_features, categories, numeric_features, slopes, table):
+        self.categorical_features = list(categorical_features)
+        self.categories = [list(levels) for levels in categories]
+        self.numeric_features = list(numeric_features)
+        self.slopes = np.asarray(slopes, dtype="float64")
+        self.table = np.asarray(table, dtype="float64")
+        # Mixed-radix place value of each categorical feature in the table index
+        sizes = [len(levels) for levels in self.categories]
+        self.radix = np.array([int(np.prod(sizes[i + 1:])) for i in range(len(sizes))], dtype="int64")
+
+    def combination_index(self, data):
+        """
+        Returns the intercept table index of every row.
+        """
+        index = np.zeros(len(data[self.numeric_features[0]] if self.numeric_features
+                             else data[self.categorical_features[0]]), dtype="int64")
+        for feature, levels, place in zip(self.categorical_features, self.categories, self.radix):
+            codes = pd.Categorical(data[feature], categories=levels).codes
+            if (codes < 0).any():
+                raise ValueError(f"Found unknown categories in column '{feature}' during predict.")
+            index += codes.astype("int64") * place
+        return index
+
+    def predict(self, data):
+        """
+        Scores a DataFrame or dict of columns.
+
+        Parameters:
+            data (pd.DataFrame or dict): Must contain every feature column.
+
+        Returns:
+            np.ndarray: One prediction per row.
+        """
+        numeric = np.column_stack([np.asarray(data[feature], dtype="float64") for feature in self.numeric_features])
+        return self.table[self.combination_index(data)] + numeric @ self.slopes
+
+
+def describe_pipeline(pipeline):
+    """
+    Extracts the fitted parameters of a ColumnTransformer(OneHotEncoder, StandardScaler) + linear model pipeline.
+
+    Parameters:
+        pipeline (sklearn.pipeline.Pipeline): Pipeline as saved by model_fitting.py.
+
+    Returns:
+        dict: Plain lists and floats: one entry per transformer under
+        'transformers' (category levels, or scaler mean and scale) and the
+        coefficients, intercept and alpha under 'model'.
+    """
+    preprocessor, model = pipeline[0], pipeline[-1]
+    transformers = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or len(columns) == 0:
+            continue
+        kind = type(transformer).__name__
+        if kind == 'OneHotEncoder':
+            if transformer.drop_idx_ is not None:
+                raise ValueError("OneHotEncoder with drop is not supported by the linear kernel.")
+            transformers.append({'type': 'one_hot', 'columns': list(columns),
+                                 'categories': [np.asarray(levels).tolist() for levels in transformer.categories_]})
+        elif kind == 'StandardScaler':
+            # mean_ and scale_ can be fitted even when the scaler doesn't apply them
+            mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+            scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+            transformers.append({'type': 'standard_scaler', 'columns': list(columns),
+                                 'mean': np.asarray(mean, dtype="float64").tolist(),
+                                 'scale': np.asarray(scale, dtype="float64").tolist()})
+        else:
+            raise ValueError(f"Transformer '{name}' ({kind}) is not supported by the linear kernel.")
+
+    return {
+        'transformers': transformers,
+        'model': {
+            'type': type(model).__name__,
+            'coef': np.ravel(model.coef_).astype("float64").tolist(),
+            'intercept': float(model.intercept_),
+            'alpha': float(model.alpha_) if hasattr(model, 'alpha_') else getattr(model, 'alpha', None),
+        },
+    }
+
+
+def build_kernel(description):
+    """
+    Folds the parameters returned by `describe_pipeline` into a LinearKernel.
+
+    Parameters:
+        description (dict): Output of `describe_pipeline`.
+
+    Returns:
+        LinearKernel: Kernel giving the same predictions as the described pipeline.
+    """
+    coef = np.asarray(description['model']['coef'], dtype="float64")
+    constant = float(description['model']['intercept'])
+
+    categorical_features, categories, contributions = [], [], []
+    numeric_features, slopes = [], []
+    offset = 0
+    for transformer in description['transformers']:
+        columns = transformer['columns']
+        if transformer['type'] == 'one_hot':
+            for column, levels in zip(columns, transformer['categories']):
+                categorical_features.append(column)
+                categories.append(list(levels))
+                contributions.append(coef[offset:offset + len(levels)])
+                offset += len(levels)
+        elif transformer['type'] == 'standard_scaler':
+            mean = np.asarray(transformer['mean'], dtype="float64")
+            scale = np.asarray(transformer['scale'], dtype="float64")
+            block = coef[offset:offset + len(columns)]
+            numeric_features.extend(columns)
+            slopes.extend(block / scale)
+            constant -= float(np.sum(block * mean / scale))
+            offset += len(columns)
+        else:
+            raise ValueError(f"Unknown transformer type: {transformer['type']}")
+
+    if offset != len(coef):
+        raise ValueError(f"Pipeline has {len(coef)} coefficients but its transformers produce {offset} features.")
+
+    table = np.array([constant + sum(block[code] for block, code in zip(contributions, combination))
+                      for combination in itertools.product(*[range(len(levels)) for levels in categories])])
+    return LinearKernel(categorical_features, categories, numeric_features, slopes, table)
+
+
+def compile_pipeline(pipeline):
+    """
+    Folds a fitted ColumnTransformer(OneHotEncoder, StandardScaler) + linear model pipeline into a LinearKernel.
+
+    Parameters:
+        pipeline (sklearn.pipeline.Pipeline): Pipeline as saved by model_fitting.py.
+
+    Returns:
+        LinearKernel: Kernel giving the same predictions as `pipeline.predict`.
+    """
+    return build_kernel(describe_pipeline(pipeline))
@@ -2,23 +2,183 @@
 # author: Thamer Aldawood
 # date: 2024-12-05
 
-import pandas as pd
+import gzip
+import hashlib
+import http.client
+import json
 import os
+import shutil
+import time
+import urllib.error
+import urllib.request
 
-def load_csv(url, write_to, filename):
+from src.instrumentation import instrumented, step
+
+CHUNK_SIZE = 1 << 20
+
+
+def load_csv(url, write_to, filename, compress=False, sha256=None):
     """Downloads csv data from the web to a local filepath
     ----------------
 
+    The response is streamed to disk as is, see `download_file`.
+
     Example: load_csv(
     "https://hub.arcgis.com/api/v3/datasets/e3c5b04fccdc4ddd88059a8c0b6d8160_0/downloads/data?format=csv&spatialRefId=3776&where=1%3D1",
     "../data/raw",
     "Raw_2023_Property_Tax_Assessment.csv"
     )
     """
+    return download_file(url, os.path.join(write_to, filename), compress=compress, sha256=sha256)
+
+
+def metadata_path(path):
+    """
+    Returns the path of the JSON file recording where a download came from and its validators.
+    """
+    return path + ".download.json"
+
+
+def _read_metadata(path):
     try:
-        housing_df = pd.read_csv(url)
-        housing_df.to_csv(os.path.join(write_to, filename), index=False)
-    except:
-        os.makedirs(write_to)
-        housing_df = pd.read_csv(url)
-        housing_df.to_csv(os.path.join(write_to, filename), index=False)
\ No newline at end of file
+        with open(metadata_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_metadata(path, metadata):
+    with open(metadata_path(path) + ".tmp", 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(metadata_path(path) + ".tmp", metadata_path(path))
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest
+
+
+def _validators(response):
+    return {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+
+
+@instrumented()
+def download_file(url, path, compress=False, sha256=None, chunk_size=CHUNK_SIZE, retries=3, timeout=60):
+    """
+    Streams a URL to a file in chunks, resuming interrupted downloads and skipping unchanged ones.
+
+    Bytes are appended to `path + '.part'` as they arrive, so memory does not
+    grow with the file. If the connection drops, the download resumes with a
+    Range request, guarded by If-Range so a file that changed on the server
+    is downloaded afresh. Once complete, the file is moved into place and its
+    ETag and Last-Modified headers are saved next to it (see `metadata_path`);
+    the next call sends them as If-None-Match and If-Modified-Since, and a
+    304 response leaves the file untouched. The file is downloaded again,
+    unconditionally, if it was stored in the other format (see `compress`).
+
+    Parameters:
+        url (str): URL to download.
+        path (str): Destination file.
+        compress (bool): Store the file gzip-compressed (the download itself is kept uncompressed until it completes).
+        sha256 (str): Expected SHA-256 hex digest of the downloaded (uncompressed) bytes.
+        chunk_size (int): Bytes read and written at a time.
+        retries (int): Number of times an interrupted download is resumed.
+        timeout (float): Socket timeout in seconds.
+
+    Returns:
+        dict: 'status' ('downloaded', 'resumed' or 'not_modified'), 'path',
+        'bytes' received in this call, 'sha256', 'etag' and 'last_modified'.
+
+    Raises:
+        ValueError: If the downloaded bytes don't match `sha256`.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    part = path + ".part"
+    metadata = _read_metadata(path)
+    if metadata.get('url') != url:
+        metadata = {}
+
+    request_headers = {'Accept-Encoding': 'identity'}
+    unchanged_checksum = not sha256 or metadata.get('sha256') == sha256.lower()
+    # A 304 keeps the stored file as it is, so it must already be in the requested format
+    same_format = metadata.get('compressed') == bool(compress)
+    if os.path.exists(path) and not os.path.exists(part) and unchanged_checksum and same_format:
+        if metadata.get('etag'):
+            request_headers['If-None-Match'] = metadata['etag']
+        if metadata.get('last_modified'):
+            request_headers['If-Modified-Since'] = metadata['last_modified']
+
+    received, resumed, completed, restarted = 0, False, False, False
+    attempt = 0
+    while not completed:
+        headers = dict(request_headers)
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        partial = metadata.get('partial', {})
+        if offset and (partial.get('etag') or partial.get('last_modified')):
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = partial.get('etag') or partial['last_modified']
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:
+                validators = _validators(response)
+                if response.status == 206:
+                    resumed = True
+                    mode = 'ab'
+                else:
+                    # A full response: the server ignored the range or the file changed
+                    mode = 'wb'
+                    metadata['partial'] = validators
+                    metadata['url'] = url
+                    _write_metadata(path, metadata)
+                expected = int(response.headers.get('Content-Length', -1))
+                written = 0
+                with open(part, mode) as f:
+                    for block in iter(lambda: response.read(chunk_size), b''):
+                        f.write(block)
+                        written += len(block)
+                received += written
+                # urllib returns a short body rather than raising when the connection drops
+                if 0 <= written < expected:
+                    raise http.client.IncompleteRead(b'', expected - written)
+            completed = True
+        except urllib.error.HTTPError as error:
+            if error.code == 304:
+                return {'status': 'not_modified', 'path': path, 'bytes': 0, 'sha256': metadata.get('sha256'),
+                        'etag': metadata.get('etag'), 'last_modified': metadata.get('last_modified')}
+            if error.code == 416 and not restarted and os.path.exists(part):
+                # The partial file is no prefix of the current file: start over, once,
+                # without counting it as a retry
+                os.remove(part)
+                metadata.pop('partial', None)
+                restarted = True
+                continue
+            raise
+        except (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError):
+            if attempt == retries:
+                raise
+            time.sleep(min(2 ** attempt, 30) * 0.1)
+            attempt += 1
+
+    with step('verify'):
+        digest = _file_sha256(part).hexdigest()
+    if sha256 and digest != sha256.lower():
+        os.remove(part)
+        raise ValueError(f"Checksum mismatch for {url}: expected {sha256}, got {digest}.")
+
+    if compress:
+        with step('compress'), open(part, 'rb') as source, gzip.open(part + ".gz", 'wb', compresslevel=6) as target:
+            shutil.copyfileobj(source, target, chunk_size)
+        os.replace(part + ".gz", path)
+        os.remove(part)
+    else:
+        os.replace(part, path)
+
+    partial = metadata.pop('partial', {})
+    metadata.update({'url': url, 'sha256': digest, 'compressed': bool(compress), **partial})
+    _write_metadata(path, metadata)
+    return {'status': 'resumed' if resumed else 'downloaded', 'path': path, 'bytes': received, 'sha256': digest,
+            'etag': metadata.get('etag'), 'last_modified': metadata.get('last_modified')}
@@ -0,0 +1,73 @@
+import json
+import os
+from importlib.metadata import PackageNotFoundError, version
+
+from src.linear_kernel import build_kernel, describe_pipeline
+
+ARTIFACT_FORMAT = "housing-linear-model"
+SCHEMA_VERSION = 1
+
+
+def _library_version(package):
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return None
+
+
+def save_artifact(pipeline, path, version=1, n_rows=None):
+    """
+    Exports a fitted preprocessor + Ridge pipeline as a pickle-free JSON artifact.
+
+    The artifact holds only plain values: category levels, scaler mean and
+    scale, coefficients, intercept and the chosen alpha, plus a schema
+    version. Floats are written with full precision, so the loaded model
+    predicts what the pipeline predicts.
+
+    Parameters:
+        pipeline (sklearn.pipeline.Pipeline): Pipeline as saved by model_fitting.py.
+        path (str): Path of the .json file to write.
+        version (int): Model version, incremented by every online update.
+        n_rows (int): Number of training rows the model has seen, if known.
+
+    Returns:
+        dict: The artifact that was written.
+    """
+    artifact = {
+        'format': ARTIFACT_FORMAT,
+        'schema_version': SCHEMA_VERSION,
+        'trained_with': {'scikit-learn': _library_version('scikit-learn'), 'numpy': _library_version('numpy')},
+        'model_version': version,
+        'n_rows': n_rows,
+        **describe_pipeline(pipeline),
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(artifact, f, indent=2)
+    os.replace(tmp_path, path)
+    return artifact
+
+
+def load_artifact(path):
+    """
+    Loads a JSON artifact written by `save_artifact` as a LinearKernel, without importing sklearn.
+
+    Parameters:
+        path (str): Path of the .json artifact.
+
+    Returns:
+        LinearKernel: Model with a `predict` method.
+    """
+    with open(path) as f:
+        artifact = json.load(f)
+    if artifact.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"{path} is not a {ARTIFACT_FORMAT} artifact.")
+    if artifact.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported artifact schema version {artifact.get('schema_version')} "
+                         f"(this version reads {SCHEMA_VERSION}).")
+    kernel = build_kernel(artifact)
+    kernel.alpha = artifact['model'].get('alpha')
+    return kernel
@@ -1,8 +1,97 @@
 
+import json
+import os
+import time
+
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import cross_validate
+import scipy.sparse
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.linear_model import RidgeCV
+from sklearn.model_selection import KFold
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import FunctionTransformer
+
+from src.instrumentation import instrumented, record_rows
+
+
+def _take(data, idx):
+    return data.iloc[idx] if hasattr(data, 'iloc') else data[idx]
+
+
+def _evaluate_fold(preprocessor, models, X, y, train_idx, test_idx):
+    """
+    Fits the preprocessor once on a fold and evaluates every model on the
+    transformed design matrices.
+    """
+    X_fold_train, y_fold_train = _take(X, train_idx), _take(y, train_idx)
+    X_fold_test, y_fold_test = _take(X, test_idx), _take(y, test_idx)
+
+    start = time.perf_counter()
+    fold_preprocessor = clone(preprocessor).fit(X_fold_train, y_fold_train)
+    Xt_train = fold_preprocessor.transform(X_fold_train)
+    Xt_test = fold_preprocessor.transform(X_fold_test)
+    preprocess_time = time.perf_counter() - start
+
+    results = {}
+    for name, model in models.items():
+        start = time.perf_counter()
+        estimator = clone(model).fit(Xt_train, y_fold_train)
+        fit_time = time.perf_counter() - start
 
-def perform_cross_validation_and_save(pipeline, X_train, y_train, results_path, cv=5):
+        start = time.perf_counter()
+        test_score = estimator.score(Xt_test, y_fold_test)
+        score_time = time.perf_counter() - start
+
+        results[name] = {
+            'fit_time': preprocess_time + fit_time,
+            'score_time': score_time,
+            'test_score': test_score,
+            'train_score': estimator.score(Xt_train, y_fold_train),
+        }
+    return results
+
+
+@instrumented(rows_from='X_train')
+def cross_validate_models(models, preprocessor, X_train, y_train, cv=5, n_jobs=None):
+    """
+    Cross-validates several models on the same folds, in parallel across folds.
+
+    The fold indices are computed once (unshuffled KFold, as `cross_validate`
+    uses for regressors). On each fold the preprocessor is fitted once and
+    its transformed design matrices are shared by every model.
+
+    Parameters:
+        models: dict
+            Model name to unfitted sklearn estimator.
+        preprocessor: sklearn transformer
+            Transformer applied before every model; refitted on each fold.
+        X_train: pd.DataFrame
+            Training features.
+        y_train: pd.Series
+            Training target.
+        cv: int
+            Number of cross-validation folds.
+        n_jobs: int
+            Number of worker processes; -1 uses every core.
+
+    Returns:
+        dict: Model name to a pd.DataFrame of cross-validation results with
+        mean and standard deviation, in the format of `cross_validate`.
+    """
+    folds = list(KFold(n_splits=cv).split(X_train))
+    per_fold = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(preprocessor, models, X_train, y_train, train_idx, test_idx)
+        for train_idx, test_idx in folds
+    )
+    return {
+        name: pd.DataFrame([fold[name] for fold in per_fold]).agg(['mean', 'std']).round(3).T
+        for name in models
+    }
+
+
+def perform_cross_validation_and_save(pipeline, X_train, y_train, results_path, cv=5, n_jobs=None):
     """
     Performs cross-validation on a given pipeline and training data,
     and saves the results to a specified path.
@@ -18,16 +107,261 @@ def perform_cross_validation_and_save(pipeline, X_train, y_train, results_path,
             Path to save the cross-validation results.
         cv: int
             Number of cross-validation folds.
+        n_jobs: int
+            Number of worker processes; -1 uses every core.
 
     Returns:
         pd.DataFrame: Cross-validation results with mean and standard deviation.
     """
     # Perform cross-validation
-    cross_val_results = pd.DataFrame(
-        cross_validate(pipeline, X_train, y_train, cv=cv, return_train_score=True)
-    ).agg(['mean', 'std']).round(3).T
+    preprocessor = pipeline[:-1] if len(pipeline.steps) > 1 else FunctionTransformer()
+    cross_val_results = cross_validate_models(
+        {'model': pipeline[-1]}, preprocessor, X_train, y_train, cv=cv, n_jobs=n_jobs
+    )['model']
 
     # Save results to CSV
     cross_val_results.to_csv(results_path)
 
-    return cross_val_results
\ No newline at end of file
+    return cross_val_results
+
+
+class RidgeStatistics:
+    """
+    Mergeable sufficient statistics of a linear regression problem.
+
+    Keeps the row count, the means of the design matrix columns and the
+    target, and their centered co-moment matrix (X^T X, X^T y and y^T y
+    about the means). Chunks are folded in with the pairwise update of
+    Chan et al., which stays accurate when the means are large, and
+    statistics gathered by different workers can be merged the same way.
+    """
+
+    def __init__(self, n_features):
+        self.n = 0
+        self.mean = np.zeros(n_features + 1)
+        self.comoment = np.zeros((n_features + 1, n_features + 1))
+
+    def _combine(self, n, mean, comoment):
+        total = self.n + n
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.n * n / total)
+        self.mean += delta * (n / total)
+        self.n = total
+
+    def update(self, X, y):
+        """
+        Folds a chunk of design matrix rows and targets into the statistics.
+        """
+        Z = np.column_stack([X, y]).astype("float64")
+        if len(Z) == 0:
+            return self
+        mean = Z.mean(axis=0)
+        centered = Z - mean
+        self._combine(len(Z), mean, centered.T @ centered)
+        return self
+
+    def merge(self, other):
+        """
+        Folds the statistics of another worker into these.
+        """
+        if other.n:
+            self._combine(other.n, other.mean, other.comoment)
+        return self
+
+    def solve(self, alpha):
+        """
+        Returns the ridge coefficients and intercept for a given alpha.
+        """
+        Sxx, Sxy = self.comoment[:-1, :-1], self.comoment[:-1, -1]
+        coef = np.linalg.solve(Sxx + alpha * np.eye(len(Sxx)), Sxy)
+        intercept = self.mean[-1] - self.mean[:-1] @ coef
+        return coef, intercept
+
+    def save(self, path, **metadata):
+        """
+        Writes the statistics, plus JSON-serializable metadata, to a .npz file.
+        """
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, n=self.n, mean=self.mean, comoment=self.comoment, metadata=json.dumps(metadata))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads statistics written by `save`.
+
+        Returns:
+            tuple: The RidgeStatistics and the metadata saved with them.
+        """
+        with np.load(path) as saved:
+            stats = cls(len(saved['mean']) - 1)
+            stats.n, stats.mean, stats.comoment = int(saved['n']), saved['mean'].copy(), saved['comoment'].copy()
+            return stats, json.loads(str(saved['metadata']))
+
+    def gcv_errors(self, alphas):
+        """
+        Returns the generalized cross-validation error of each alpha.
+        """
+        Sxx, Sxy, Syy = self.comoment[:-1, :-1], self.comoment[:-1, -1], self.comoment[-1, -1]
+        eigvals, eigvecs = np.linalg.eigh(Sxx)
+        projected = eigvecs.T @ Sxy
+        errors = []
+        for alpha in alphas:
+            coef_rotated = projected / (eigvals + alpha)
+            rss = Syy - 2 * coef_rotated @ projected + coef_rotated @ (eigvals * coef_rotated)
+            # The unpenalized intercept adds one degree of freedom
+            dof = 1 + np.sum(eigvals / (eigvals + alpha))
+            errors.append(rss / self.n / (1 - dof / self.n) ** 2)
+        return np.array(errors)
+
+
+def _design_chunk(preprocessor, chunk, target):
+    X = preprocessor.transform(chunk.drop(columns=[target]))
+    if scipy.sparse.issparse(X):
+        X = X.toarray()
+    return np.asarray(X, dtype="float64"), chunk[target].to_numpy(dtype="float64")
+
+
+@instrumented()
+def fit_ridge_out_of_core(preprocessor, chunks, alphas=(0.1, 1.0, 10.0), target="assess_2022", alpha_selection="loo",
+                          return_statistics=False):
+    """
+    Fits a Ridge regression pipeline from streamed chunks of training data.
+
+    The design matrix of each chunk is accumulated into RidgeStatistics, so
+    memory does not grow with the number of rows. The alpha is chosen like
+    RidgeCV: by exact leave-one-out error (`alpha_selection="loo"`), which
+    needs a second pass over the chunks to compute each row's leverage, or
+    by generalized cross-validation (`"gcv"`) from the statistics alone.
+
+    Parameters:
+        preprocessor: sklearn transformer
+            Already fitted preprocessor, e.g. the one saved by preprocess_data.py.
+        chunks: callable
+            Function returning a fresh iterator of training dataframes
+            (called twice for "loo"), e.g. `lambda: iter_processed(path)`.
+        alphas: tuple
+            Candidate regularization strengths, RidgeCV's defaults by default.
+        target: str
+            Name of the target column.
+        alpha_selection: str
+            "loo" or "gcv".
+        return_statistics: bool
+            Also return the RidgeStatistics, e.g. to update the model later.
+
+    Returns:
+        sklearn.pipeline.Pipeline: The preprocessor followed by a fitted
+        RidgeCV, with the same interface as ridge_pipeline.pickle (and the
+        RidgeStatistics if `return_statistics`).
+    """
+    stats = None
+    for chunk in chunks():
+        if len(chunk) == 0:
+            continue
+        X, y = _design_chunk(preprocessor, chunk, target)
+        if stats is None:
+            stats = RidgeStatistics(X.shape[1])
+        stats.update(X, y)
+        record_rows(len(y))
+    if stats is None:
+        raise ValueError("Cannot fit the Ridge model: no training rows.")
+
+    solutions = [stats.solve(alpha) for alpha in alphas]
+
+    if alpha_selection == "gcv":
+        errors = stats.gcv_errors(alphas)
+    elif alpha_selection == "loo":
+        Sxx = stats.comoment[:-1, :-1]
+        inverses = [np.linalg.inv(Sxx + alpha * np.eye(len(Sxx))) for alpha in alphas]
+        squared_errors = np.zeros(len(alphas))
+        for chunk in chunks():
+            if len(chunk) == 0:
+                continue
+            X, y = _design_chunk(preprocessor, chunk, target)
+            centered = X - stats.mean[:-1]
+            for i, ((coef, intercept), inverse) in enumerate(zip(solutions, inverses)):
+                leverage = 1 / stats.n + np.einsum("ij,jk,ik->i", centered, inverse, centered)
+                residual = y - (X @ coef + intercept)
+                squared_errors[i] += np.sum((residual / (1 - leverage)) ** 2)
+        errors = squared_errors / stats.n
+    else:
+        raise ValueError(f"Unknown alpha selection: {alpha_selection}")
+
+    best = int(np.argmin(errors))
+    pipeline = make_pipeline(preprocessor, _fitted_ridge(alphas, alphas[best], *solutions[best], best_score=-errors[best]))
+    return (pipeline, stats) if return_statistics else pipeline
+
+
+def _fitted_ridge(alphas, alpha, coef, intercept, best_score=None):
+    # A RidgeCV that predicts like one fitted with these coefficients
+    ridge = RidgeCV(alphas=alphas)
+    ridge.alpha_ = alpha
+    ridge.best_score_ = best_score
+    ridge.coef_, ridge.intercept_ = coef, intercept
+    ridge.n_features_in_ = len(coef)
+    return ridge
+
+
+def ridge_statistics(preprocessor, df, target="assess_2022", chunksize=100_000):
+    """
+    Gathers the RidgeStatistics of in-memory training data, one chunk of rows at a time.
+
+    Parameters:
+        preprocessor: sklearn transformer
+            Already fitted preprocessor.
+        df: pd.DataFrame
+            Training data, including the target.
+        target: str
+            Name of the target column.
+        chunksize: int
+            Rows transformed at a time.
+
+    Returns:
+        RidgeStatistics: Statistics of the design matrix and target.
+    """
+    stats = None
+    for start in range(0, max(len(df), 1), chunksize):
+        X, y = _design_chunk(preprocessor, df.iloc[start:start + chunksize], target)
+        stats = stats or RidgeStatistics(X.shape[1])
+        stats.update(X, y)
+    return stats
+
+
+def update_ridge_pipeline(pipeline, stats, df, target="assess_2022", alpha_selection="fixed"):
+    """
+    Folds new rows into the statistics of a fitted Ridge pipeline and re-solves it.
+
+    The preprocessor is kept as fitted, so the update costs one transform of
+    the new rows plus a solve of a (features x features) system, however
+    many rows the model has seen. On the same preprocessed features this
+    is exactly the ridge solution over all rows seen so far.
+
+    Parameters:
+        pipeline: sklearn.pipeline.Pipeline
+            Fitted preprocessor + RidgeCV pipeline.
+        stats: RidgeStatistics
+            Statistics of the rows the pipeline was fitted on; updated in place.
+        df: pd.DataFrame
+            New rows, including the target.
+        target: str
+            Name of the target column.
+        alpha_selection: str
+            "fixed" keeps the current alpha, "gcv" picks the best of the
+            pipeline's candidate alphas by generalized cross-validation.
+
+    Returns:
+        sklearn.pipeline.Pipeline: A new pipeline with the updated coefficients.
+    """
+    preprocessor, ridge = pipeline[:-1], pipeline[-1]
+    if len(df):
+        X, y = _design_chunk(preprocessor, df, target)
+        stats.update(X, y)
+
+    alphas = tuple(np.atleast_1d(ridge.alphas))
+    if alpha_selection == "gcv":
+        alpha = alphas[int(np.argmin(stats.gcv_errors(alphas)))]
+    elif alpha_selection == "fixed":
+        alpha = ridge.alpha_
+    else:
+        raise ValueError(f"Unknown alpha selection: {alpha_selection}")
+    return Pipeline(pipeline.steps[:-1] + [(pipeline.steps[-1][0], _fitted_ridge(alphas, alpha, *stats.solve(alpha)))])
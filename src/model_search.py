@@ -0,0 +1,230 @@
+import json
+import math
+import os
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.dummy import DummyRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import KFold, ParameterGrid
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.pipeline import make_pipeline
+
+from src.instrumentation import instrumented, step
+from src.preprocess_utils import create_preprocessor
+
+# Model family to (estimator, hyperparameter grid)
+SEARCH_SPACE = {
+    'dummy': (DummyRegressor(), {}),
+    'ridge': (Ridge(), {'alpha': [0.01, 0.1, 1.0, 10.0, 100.0, 1000.0]}),
+    'knn': (KNeighborsRegressor(), {'n_neighbors': [5, 15, 50, 150], 'weights': ['uniform', 'distance']}),
+    'hist_gradient_boosting': (HistGradientBoostingRegressor(max_iter=200, random_state=123),
+                               {'learning_rate': [0.03, 0.1, 0.3], 'max_leaf_nodes': [7, 15, 31]}),
+    'random_forest': (RandomForestRegressor(n_estimators=100, random_state=123),
+                      {'min_samples_leaf': [1, 5, 20], 'max_features': [1.0, 0.5]}),
+}
+
+# Like joblib, put the shared arrays in memory-backed files where the system has them
+SHARED_MEMORY_DIR = "/dev/shm"
+
+
+def search_candidates(search_space=SEARCH_SPACE, models=None):
+    """
+    Expands a search space into one candidate per model and hyperparameter combination.
+
+    Parameters:
+        search_space (dict): Model family to (estimator, parameter grid).
+        models (list): Families to keep; all of them if None.
+
+    Returns:
+        list: Dicts with the 'model' family, its 'params' and the unfitted 'estimator'.
+    """
+    candidates = []
+    for model, (estimator, grid) in search_space.items():
+        if models and model not in models:
+            continue
+        for params in ParameterGrid(grid):
+            candidates.append({'model': model, 'params': params, 'estimator': clone(estimator).set_params(**params)})
+    return candidates
+
+
+def halving_schedule(n_candidates, n_rows, factor=3, min_rows=200):
+    """
+    Returns the number of rows each successive-halving round is evaluated on.
+
+    Every round keeps the best 1/`factor` of the candidates and gives
+    the survivors `factor` times more rows, so that the last round, with a
+    single candidate left, uses every row.
+
+    Parameters:
+        n_candidates (int): Number of candidates in the first round.
+        n_rows (int): Number of training rows.
+        factor (int): Reduction of the candidates and growth of the rows per round.
+        min_rows (int): Fewest rows a round is evaluated on.
+
+    Returns:
+        list: Rows per round, ending with `n_rows`.
+    """
+    n_rounds = math.ceil(math.log(max(n_candidates, 1), factor)) + 1
+    schedule = [min(n_rows, max(min_rows, n_rows // factor ** (n_rounds - 1 - i))) for i in range(n_rounds)]
+    # Rounds that could not grow (too few rows) would only repeat the previous one
+    return [rows for i, rows in enumerate(schedule) if i == len(schedule) - 1 or rows < schedule[i + 1]]
+
+
+def share_training_data(df, directory, categorical_features, numeric_features, target="assess_2022", seed=123):
+    """
+    Writes the training data as float64 .npy files that worker processes memory-map.
+
+    Categorical columns are stored as integer codes, so the whole design is
+    one numeric array; the preprocessor one-hot encodes the codes as it
+    would the labels. A random order of the rows is stored too: every round
+    subsamples a prefix of it, so larger rounds contain the smaller ones.
+
+    Parameters:
+        df (pd.DataFrame): Training data, including the target.
+        directory (str): Directory of the .npy files.
+        categorical_features (list): Categorical columns.
+        numeric_features (list): Numeric columns.
+        target (str): Name of the target column.
+        seed (int): Seed of the row order.
+
+    Returns:
+        str: The directory.
+    """
+    X = np.empty((len(df), len(categorical_features) + len(numeric_features)))
+    for i, col in enumerate(categorical_features):
+        X[:, i] = df[col].astype('category').cat.codes
+    for i, col in enumerate(numeric_features, start=len(categorical_features)):
+        X[:, i] = df[col]
+    np.save(os.path.join(directory, "X.npy"), X)
+    np.save(os.path.join(directory, "y.npy"), df[target].to_numpy(dtype="float64"))
+    np.save(os.path.join(directory, "order.npy"), np.random.default_rng(seed).permutation(len(df)))
+    return directory
+
+
+def _evaluate_candidate(directory, estimator, n_categorical, n_rows, cv, fold):
+    """
+    Fits a preprocessor and candidate on one fold of a row subsample of the shared data, and scores them.
+    """
+    X = np.load(os.path.join(directory, "X.npy"), mmap_mode='r')
+    y = np.load(os.path.join(directory, "y.npy"), mmap_mode='r')
+    # Sorted, so the subsample is read from the mapped files in order
+    rows = np.sort(np.load(os.path.join(directory, "order.npy"), mmap_mode='r')[:n_rows])
+    train_idx, test_idx = list(KFold(n_splits=cv).split(rows))[fold]
+    X_fold_train, y_fold_train = X[rows[train_idx]], y[rows[train_idx]]
+    X_fold_test, y_fold_test = X[rows[test_idx]], y[rows[test_idx]]
+
+    preprocessor = create_preprocessor(list(range(n_categorical)), list(range(n_categorical, X.shape[1])))
+    try:
+        start = time.perf_counter()
+        pipeline = make_pipeline(preprocessor, clone(estimator)).fit(X_fold_train, y_fold_train)
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        test_score = pipeline.score(X_fold_test, y_fold_test)
+        score_time = time.perf_counter() - start
+    except ValueError as error:
+        # E.g. more neighbours than rows in a small round; scored like `error_score=np.nan` in sklearn,
+        # with the message kept so that other failures (bad parameters, unseen levels) are visible
+        return {'fit_time': np.nan, 'score_time': np.nan, 'test_score': np.nan, 'train_score': np.nan,
+                'error': f"{type(error).__name__}: {error}"}
+    return {
+        'fit_time': fit_time,
+        'score_time': score_time,
+        'test_score': test_score,
+        'train_score': pipeline.score(X_fold_train, y_fold_train),
+        'error': None,
+    }
+
+
+@instrumented(rows_from='df')
+def successive_halving_search(df, categorical_features, numeric_features, candidates, target="assess_2022",
+                              factor=3, min_rows=200, cv=5, n_jobs=None, seed=123, temp_folder=None):
+    """
+    Cross-validates many candidate models by successive halving, in parallel over shared training data.
+
+    The training data is written once to memory-mapped files (see
+    `share_training_data`) that worker processes read directly, so tasks
+    only carry the file names and the candidate. All candidates are first
+    cross-validated on a small random subsample of rows; each round then
+    keeps the best 1/`factor` by mean R^2 (a candidate that fails to fit
+    on any fold scores NaN and is dropped, with a warning and the error in
+    the history) and evaluates them on `factor`
+    times more rows (see `halving_schedule`). Every (candidate, fold) pair
+    of a round is a separate task, so slow and fast models balance across
+    the workers. The preprocessor (see `create_preprocessor`) is refitted
+    on every fold, as in `cross_validate_models`.
+
+    Parameters:
+        df (pd.DataFrame): Training data, including the target.
+        categorical_features (list): Categorical columns.
+        numeric_features (list): Numeric columns.
+        candidates (list): Candidates, as returned by `search_candidates`.
+        target (str): Name of the target column.
+        factor (int): Reduction of the candidates and growth of the rows per round.
+        min_rows (int): Rows of the first round, at least.
+        cv (int): Number of cross-validation folds.
+        n_jobs (int): Number of worker processes; -1 uses every core.
+        seed (int): Seed of the row subsamples.
+        temp_folder (str): Where the shared files are written; /dev/shm if it exists.
+
+    Returns:
+        tuple: The leaderboard, with one row per candidate at the last round
+        it reached, ranked, and the history of every round, as pd.DataFrames.
+    """
+    if temp_folder is None and os.path.isdir(SHARED_MEMORY_DIR):
+        temp_folder = SHARED_MEMORY_DIR
+    schedule = halving_schedule(len(candidates), len(df), factor=factor, min_rows=max(min_rows, 2 * cv))
+    history = []
+    alive = list(range(len(candidates)))
+
+    with tempfile.TemporaryDirectory(prefix="housing_search_", dir=temp_folder) as directory:
+        share_training_data(df, directory, categorical_features, numeric_features, target=target, seed=seed)
+        with Parallel(n_jobs=n_jobs) as parallel:
+            for round_number, n_rows in enumerate(schedule):
+                with step(f'round_{round_number}', rows=n_rows, candidates=len(alive)):
+                    per_fold = parallel(
+                        delayed(_evaluate_candidate)(directory, candidates[i]['estimator'],
+                                                     len(categorical_features), n_rows, cv, fold)
+                        for i in alive for fold in range(cv)
+                    )
+                scores = []
+                for position, i in enumerate(alive):
+                    folds = pd.DataFrame(per_fold[position * cv:(position + 1) * cv])
+                    errors = folds['error'].dropna()
+                    if len(errors):
+                        warnings.warn(f"{candidates[i]['model']} {candidates[i]['params']} failed on {len(errors)} of "
+                                      f"{cv} folds of {n_rows} rows: {errors.iloc[0]}", RuntimeWarning)
+                    scores.append({
+                        'candidate': i,
+                        'model': candidates[i]['model'],
+                        'params': json.dumps(candidates[i]['params'], sort_keys=True),
+                        'round': round_number,
+                        'n_rows': n_rows,
+                        # A candidate failing on any fold scores NaN rather than the mean of the others
+                        'mean_test_score': folds['test_score'].mean(skipna=False),
+                        'std_test_score': folds['test_score'].std(skipna=False),
+                        'mean_train_score': folds['train_score'].mean(skipna=False),
+                        'mean_fit_time': folds['fit_time'].mean(skipna=False),
+                        'mean_score_time': folds['score_time'].mean(skipna=False),
+                        'error': errors.iloc[0] if len(errors) else None,
+                    })
+                history.extend(scores)
+
+                # Candidates that failed to fit rank last
+                ranked = sorted(scores, key=lambda score: np.nan_to_num(score['mean_test_score'], nan=-np.inf),
+                                reverse=True)
+                alive = [score['candidate'] for score in ranked[:math.ceil(len(ranked) / factor)]]
+
+    history = pd.DataFrame(history)
+    # Candidates that went further rank above the ones they outlasted, then by score
+    leaderboard = (history.sort_values(['round', 'mean_test_score'], ascending=False)
+                   .drop_duplicates('candidate').drop(columns='candidate').reset_index(drop=True))
+    leaderboard.insert(0, 'rank', range(1, len(leaderboard) + 1))
+    return leaderboard, history.drop(columns='candidate')
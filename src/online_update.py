@@ -0,0 +1,149 @@
+import json
+import os
+import pickle
+import shutil
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+from src.instrumentation import instrumented, step
+from src.model_artifact import save_artifact
+from src.model_fitting_util import RidgeStatistics, update_ridge_pipeline
+
+MODEL_NAME = "ridge_pipeline"
+STATISTICS_NAME = "ridge_statistics.npz"
+HISTORY_NAME = "model_updates.csv"
+
+
+def model_paths(model_dir):
+    """
+    Returns the paths of the pickled pipeline, its JSON artifact and its Ridge statistics in a model directory.
+    """
+    return (os.path.join(model_dir, f"{MODEL_NAME}.pickle"), os.path.join(model_dir, f"{MODEL_NAME}.json"),
+            os.path.join(model_dir, STATISTICS_NAME))
+
+
+def save_model(pipeline, stats, model_dir, version=1):
+    """
+    Saves a fitted pipeline as pickle and JSON artifact, with the Ridge statistics needed to update it.
+
+    Parameters:
+        pipeline (sklearn.pipeline.Pipeline): Fitted preprocessor + RidgeCV pipeline.
+        stats (RidgeStatistics): Statistics of the rows the pipeline was fitted on.
+        model_dir (str): Directory of the model files.
+        version (int): Model version.
+    """
+    pickle_path, artifact_path, statistics_path = model_paths(model_dir)
+    os.makedirs(model_dir, exist_ok=True)
+    with open(pickle_path + ".tmp", 'wb') as f:
+        pickle.dump(pipeline, f)
+    os.replace(pickle_path + ".tmp", pickle_path)
+    save_artifact(pipeline, artifact_path, version=version, n_rows=stats.n)
+    stats.save(statistics_path, model_version=version)
+
+
+def drift_report(online, reference, holdout, target="assess_2022"):
+    """
+    Compares an online-updated pipeline with a full refit on holdout data.
+
+    Parameters:
+        online (sklearn.pipeline.Pipeline): The updated pipeline.
+        reference (sklearn.pipeline.Pipeline): The pipeline refitted from scratch on the same rows.
+        holdout (pd.DataFrame): Rows neither model was fitted on, including the target.
+        target (str): Name of the target column.
+
+    Returns:
+        dict: Holdout R^2 and RMSE of both models, and the mean absolute and
+        largest gap between their predictions, absolute and relative to the
+        mean target.
+    """
+    X, y = holdout.drop(columns=[target]), holdout[target].to_numpy(dtype="float64")
+    online_predictions, reference_predictions = online.predict(X), reference.predict(X)
+    gap = np.abs(online_predictions - reference_predictions)
+    return {
+        'holdout_r2_online': float(online.score(X, y)),
+        'holdout_r2_refit': float(reference.score(X, y)),
+        'holdout_rmse_online': float(np.sqrt(np.mean((online_predictions - y) ** 2))),
+        'holdout_rmse_refit': float(np.sqrt(np.mean((reference_predictions - y) ** 2))),
+        'prediction_gap_mean': float(gap.mean()),
+        'prediction_gap_max': float(gap.max()),
+        'prediction_gap_relative': float(gap.mean() / np.abs(y).mean()),
+    }
+
+
+@instrumented(rows_from='new_data')
+def update_saved_model(model_dir, new_data, alpha_selection="fixed", train_data=None, holdout=None,
+                       target="assess_2022"):
+    """
+    Updates the saved Ridge model with new training rows, without refitting it from scratch.
+
+    The new rows are folded into the saved RidgeStatistics and the model is
+    re-solved (see `update_ridge_pipeline`). The previous version's files
+    are copied to `versions/`, then the pickle, JSON artifact and statistics
+    are replaced in place with the version number incremented. With
+    `train_data` (every training row, new ones included) and `holdout`, the
+    update is compared with a full refit of the pipeline. A line per update
+    is appended to model_updates.csv.
+
+    Parameters:
+        model_dir (str): Directory holding ridge_pipeline.pickle/.json and ridge_statistics.npz.
+        new_data (pd.DataFrame): New training rows, including the target.
+        alpha_selection (str): "fixed" or "gcv", see `update_ridge_pipeline`.
+        train_data (pd.DataFrame): All training rows, for the full refit of the drift report.
+        holdout (pd.DataFrame): Held-out rows, for the drift report.
+        target (str): Name of the target column.
+
+    Returns:
+        dict: The new version, row counts, alpha, update time and, with
+        `train_data` and `holdout`, the drift report. Without new rows,
+        nothing is written and only the current version and row counts are
+        returned.
+    """
+    pickle_path, artifact_path, statistics_path = model_paths(model_dir)
+    if not os.path.exists(statistics_path):
+        raise FileNotFoundError(f"No {STATISTICS_NAME} in {model_dir}: refit the model with model_fitting.py first.")
+    stats, metadata = RidgeStatistics.load(statistics_path)
+    with open(artifact_path) as f:
+        version = json.load(f).get('model_version', 1)
+    if metadata.get('model_version') != version:
+        raise ValueError(f"{statistics_path} belongs to model version {metadata.get('model_version')}, "
+                         f"not {version}: refit the model with model_fitting.py.")
+    if len(new_data) == 0:
+        # Nothing to fold in: the model and its version stay as they are
+        return {'model_version': version, 'new_rows': 0, 'total_rows': stats.n}
+    with open(pickle_path, 'rb') as f:
+        pipeline = pickle.load(f)
+
+    start = time.perf_counter()
+    updated = update_ridge_pipeline(pipeline, stats, new_data, target=target, alpha_selection=alpha_selection)
+    update_seconds = time.perf_counter() - start
+
+    # Keeping the previous version, then replacing the model in place
+    versions_dir = os.path.join(model_dir, "versions")
+    os.makedirs(versions_dir, exist_ok=True)
+    for path in (pickle_path, artifact_path, statistics_path):
+        name, extension = os.path.splitext(os.path.basename(path))
+        shutil.copy2(path, os.path.join(versions_dir, f"{name}.v{version}{extension}"))
+    save_model(updated, stats, model_dir, version=version + 1)
+
+    summary = {
+        'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'model_version': version + 1,
+        'new_rows': len(new_data),
+        'total_rows': stats.n,
+        'alpha': float(updated[-1].alpha_),
+        'update_seconds': update_seconds,
+    }
+    if train_data is not None and holdout is not None:
+        with step('full_refit', rows=len(train_data)):
+            start = time.perf_counter()
+            reference = clone(pipeline).fit(train_data.drop(columns=[target]), train_data[target])
+            summary['refit_seconds'] = time.perf_counter() - start
+        summary.update(drift_report(updated, reference, holdout, target))
+
+    history_path = os.path.join(model_dir, HISTORY_NAME)
+    pd.DataFrame([summary]).to_csv(history_path, mode='a', header=not os.path.exists(history_path), index=False)
+    return summary
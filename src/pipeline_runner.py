@@ -0,0 +1,216 @@
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+@dataclass
+class Stage:
+    """
+    One step of the pipeline.
+
+    Attributes:
+        name (str): Stage name, used in logs.
+        command (list): Arguments of the command that runs the stage.
+        inputs (list): Files the stage reads; their contents are fingerprinted.
+        outputs (list): Files the stage writes; they are stored in the cache.
+        params (dict): Parameters that change the stage's results (seed, threshold, ...).
+        code (list): Source files of the stage. Python files are followed
+            through their `src.` imports.
+        always_run (bool): Run the stage even if it is cached, e.g. one that
+            fetches a remote resource the fingerprint can't see, and is cheap
+            to re-run when the resource hasn't changed.
+    """
+    name: str
+    command: list
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+    code: list = field(default_factory=list)
+    always_run: bool = False
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_files(paths, root=PROJECT_ROOT):
+    """
+    Expands a list of source files with every `src` module they import, recursively.
+
+    Parameters:
+        paths (list): Source files of a stage.
+        root (str): Project root that contains the `src` package.
+
+    Returns:
+        list: Sorted paths of all source files the stage depends on.
+    """
+    found = set()
+    pending = list(paths)
+    while pending:
+        path = os.path.abspath(pending.pop())
+        if path in found or not os.path.exists(path):
+            continue
+        found.add(path)
+        if not path.endswith('.py'):
+            continue
+        with open(path) as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            modules = []
+            if isinstance(node, ast.ImportFrom) and node.module:
+                # `from src import x` and `from src.x import y` name modules as well as functions:
+                # candidates that aren't files are skipped
+                modules = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            elif isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            for module in modules:
+                if module.split('.')[0] == 'src':
+                    base = os.path.join(root, *module.split('.'))
+                    pending.extend([base + '.py', os.path.join(base, '__init__.py')])
+    return sorted(found)
+
+
+def stage_fingerprint(stage, root=PROJECT_ROOT):
+    """
+    Fingerprints a stage from its command, parameters, input contents and code.
+
+    Parameters:
+        stage (Stage): The stage to fingerprint.
+        root (str): Directory that relative stage paths are resolved against.
+
+    Returns:
+        str: SHA-256 hex digest identifying the stage's results.
+    """
+    missing = [path for path in stage.inputs if not os.path.exists(os.path.join(root, path))]
+    if missing:
+        raise FileNotFoundError(f"Stage '{stage.name}' is missing inputs: {missing}")
+
+    code = code_files([os.path.join(root, path) for path in stage.code], root)
+    description = {
+        'name': stage.name,
+        # The interpreter path differs between machines but not the results
+        'command': ['python' if arg == sys.executable else arg for arg in stage.command],
+        'params': stage.params,
+        'inputs': {path: file_digest(os.path.join(root, path)) for path in stage.inputs},
+        'code': {os.path.relpath(path, root): file_digest(path) for path in code},
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class ArtifactCache:
+    """
+    Content-addressed store of stage outputs.
+
+    Every output file is stored once under objects/ by the digest of its
+    contents, and stages/<fingerprint>.json records which object each
+    output path of a stage run maps to. Output paths are relative to `base`.
+    """
+
+    def __init__(self, root, base=PROJECT_ROOT):
+        self.root = root
+        self.base = base
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def _manifest_path(self, fingerprint):
+        return os.path.join(self.root, 'stages', fingerprint + '.json')
+
+    def lookup(self, fingerprint):
+        """
+        Returns the manifest of a cached stage run, or None if it is not cached.
+        """
+        path = self._manifest_path(fingerprint)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            manifest = json.load(f)
+        if not all(os.path.exists(self._object_path(digest)) for digest in manifest['outputs'].values()):
+            return None
+        return manifest
+
+    def store(self, fingerprint, stage):
+        """
+        Copies the outputs of a finished stage into the cache.
+        """
+        outputs = {}
+        for path in stage.outputs:
+            digest = file_digest(os.path.join(self.base, path))
+            target = self._object_path(digest)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(os.path.join(self.base, path), target + '.tmp')
+                os.replace(target + '.tmp', target)
+            outputs[path] = digest
+
+        os.makedirs(os.path.dirname(self._manifest_path(fingerprint)), exist_ok=True)
+        with open(self._manifest_path(fingerprint), 'w') as f:
+            json.dump({'stage': stage.name, 'outputs': outputs}, f, indent=2)
+
+    def restore(self, manifest):
+        """
+        Puts the cached outputs of a stage back in place, copying only the files that differ.
+        """
+        for path, digest in manifest['outputs'].items():
+            path = os.path.join(self.base, path)
+            if os.path.exists(path) and file_digest(path) == digest:
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(self._object_path(digest), path)
+
+
+def run_pipeline(stages, cache_dir, force=(), cwd=PROJECT_ROOT):
+    """
+    Runs stages in order, skipping those whose fingerprint is already cached.
+
+    Parameters:
+        stages (list): Stage objects, in dependency order.
+        cache_dir (str): Directory of the artifact cache.
+        force (iterable): Names of stages to re-run even if they are cached.
+        cwd (str): Working directory of the stage commands; relative
+            stage paths are resolved against it.
+
+    Returns:
+        dict: Stage name to 'cached' or 'ran'.
+    """
+    cache = ArtifactCache(cache_dir, base=cwd)
+    statuses = {}
+    for stage in stages:
+        fingerprint = stage_fingerprint(stage, cwd)
+        manifest = None if stage.name in force or stage.always_run else cache.lookup(fingerprint)
+        if manifest is not None:
+            cache.restore(manifest)
+            statuses[stage.name] = 'cached'
+            print(f"✅ {stage.name}: cached ({fingerprint[:12]}), skipped.")
+            continue
+
+        print(f"Running {stage.name}: {' '.join(stage.command)}")
+        subprocess.run(stage.command, cwd=cwd, check=True)
+        cache.store(fingerprint, stage)
+        statuses[stage.name] = 'ran'
+        print(f"✅ {stage.name}: done ({fingerprint[:12]}).")
+    return statuses
+
+
+def python_command(script, **options):
+    """
+    Builds the command running a script with the current interpreter and --option value pairs.
+    """
+    command = [sys.executable, script]
+    for key, value in options.items():
+        command += ['--' + key.replace('_', '-'), str(value)]
+    return command
@@ -1,31 +1,145 @@
-import pandas as pd
+import os
 import pickle
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import instrumented, record_rows
+
+FEATURES = ['meters', 'garage', 'firepl', 'bsmt', 'bdevl']
+
+# Loaded models keyed by (absolute path, modification time), least recently used first
+_MODEL_CACHE = OrderedDict()
+MODEL_CACHE_SIZE = 8
+
+
+def load_model(model_file):
+    """
+    Loads a model, reusing the in-process copy while the file is unchanged.
+
+    Pickled pipelines are unpickled; .json artifacts written by
+    `src.model_artifact.save_artifact` are loaded as a LinearKernel, which
+    does not import sklearn.
+
+    Models are cached by path and modification time, so a retrained model
+    written to the same path is picked up on the next call. At most
+    MODEL_CACHE_SIZE models are kept; the least recently used is evicted.
+
+    Args:
+    - model_file (str): Path to the trained model (pickle or .json artifact).
+
+    Returns:
+    - The loaded model.
+    """
+    try:
+        key = (os.path.abspath(model_file), os.path.getmtime(model_file))
+    except OSError:
+        key = None
+
+    if key in _MODEL_CACHE:
+        _MODEL_CACHE.move_to_end(key)
+        return _MODEL_CACHE[key]
+
+    if model_file.endswith('.json'):
+        from src.model_artifact import load_artifact
+        model = load_artifact(model_file)
+    else:
+        with open(model_file, 'rb') as f:
+            model = pickle.load(f)
+
+    if key is not None:
+        # Drop copies of older versions of the same file
+        for stale in [cached for cached in _MODEL_CACHE if cached[0] == key[0]]:
+            del _MODEL_CACHE[stale]
+        _MODEL_CACHE[key] = model
+        while len(_MODEL_CACHE) > MODEL_CACHE_SIZE:
+            _MODEL_CACHE.popitem(last=False)
+    return model
 
+
+class Predictor:
+    """
+    Scores properties with a trained pipeline that is loaded once and cached.
+
+    Example:
+        predictor = Predictor("results/models/ridge_pipeline.pickle")
+        predictor.predict({'meters': 174.23, 'garage': 'Y', 'firepl': 'Y', 'bsmt': 'Y', 'bdevl': 'N'})
+    """
+
+    def __init__(self, model_file, compiled=False):
+        self.model_file = model_file
+        self.compiled = compiled
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reloads the pipeline if the model file changed since it was loaded.
+
+        With `compiled=True` the pipeline is folded into a LinearKernel,
+        which scores with one vectorized expression instead of going
+        through the ColumnTransformer.
+        """
+        self.pipeline = load_model(self.model_file)
+        if self.compiled and hasattr(self.pipeline, 'steps'):
+            from src.linear_kernel import compile_pipeline
+            self.pipeline = compile_pipeline(self.pipeline)
+        return self
+
+    @staticmethod
+    def as_frame(data):
+        """
+        Returns the input features as a DataFrame, without copying DataFrame inputs.
+
+        Args:
+        - data (dict, pd.DataFrame or np.ndarray): A dict of columns (lists or
+          arrays), a dict describing a single property, a DataFrame, or an array
+          whose columns are in FEATURES order.
+
+        Returns:
+        - pd.DataFrame: The input features.
+        """
+        if isinstance(data, pd.DataFrame):
+            return data
+        if isinstance(data, dict):
+            if all(np.ndim(value) == 0 for value in data.values()):
+                return pd.DataFrame({key: [value] for key, value in data.items()})
+            return pd.DataFrame(data)
+        array = np.asarray(data, dtype=object)
+        return pd.DataFrame(array.reshape(-1, len(FEATURES)), columns=FEATURES).astype({'meters': 'float64'})
+
+    def predict(self, data):
+        """
+        Predicts values for the given properties.
+
+        Args:
+        - data (dict, pd.DataFrame or np.ndarray): Input features, see `as_frame`.
+
+        Returns:
+        - np.ndarray: One predicted value per property.
+        """
+        return np.asarray(self.pipeline.predict(self.as_frame(data)))
+
+
+@instrumented()
 def make_predictions(model_file, input_data):
     """
     Function to make predictions using a pre-trained model and input data.
-    
+
     Args:
     - model_file (str): Path to the trained model (pickle format).
     - input_data (dict): Dictionary with the input features for prediction.
-    
+
     Returns:
     - pd.DataFrame: DataFrame with predicted values.
     """
-    # Create a DataFrame from the input data
-    X_predict = pd.DataFrame(input_data)
+    predictor = Predictor(model_file)
+    X_predict = predictor.as_frame(input_data)
+    # Counted once the input is a frame: a dict of columns has one key per feature, not per property
+    record_rows(len(X_predict))
 
-    # Load the trained pipeline model
-    with open(model_file, 'rb') as f:
-        pipeline = pickle.load(f)
+    # Combine input data with predictions, without touching a caller's DataFrame
+    predictions_df = input_data.copy(deep=False) if X_predict is input_data else X_predict
+    predictions_df['Predicted_Values'] = np.round(predictor.predict(X_predict), 2)
 
-    # Perform predictions
-    y_predict = pipeline.predict(X_predict)
-    y_predict = pd.DataFrame(y_predict, columns=['Predicted_Values'])
-    y_predict = round(y_predict, 2)
-
-    # Combine input data with predictions
-    predictions_df = pd.concat([X_predict, y_predict], axis=1)
-    
     return predictions_df
-
@@ -1,6 +1,8 @@
 from sklearn.compose import make_column_transformer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
+from src.instrumentation import instrumented
+
 def create_preprocessor(categorical_features, numeric_features):
     """
     Creates a preprocessor with OneHotEncoder for categorical features
@@ -19,6 +21,7 @@ def create_preprocessor(categorical_features, numeric_features):
     )
 
 
+@instrumented(rows_from='df')
 def validate_categorical_levels(df, categorical_features, expected_values):
     """
     Validates that the categorical features have only expected levels.
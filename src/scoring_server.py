@@ -0,0 +1,248 @@
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.prediction import FEATURES
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent request latencies and reports their percentiles.
+    """
+
+    def __init__(self, window=10_000):
+        self.latencies = deque(maxlen=window)
+
+    def record(self, seconds):
+        self.latencies.append(seconds)
+
+    def percentiles(self, qs=(50, 90, 99)):
+        """
+        Returns the requested latency percentiles in milliseconds.
+        """
+        if not self.latencies:
+            return {f"p{q}": None for q in qs}
+        values = np.percentile(np.fromiter(self.latencies, dtype="float64"), qs) * 1000
+        return {f"p{q}": round(float(value), 3) for q, value in zip(qs, values)}
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-property requests into batches scored with one predict call.
+
+    A batch is closed when it holds `max_batch_size` properties or when
+    `max_wait_ms` has passed since its first property arrived, whichever
+    comes first. Batches are scored on a single worker thread so the event
+    loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, predict, max_batch_size=64, max_wait_ms=2.0):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, features):
+        """
+        Queues one property and waits for its predicted value.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((features, future))
+        return await future
+
+    def _score(self, batch):
+        features = [item[0] for item in batch]
+        try:
+            return list(self.predict(pd.DataFrame.from_records(features, columns=FEATURES)))
+        except Exception:
+            # Score one by one so a single bad property only fails its own request
+            results = []
+            for row in features:
+                try:
+                    results.append(self.predict(pd.DataFrame.from_records([row], columns=FEATURES))[0])
+                except Exception as error:
+                    results.append(error)
+            return results
+
+    async def run(self):
+        """
+        Scores batches until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            results = await loop.run_in_executor(self.executor, self._score, batch)
+            self.batches += 1
+            self.rows += len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(float(result))
+
+
+class ScoringServer:
+    """
+    Minimal HTTP/1.1 valuation server built on asyncio streams.
+
+    Endpoints:
+        POST /predict: a JSON property (or list of properties) with the FEATURES
+            keys; returns {"prediction": value} (or {"predictions": [...]}).
+        GET /metrics: request, batch and error counters, throughput and
+            latency percentiles.
+        GET /health: {"status": "ok"}.
+
+    Example:
+        server = ScoringServer(Predictor("results/models/ridge_pipeline.pickle"))
+        asyncio.run(server.serve_forever("127.0.0.1", 8000))
+    """
+
+    def __init__(self, predictor, max_batch_size=64, max_wait_ms=2.0):
+        self.batcher = MicroBatcher(predictor.predict, max_batch_size, max_wait_ms)
+        self.latency = LatencyTracker()
+        self.requests = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self._batcher_task = None
+
+    async def start(self, host="127.0.0.1", port=8000):
+        """
+        Starts the batcher and listens for connections; returns the asyncio server.
+        """
+        self._batcher_task = asyncio.create_task(self.batcher.run())
+        self.started = time.perf_counter()
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def stop(self, server):
+        server.close()
+        await server.wait_closed()
+        self._batcher_task.cancel()
+        self.batcher.executor.shutdown(wait=False)
+
+    async def serve_forever(self, host="127.0.0.1", port=8000):
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._batcher_task.cancel()
+
+    def metrics(self):
+        uptime = time.perf_counter() - self.started
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batcher.batches,
+            'rows_scored': self.batcher.rows,
+            'mean_batch_size': round(self.batcher.rows / self.batcher.batches, 2) if self.batcher.batches else None,
+            'uptime_seconds': round(uptime, 3),
+            'requests_per_second': round(self.requests / uptime, 1) if uptime else None,
+            'latency_ms': self.latency.percentiles(),
+        }
+
+    async def predict(self, body):
+        payload = json.loads(body)
+        properties = payload if isinstance(payload, list) else [payload]
+        for house in properties:
+            if not isinstance(house, dict):
+                raise ValueError("Each property must be a JSON object.")
+            missing = [feature for feature in FEATURES if feature not in house]
+            if missing:
+                raise ValueError(f"Missing features: {missing}")
+        values = await asyncio.gather(*(self.batcher.submit(house) for house in properties))
+        return {'predictions': values} if isinstance(payload, list) else {'prediction': values[0]}
+
+    async def route(self, method, path, body):
+        if path == '/predict':
+            if method != 'POST':
+                return 405, {'error': "Use POST for /predict."}
+            start = time.perf_counter()
+            self.requests += 1
+            try:
+                result = await self.predict(body)
+            except ValueError as error:
+                self.errors += 1
+                return 400, {'error': str(error)}
+            self.latency.record(time.perf_counter() - start)
+            return 200, result
+        if path == '/metrics':
+            return 200, self.metrics()
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        return 404, {'error': f"Unknown path: {path}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                try:
+                    status, payload = await self.route(method, path, body)
+                except Exception as error:
+                    self.errors += 1
+                    status, payload = 500, {'error': str(error)}
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def encode_response(status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def http_request(reader, writer, method, path, payload=None):
+    """
+    Sends one request over an open keep-alive connection and returns (status, parsed JSON body).
+    """
+    body = b'' if payload is None else json.dumps(payload).encode()
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers['content-length'])))
@@ -0,0 +1,196 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from src.instrumentation import instrumented, record_rows
+
+FLAGS = ['garage', 'firepl', 'bsmt', 'bdevl']
+NUMERIC = ['meters', 'assess_2022']
+COLUMNS = ['meters'] + FLAGS + ['assess_2022']
+MODEL_VERSION = 1
+
+
+@dataclass
+class SyntheticModel:
+    """
+    Joint model of the housing columns that holds no individual rows.
+
+    The 16 combinations of the Y/N flags are drawn from their observed
+    frequencies. Within each combination, 'meters' and 'assess_2022' follow
+    a Gaussian copula: each column keeps the combination's own empirical
+    quantiles, and the two are tied together by the correlation of their
+    normal scores. This keeps the skewed marginals, the size-value
+    relationship and the premium of each feature. Combinations seen fewer
+    than `min_count` times use the pooled estimate.
+
+    Attributes:
+        probabilities (list): Frequency of each flag combination, in `itertools.product('NY', repeat=4)` order.
+        correlations (list): Correlation of the (meters, assess_2022) normal scores per combination.
+        quantiles (list): Per combination, evenly spaced quantiles (minimum to maximum) of 'meters' and 'assess_2022'.
+        n_rows (int): Number of rows the model was fitted on.
+    """
+    probabilities: list
+    correlations: list
+    quantiles: list
+    n_rows: int
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'version': MODEL_VERSION, **asdict(self)}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            fields = json.load(f)
+        if fields.pop('version', None) != MODEL_VERSION:
+            raise ValueError(f"{path} is not a version {MODEL_VERSION} synthetic data model.")
+        return cls(**fields)
+
+
+def _combination_codes(df):
+    # Flags as bits, garage first: 'NNNN' -> 0, 'YYYY' -> 15
+    codes = np.zeros(len(df), dtype="int64")
+    for flag in FLAGS:
+        codes = codes * 2 + (df[flag] == 'Y').to_numpy()
+    return codes
+
+
+def _copula(values, n_quantiles):
+    """
+    Quantiles of each column of `values` and the correlation of their normal scores.
+    """
+    levels = np.linspace(0, 1, min(n_quantiles, len(values)))
+    quantiles = {column: np.quantile(values[:, i], levels).tolist() for i, column in enumerate(NUMERIC)}
+    # Normal scores from mid-ranks, so ties share a score
+    scores = ndtri(pd.DataFrame(values).rank(method='average').to_numpy() / (len(values) + 1))
+    return float(np.corrcoef(scores, rowvar=False)[0, 1]), quantiles
+
+
+@instrumented(rows_from='df')
+def fit_synthetic_model(df, min_count=30, n_quantiles=1001):
+    """
+    Fits a SyntheticModel to cleaned housing data.
+
+    Parameters:
+        df (pd.DataFrame): Data with 'meters', the four flags and 'assess_2022', e.g.
+            data/processed/Clean_2023_Property_Tax_Assessment.csv.
+        min_count (int): Fewest rows a flag combination needs for its own copula.
+        n_quantiles (int): Largest number of stored quantiles per column and combination.
+
+    Returns:
+        SyntheticModel: The fitted model.
+    """
+    df = df.dropna(subset=COLUMNS)
+    codes = _combination_codes(df)
+    values = df[NUMERIC].to_numpy(dtype="float64")
+    pooled = _copula(values, n_quantiles)
+
+    counts = np.bincount(codes, minlength=16)
+    correlations, quantiles = [], []
+    for code in range(16):
+        correlation, combination_quantiles = (_copula(values[codes == code], n_quantiles)
+                                              if counts[code] >= min_count else pooled)
+        correlations.append(correlation)
+        quantiles.append(combination_quantiles)
+    return SyntheticModel(probabilities=(counts / counts.sum()).tolist(), correlations=correlations,
+                          quantiles=quantiles, n_rows=int(len(df)))
+
+
+def generate_frame(model, n_rows, rng, duplicate_rate=0.0, nan_rate=0.0, outlier_rate=0.0):
+    """
+    Draws rows from a SyntheticModel, optionally corrupted like raw data.
+
+    Parameters:
+        model (SyntheticModel): The fitted model.
+        n_rows (int): Number of rows.
+        rng (np.random.Generator): Random generator.
+        duplicate_rate (float): Share of rows replaced by copies of other rows. Large samples also
+            repeat rows by chance, as the real values are mostly rounded to the thousand.
+        nan_rate (float): Share of cells (in every column) set to missing.
+        outlier_rate (float): Share of rows whose meters or assess_2022 is multiplied by 20 to 200.
+
+    Returns:
+        pd.DataFrame: Rows with the columns of the housing schema.
+    """
+    codes = rng.choice(16, size=n_rows, p=model.probabilities)
+    # Correlated standard normal pairs, then their probabilities under the normal CDF
+    correlation = np.asarray(model.correlations)[codes]
+    first, noise = rng.standard_normal((2, n_rows))
+    probabilities = ndtr(np.column_stack([first, correlation * first + np.sqrt(1 - correlation ** 2) * noise]))
+
+    # Inverse CDF of each combination's quantiles, one vectorized call per combination present
+    values = np.empty((n_rows, 2))
+    for code in np.unique(codes):
+        rows = codes == code
+        for i, column in enumerate(NUMERIC):
+            quantiles = model.quantiles[code][column]
+            values[rows, i] = np.interp(probabilities[rows, i], np.linspace(0, 1, len(quantiles)), quantiles)
+
+    if outlier_rate:
+        rows = np.flatnonzero(rng.random(n_rows) < outlier_rate)
+        values[rows, rng.integers(0, 2, len(rows))] *= rng.uniform(20, 200, len(rows))
+
+    if duplicate_rate:
+        # Duplicated rows copy the whole row, flags included
+        rows = np.flatnonzero(rng.random(n_rows) < duplicate_rate)
+        source = rng.integers(0, n_rows, len(rows))
+        codes[rows], values[rows] = codes[source], values[source]
+
+    df = pd.DataFrame({'meters': values[:, 0].round(2)})
+    for position, flag in enumerate(FLAGS):
+        df[flag] = np.where((codes >> (3 - position)) & 1, 'Y', 'N').astype(object)
+    df['assess_2022'] = np.round(values[:, 1], -1).astype("int64")
+
+    if nan_rate:
+        for column in COLUMNS:
+            missing = rng.random(n_rows) < nan_rate
+            if missing.any():
+                if column == 'assess_2022':
+                    # Nullable integers, so the CSV still holds whole numbers
+                    df[column] = df[column].astype("Int64")
+                df.loc[missing, column] = pd.NA if column == 'assess_2022' else np.nan
+    return df
+
+
+@instrumented()
+def write_synthetic_csv(model, path, n_rows, chunksize=1_000_000, seed=123,
+                        duplicate_rate=0.0, nan_rate=0.0, outlier_rate=0.0):
+    """
+    Writes arbitrarily many synthetic rows to a CSV, one chunk at a time.
+
+    Each chunk has its own generator spawned from `seed`, so the output is
+    reproducible for a given seed and chunk size and memory is bounded by
+    the chunk size. Duplicates are copied within a chunk.
+
+    Parameters:
+        model (SyntheticModel): The fitted model.
+        path (str): Output CSV path.
+        n_rows (int): Total number of rows.
+        chunksize (int): Rows generated and written per chunk.
+        seed (int): Random seed.
+        duplicate_rate, nan_rate, outlier_rate (float): See `generate_frame`.
+
+    Returns:
+        int: Number of rows written.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    n_chunks = max(-(-n_rows // chunksize), 1)
+    generators = [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(n_chunks)]
+    written = 0
+    for index, rng in enumerate(generators):
+        size = min(chunksize, n_rows - written)
+        chunk = generate_frame(model, size, rng, duplicate_rate, nan_rate, outlier_rate)
+        chunk.to_csv(path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+        written += size
+        record_rows(size)
+    return written
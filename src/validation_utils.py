@@ -0,0 +1,295 @@
+import contextlib
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import instrumented
+
+
+@dataclass
+class Schema:
+    """
+    Declares the expected shape of a housing dataframe.
+
+    Attributes:
+        dtypes (dict): Expected dtype (as a string) of every column, in column order.
+        levels (dict): Expected set of levels of every categorical column.
+        missing_threshold (float): Largest fraction of missing values allowed per column.
+    """
+    dtypes: dict
+    levels: dict = field(default_factory=dict)
+    missing_threshold: float = 0
+
+    @property
+    def columns(self):
+        return list(self.dtypes)
+
+
+HOUSING_SCHEMA = Schema(
+    dtypes={"meters": "float64", "garage": "object", "firepl": "object", "bsmt": "object", "bdevl": "object", "assess_2022": "int64"},
+    levels={col: {'Y', 'N'} for col in ['garage', 'firepl', 'bsmt', 'bdevl']},
+)
+
+
+@dataclass
+class ValidationReport:
+    """
+    Results of every validation check, accumulated over one or more chunks.
+    """
+    schema: Schema
+    n_rows: int = 0
+    missing_columns: set = field(default_factory=set)
+    extra_columns: set = field(default_factory=set)
+    empty_rows: int = 0
+    missing_counts: dict = field(default_factory=dict)
+    dtypes_seen: dict = field(default_factory=dict)
+    duplicate_rows: int = 0
+    unexpected_levels: dict = field(default_factory=dict)
+
+    @property
+    def missing_rates(self):
+        return {col: count / max(self.n_rows, 1) for col, count in self.missing_counts.items()}
+
+    @property
+    def dtype_mismatches(self):
+        return {col: seen for col, seen in self.dtypes_seen.items()
+                if seen != {self.schema.dtypes[col]}}
+
+    @property
+    def passed(self):
+        return not (self.missing_columns or self.extra_columns or self.empty_rows
+                    or self.duplicate_rows or self.unexpected_levels or self.dtype_mismatches
+                    or any(rate > self.schema.missing_threshold for rate in self.missing_rates.values()))
+
+    def summary(self):
+        """
+        Returns one human-readable line per validation check.
+        """
+        lines = []
+        if not (self.missing_columns or self.extra_columns):
+            lines.append("✅ Column name validation passed: All expected columns are present.")
+        else:
+            lines.append("Column names validation failed:")
+            if self.missing_columns:
+                lines.append(f" Missing columns: {self.missing_columns}")
+            if self.extra_columns:
+                lines.append(f" Extra columns: {self.extra_columns}")
+
+        if self.empty_rows == 0:
+            lines.append("✅ Empty observations validation passed: No empty rows.")
+        else:
+            lines.append(f" Empty observations validation failed: Found {self.empty_rows} empty rows.")
+
+        failing = {col: rate for col, rate in self.missing_rates.items() if rate > self.schema.missing_threshold}
+        for col, percentage in failing.items():
+            lines.append(f"Column '{col}' exceeds the missingness expected threshold ({percentage:.2%} missing).")
+        if not failing:
+            lines.append("✅ Missingness validation passed for all columns.")
+
+        for col, seen in self.dtype_mismatches.items():
+            found = ", ".join(sorted(seen))
+            lines.append(f"Data type validation failed: Column '{col}' is of type {found}, expected {self.schema.dtypes[col]}.")
+        if not self.dtype_mismatches:
+            lines.append("✅ Data type validation passed for all columns.")
+
+        if self.duplicate_rows == 0:
+            lines.append("✅ Duplicate observation validation passed: No duplicate rows found.")
+        else:
+            lines.append(f"Duplicate observation validation failed: Found {self.duplicate_rows} duplicate rows.")
+
+        for col, unexpected in self.unexpected_levels.items():
+            lines.append(f"❌ Unexpected values in column '{col}': {unexpected}")
+        if not self.unexpected_levels:
+            lines.append("✅ Category levels validation passed for all categorical columns.")
+
+        return lines
+
+
+def row_hashes(df):
+    """
+    Hashes every row of a dataframe into a single uint64 value.
+
+    Numeric columns are hashed as float64 so that the same row hashes
+    identically whether its chunk was parsed as int64 or float64.
+
+    Parameters:
+        df (pd.DataFrame): The rows to hash.
+
+    Returns:
+        np.ndarray: One uint64 hash per row.
+    """
+    numeric_cols = df.select_dtypes(include="number").columns
+    normalized = df.astype({col: "float64" for col in numeric_cols})
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def first_seen(hashes, seen):
+    """
+    Flags the rows whose hash has not been seen before.
+
+    Parameters:
+        hashes (np.ndarray): uint64 row hashes of the current chunk.
+        seen (np.ndarray): Sorted uint64 array of previously seen hashes.
+
+    Returns:
+        tuple: Boolean mask of rows to keep (first occurrences only) and
+        the updated sorted array of seen hashes.
+    """
+    keep = ~pd.Series(hashes).duplicated().to_numpy()
+    if len(seen) > 0:
+        pos = np.searchsorted(seen, hashes).clip(max=len(seen) - 1)
+        keep &= seen[pos] != hashes
+    # Both inputs are sorted runs, so the stable sort is a linear merge
+    seen = np.sort(np.concatenate([seen, np.sort(hashes[keep])]), kind="stable")
+    return keep, seen
+
+
+# Partition files open at once while deduplicating on disk
+MAX_PARTITIONS = 256
+_HASHED_ROW = np.dtype([('hash', np.uint64), ('row', np.int64)])
+
+
+def find_duplicates(hash_file, directory, chunksize=1_000_000, index_path=None):
+    """
+    Finds the rows repeating an earlier row, from a file of row hashes, in bounded memory.
+
+    The (hash, row number) pairs are streamed to partition files in
+    `directory` by the top bits of the hash, so that equal hashes share a
+    partition of about `chunksize` rows (more past MAX_PARTITIONS
+    partitions), which is then deduplicated in memory. Partitions cover
+    increasing hash ranges, so their unique hashes, written one after the
+    other, are sorted.
+
+    Parameters:
+        hash_file (str): uint64 row hashes in row order, as written by `np.ndarray.tofile`.
+        directory (str): Directory of the temporary partition files.
+        chunksize (int): Hashes read at a time, and target rows per partition.
+        index_path (str): Where to save the sorted unique hashes as .npy, if given.
+
+    Returns:
+        np.ndarray: Sorted numbers of the duplicate rows, i.e. every
+        occurrence of a row but the first.
+    """
+    n_rows = os.path.getsize(hash_file) // 8
+    bits = int(np.ceil(np.log2(min(MAX_PARTITIONS, max(1, -(-n_rows // chunksize))))))
+    paths = [os.path.join(directory, f"partition_{i}.bin") for i in range(2 ** bits)]
+
+    with contextlib.ExitStack() as stack, open(hash_file, 'rb') as source:
+        partitions = [stack.enter_context(open(path, 'wb')) for path in paths]
+        start = 0
+        while True:
+            hashes = np.fromfile(source, dtype=np.uint64, count=chunksize)
+            if len(hashes) == 0:
+                break
+            pairs = np.empty(len(hashes), dtype=_HASHED_ROW)
+            pairs['hash'], pairs['row'] = hashes, np.arange(start, start + len(hashes))
+            start += len(hashes)
+            partition = (hashes >> np.uint64(64 - bits)).astype(np.intp) if bits else np.zeros(len(hashes), np.intp)
+            order = np.argsort(partition, kind='stable')
+            edges = np.searchsorted(partition[order], np.arange(len(paths) + 1))
+            for i, (lo, hi) in enumerate(zip(edges[:-1], edges[1:])):
+                if hi > lo:
+                    pairs[order[lo:hi]].tofile(partitions[i])
+
+    duplicates, n_unique = [], 0
+    unique_path = os.path.join(directory, "unique_hashes.bin")
+    with open(unique_path, 'wb') as unique:
+        for path in paths:
+            pairs = np.fromfile(path, dtype=_HASHED_ROW)
+            os.remove(path)
+            pairs = pairs[np.lexsort((pairs['row'], pairs['hash']))]
+            first = np.ones(len(pairs), dtype=bool)
+            first[1:] = pairs['hash'][1:] != pairs['hash'][:-1]
+            duplicates.append(pairs['row'][~first])
+            pairs['hash'][first].tofile(unique)
+            n_unique += int(first.sum())
+
+    if index_path:
+        index = np.lib.format.open_memmap(index_path, mode='w+', dtype=np.uint64, shape=(n_unique,))
+        with open(unique_path, 'rb') as unique:
+            for start in range(0, n_unique, chunksize):
+                block = np.fromfile(unique, dtype=np.uint64, count=chunksize)
+                index[start:start + len(block)] = block
+        index.flush()
+        del index
+    os.remove(unique_path)
+    return np.sort(np.concatenate(duplicates))
+
+
+class Validator:
+    """
+    Runs every schema check over a dataframe, or a stream of chunks, in one pass.
+
+    Example:
+        validator = Validator(HOUSING_SCHEMA)
+        for chunk in chunks:
+            keep = validator.update(chunk)
+        print("\\n".join(validator.report.summary()))
+    """
+
+    def __init__(self, schema=HOUSING_SCHEMA, deduplicate=True):
+        self.schema = schema
+        self.deduplicate = deduplicate
+        self.report = ValidationReport(schema=schema)
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    def update(self, df):
+        """
+        Folds one chunk into the report.
+
+        Parameters:
+            df (pd.DataFrame): The next chunk of data.
+
+        Returns:
+            np.ndarray: Boolean mask that is False for rows duplicating an
+            earlier row in this or any previous chunk. With
+            `deduplicate=False` every row is kept and duplicates are left to
+            the caller (see `find_duplicates`), as the seen hashes grow with
+            the input.
+        """
+        report, schema = self.report, self.schema
+        report.n_rows += len(df)
+        report.missing_columns |= set(schema.columns) - set(df.columns)
+        report.extra_columns |= set(df.columns) - set(schema.columns)
+
+        na = df.isna()
+        report.empty_rows += int(na.all(axis=1).sum())
+        for col, count in na.sum().items():
+            report.missing_counts[col] = report.missing_counts.get(col, 0) + int(count)
+
+        for col, dtype in df.dtypes.items():
+            if col in schema.dtypes:
+                report.dtypes_seen.setdefault(col, set()).add(str(dtype))
+
+        if self.deduplicate:
+            keep, self._seen = first_seen(row_hashes(df), self._seen)
+            report.duplicate_rows += int((~keep).sum())
+        else:
+            keep = np.ones(len(df), dtype=bool)
+
+        for col, expected in schema.levels.items():
+            if col in df.columns:
+                unexpected = set(pd.unique(df[col].dropna())) - expected
+                if unexpected:
+                    report.unexpected_levels.setdefault(col, set()).update(unexpected)
+
+        return keep
+
+
+@instrumented(rows_from='df')
+def validate(df, schema=HOUSING_SCHEMA):
+    """
+    Validates an in-memory dataframe against a schema.
+
+    Parameters:
+        df (pd.DataFrame): The data to validate.
+        schema (Schema): The expected columns, dtypes and levels.
+
+    Returns:
+        tuple: The ValidationReport and the boolean mask of non-duplicate rows.
+    """
+    validator = Validator(schema)
+    keep = validator.update(df)
+    return validator.report, keep
@@ -0,0 +1,32 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.batch_scoring import score_file
+from src.prediction import make_predictions
+
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '..', 'results', 'models', 'ridge_pipeline.pickle')
+
+
+def test_score_file_keeps_input_order(tmp_path):
+    houses = pd.DataFrame({
+        'parcel_id': range(10),
+        'meters': [174.23, 132.76, 90.82, 68.54, 221.30, 145.03, 102.96, 164.28, 142.79, 115.94],
+        'garage': ['Y', 'Y', 'Y', 'N', 'Y', 'N', 'N', 'Y', 'N', 'Y'],
+        'firepl': ['Y', 'N', 'N', 'N', 'Y', 'N', 'N', 'Y', 'Y', 'N'],
+        'bsmt': ['Y', 'Y', 'N', 'N', 'Y', 'N', 'Y', 'N', 'Y', 'Y'],
+        'bdevl': ['N', 'Y', 'Y', 'N', 'Y', 'Y', 'Y', 'N', 'N', 'Y']
+    })
+    input_path = os.path.join(tmp_path, "houses.csv")
+    output_file = os.path.join(tmp_path, "out", "predictions.csv")
+    houses.to_csv(input_path, index=False)
+
+    stats = score_file(MODEL_FILE, input_path, output_file, chunksize=3, n_jobs=2)
+    result_df = pd.read_csv(output_file)
+    expected = make_predictions(MODEL_FILE, houses)
+
+    assert stats['rows'] == 10
+    assert result_df['parcel_id'].tolist() == list(range(10)), "Predictions should be written in input order."
+    assert result_df['Predicted_Values'].tolist() == expected['Predicted_Values'].tolist()
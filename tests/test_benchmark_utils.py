@@ -0,0 +1,40 @@
+import os
+import sys
+import copy
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.benchmark_utils import FIT_DATA, compare_to_baseline, run_benchmarks
+from src.instrumentation import configure_metrics, read_metrics
+from src.io_utils import read_processed
+from src.synthetic_data import fit_synthetic_model, generate_frame
+from src.validation_utils import validate
+
+
+def test_benchmarks_run_and_regressions_are_flagged(tmp_path, monkeypatch):
+    model = fit_synthetic_model(read_processed(FIT_DATA))
+    df = generate_frame(model, 1000, np.random.default_rng(1))
+    report, keep = validate(df)
+    assert report.passed, "Generated data should match the housing schema."
+
+    monkeypatch.delenv("HOUSING_METRICS_FILE", raising=False)
+    metrics_file = os.path.join(tmp_path, "stages.jsonl")
+    configure_metrics(metrics_file)
+    try:
+        results = run_benchmarks(sizes=(500,), names=['drop_outliers', 'make_predictions'], repeat=1, model=model)
+    finally:
+        configure_metrics(None)
+    assert not os.path.exists(metrics_file) or 'drop_outliers' not in read_metrics(metrics_file)['name'].tolist(), \
+        "The timed stages shouldn't write metrics."
+    assert [(r['benchmark'], r['rows']) for r in results['results']] == [('drop_outliers', 500), ('make_predictions', 500)]
+    assert all(r['median_seconds'] > 0 and r['peak_mb'] > 0 for r in results['results'])
+
+    baseline = copy.deepcopy(results)
+    baseline['results'][0]['median_seconds'] /= 2
+    baseline['results'][1]['median_seconds'] *= 2
+    comparison = compare_to_baseline(results, baseline, tolerance=0.2)
+    assert comparison['status'].tolist() == ['regression', 'improvement']
+
+    comparison = compare_to_baseline(results, {'results': baseline['results'][:1]})
+    assert comparison['status'].tolist()[1] == 'new'
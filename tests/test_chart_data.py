@@ -0,0 +1,34 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.chart_data import category_counts, correlation_table, histogram_table, kde_table, nice_bin_step
+
+
+def test_aggregates_match_raw_data():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.normal(500_000, 100_000, 5000), [5e7]])
+    df = pd.DataFrame({'garage': rng.choice(['Y', 'N'], len(values)), 'assess_2022': values})
+
+    counts = category_counts(df, 'garage')
+    assert counts.set_index('garage')['count'].to_dict() == df['garage'].value_counts().to_dict()
+
+    # Vega-Lite picks 50,000-wide bins for maxbins=2000 over this range
+    assert nice_bin_step(values.min(), values.max(), 2000) == 50_000
+    histogram = histogram_table(values, maxbins=2000)
+    assert histogram['count'].sum() == len(values)
+    assert len(histogram_table(values, maxbins=2000, domain=(0, 2_000_000))) <= 40
+
+    # The binned KDE agrees with the exact sum over rows
+    bandwidth = 20_000
+    kde = kde_table(values[:-1], steps=101, bandwidth=bandwidth)
+    exact = np.exp(-0.5 * ((kde['value'].to_numpy()[:, None] - values[None, :-1]) / bandwidth) ** 2).sum(axis=1) \
+        / (bandwidth * np.sqrt(2 * np.pi))
+    assert np.allclose(kde['density'], exact, rtol=1e-2, atol=exact.max() * 1e-3)
+
+    correlations = correlation_table(df.assign(garage=(df['garage'] == 'Y').astype(int)), methods=('pearson',))
+    assert len(correlations) == 1
+    assert np.isclose(correlations['value'].iloc[0], np.corrcoef(df['garage'] == 'Y', values)[0, 1])
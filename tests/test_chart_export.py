@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import altair as alt
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.chart_export import export_charts
+
+
+def test_parallel_export_matches_chart_save(tmp_path):
+    df = pd.DataFrame({'meters': [90.0, 120.5, 174.2], 'assess_2022': [300000, 420000, 537000]})
+    charts = {
+        os.path.join(tmp_path, "points.png"): alt.Chart(df).mark_point().encode(x='meters', y='assess_2022'),
+        os.path.join(tmp_path, "figures", "bars.png"): alt.Chart(df).mark_bar().encode(x='meters', y='assess_2022'),
+    }
+
+    timings = export_charts(charts, scale_factor=2.0, n_jobs=2)
+
+    for path, chart in charts.items():
+        assert timings[path] > 0, "Every chart should report its render time."
+        expected = os.path.join(tmp_path, "expected.png")
+        chart.save(expected, scale_factor=2.0)
+        with open(path, 'rb') as exported, open(expected, 'rb') as saved:
+            assert exported.read() == saved.read(), "Exported PNGs should match Chart.save."
+
+
+def test_export_has_no_row_limit_and_workers_skip_altair(tmp_path):
+    df = pd.DataFrame({'meters': range(6000), 'assess_2022': range(6000)})
+    path = os.path.join(tmp_path, "points.svg")
+
+    export_charts({path: alt.Chart(df).mark_point().encode(x='meters', y='assess_2022')}, n_jobs=1)
+    assert os.path.getsize(path) > 0, "Charts over Altair's 5000-row limit should export, as with Chart.save."
+
+    # What a spawned worker imports to run render_spec
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    check = "import sys; import src.chart_export; print('altair' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", check], cwd=root, capture_output=True, text=True).stdout.strip() == "False"
@@ -9,7 +9,9 @@ import numpy as np
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.clean_data_util import drop_outliers
+from src.clean_data_util import drop_outliers, clean_in_chunks, ingest_incremental
+from src.io_utils import read_processed
+from src.dtype_utils import to_compact
 
 # Load csv should use pandas to read a CSV from a secure url then save the raw csv to a given path
 
@@ -44,4 +46,111 @@ def test_drop_outliers():
     df = drop_outliers(df_outliers, 2)
 
     assert isinstance(df, pd.DataFrame), "drop_outliers did not return a pandas dataframe"
-    assert not df.equals(df_outliers), "Outliers are not being dropped"
\ No newline at end of file
+    assert not df.equals(df_outliers), "Outliers are not being dropped"
+
+def test_clean_in_chunks(tmp_path):
+
+    # Build a raw-like file with an extra column and duplicates spread across chunks
+    clean_df = pd.read_csv(os.path.join(os.path.dirname(__file__), '..', 'data', 'processed', 'Clean_2023_Property_Tax_Assessment.csv')).head(2000)
+    raw_df = pd.concat([clean_df, clean_df.head(50)], ignore_index=True)
+    raw_df['roll_number'] = np.arange(len(raw_df))
+    raw_path = os.path.join(tmp_path, "raw.csv")
+    raw_df.to_csv(raw_path, index=False)
+
+    clean_in_chunks(raw_path, 123, str(tmp_path), chunksize=300, threshold=5000)
+
+    cleaned = pd.read_csv(os.path.join(tmp_path, "Clean_2023_Property_Tax_Assessment.csv"))
+    train = pd.read_csv(os.path.join(tmp_path, "train.csv"))
+    test = pd.read_csv(os.path.join(tmp_path, "test.csv"))
+
+    assert list(cleaned.columns) == ['meters', 'garage', 'firepl', 'bsmt', 'bdevl', 'assess_2022'], "Only the expected columns should be kept"
+    assert cleaned.equals(clean_df.drop_duplicates().reset_index(drop=True)), "Duplicates across chunks are not being dropped"
+    assert len(train) + len(test) == len(cleaned), "Train and test should partition the cleaned data"
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".clean_")], "Spilled files should be removed"
+
+
+def test_drop_outliers_combined_mask():
+
+    # Each column has one extreme value, in different rows
+    df = pd.DataFrame({
+        'meters': np.concatenate([np.linspace(100, 200, 50), [5000.0], np.linspace(100, 200, 9)]),
+        'assess_2022': np.concatenate([np.arange(300000, 360000, 1000)[:59], [9000000]]).astype('int64'),
+        'garage': ['Y'] * 60
+    })
+
+    exact = drop_outliers(df, 0)
+    sketch = drop_outliers(df, 0, method="sketch")
+
+    assert len(exact) == 58, "Outlier rows of both columns should be dropped"
+    assert exact.equals(sketch), "The sketch should find the same bounds on small data"
+    assert list(exact.columns) == list(df.columns), "Non-numeric columns should be kept"
+    assert drop_outliers(to_compact(df, float32=True), 0).index.equals(exact.index), \
+        "Compact float32/int32 columns should be checked too"
+    assert len(drop_outliers(df.assign(roll_number=np.arange(60) ** 4), 0)) == 58, \
+        "Only the schema's numeric columns should be checked"
+
+def test_ingest_incremental_appends_only_new_rows(tmp_path):
+
+    # A full clean of part of the data builds the row hash index
+    clean_df = pd.read_csv(os.path.join(os.path.dirname(__file__), '..', 'data', 'processed', 'Clean_2023_Property_Tax_Assessment.csv'))
+    first, second = clean_df.iloc[:3000], clean_df.iloc[3000:3500]
+    raw_path = os.path.join(tmp_path, "raw.csv")
+    first.to_csv(raw_path, index=False)
+    clean_in_chunks(raw_path, 123, str(tmp_path), chunksize=1000, threshold=10)
+    clean_path = os.path.join(tmp_path, "Clean_2023_Property_Tax_Assessment.csv")
+    n_before = len(pd.read_csv(clean_path))
+
+    # A correction file repeating old rows, with new rows and an extreme value
+    new_rows = pd.concat([first.head(200), second, second.head(1).assign(meters=1e6)], ignore_index=True)
+    new_path = os.path.join(tmp_path, "corrections.csv")
+    new_rows.to_csv(new_path, index=False)
+    result = ingest_incremental(new_path, str(tmp_path), chunksize=100)
+
+    assert result['known'] == 200, "Rows already processed should be skipped."
+    assert result['outliers'] >= 1, "The stored outlier bounds should be applied to new rows."
+    assert result['appended'] + result['outliers'] == len(second) + 1, "Every new row should be appended or dropped."
+    cleaned = pd.read_csv(clean_path)
+    assert len(cleaned) == n_before + result['appended']
+    assert read_processed(clean_path).shape == cleaned.shape, "The Feather cache should be extended too."
+    assert len(pd.read_csv(os.path.join(tmp_path, "train.csv"))) + len(pd.read_csv(os.path.join(tmp_path, "test.csv"))) == len(cleaned)
+    increment = pd.read_csv(result['increment'])
+    assert pd.read_csv(os.path.join(tmp_path, "train.csv")).tail(len(increment)).reset_index(drop=True).equals(increment), \
+        "The batch's training rows should also be written on their own."
+
+    # Ingesting the same file again appends nothing
+    again = ingest_incremental(new_path, str(tmp_path))
+    assert again['appended'] == 0
+    assert again['increment'] is None, "No increment file should be written without new training rows."
+
+
+def test_interrupted_ingest_is_rolled_back(tmp_path, monkeypatch):
+    import shutil
+    import src.clean_data_util as clean_data_util
+
+    clean_df = pd.read_csv(os.path.join(os.path.dirname(__file__), '..', 'data', 'processed', 'Clean_2023_Property_Tax_Assessment.csv'))
+    raw_path = os.path.join(tmp_path, "raw.csv")
+    clean_df.iloc[:2000].to_csv(raw_path, index=False)
+    new_path = os.path.join(tmp_path, "new.csv")
+    clean_df.iloc[2000:2600].to_csv(new_path, index=False)
+
+    expected_dir, crashed_dir = os.path.join(tmp_path, "expected"), os.path.join(tmp_path, "crashed")
+    os.makedirs(expected_dir)
+    clean_in_chunks(raw_path, 123, expected_dir, chunksize=500)
+    shutil.copytree(expected_dir, crashed_dir)
+    ingest_incremental(new_path, expected_dir, chunksize=100)
+
+    # The rows are appended, then the run dies before its state is saved
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(clean_data_util, "save_ingest_state", crash)
+    with pytest.raises(KeyboardInterrupt):
+        ingest_incremental(new_path, crashed_dir, chunksize=100)
+    monkeypatch.undo()
+
+    result = ingest_incremental(new_path, crashed_dir, chunksize=100)
+    assert result['known'] == 0, "The rows of the interrupted batch should not count as already processed."
+    for name in ["Clean_2023_Property_Tax_Assessment", "train", "test"]:
+        expected_csv, crashed_csv = (os.path.join(d, f"{name}.csv") for d in (expected_dir, crashed_dir))
+        assert pd.read_csv(crashed_csv).equals(pd.read_csv(expected_csv)), "The partial batch should be rolled back."
+        assert read_processed(crashed_csv).equals(read_processed(expected_csv)), "The Feather cache should match too."
+    assert not os.path.exists(os.path.join(crashed_dir, "ingest_pending.json"))
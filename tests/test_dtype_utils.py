@@ -0,0 +1,40 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dtype_utils import memory_usage_report, to_compact
+
+
+def test_to_compact():
+    df = pd.DataFrame({
+        'meters': [150.5, 120.0, 98.2],
+        'garage': ['Y', 'N', 'Z'],
+        'bsmt': ['Y', 'N', None],
+        'assess_2022': [380000, 280000, 250000]
+    })
+
+    compact = to_compact(df)
+
+    assert compact['garage'].dtype == 'category', "Flags should be stored as categoricals."
+    assert compact['garage'].cat.categories.tolist() == ['N', 'Y'], "Categories should be the schema's levels."
+    assert compact['garage'].isna().tolist() == [False, False, True], "Unexpected levels aren't categories."
+    assert to_compact(df.head(1))['bsmt'].dtype == compact['bsmt'].dtype, "Every chunk should get the same categories."
+    assert compact['bsmt'].isna().sum() == 1, "Missing flags should stay missing."
+    assert compact['assess_2022'].dtype == 'int32'
+    assert compact['meters'].dtype == 'float64'
+    assert to_compact(df, float32=True)['meters'].dtype == 'float32'
+
+    large = to_compact(df.assign(assess_2022=[380000, 3_000_000_000, 250000]))
+    assert large['assess_2022'].dtype == 'int64', "Values beyond int32 should keep int64 rather than wrap around."
+    assert large['assess_2022'].tolist() == [380000, 3_000_000_000, 250000]
+
+
+def test_memory_usage_report():
+    df = pd.DataFrame({'garage': ['Y', 'N'] * 500, 'assess_2022': range(1000)})
+
+    report = memory_usage_report(df, to_compact(df))
+
+    assert report.loc['total', 'after_bytes'] < report.loc['total', 'before_bytes'], "Compact dtypes should use less memory."
+    assert report.loc['assess_2022', 'after_bytes'] == 4000
@@ -1,11 +1,13 @@
 import sys
 import os
+import numpy as np
 import pandas as pd
 import altair as alt
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.eda_utils import create_combined_bar_chart
+from src.chart_data import density_grid, grid_cells, stratified_sample
+from src.eda_utils import create_combined_bar_chart, create_density_scatter
 
 def test_create_combined_bar_chart():
     # Test Data
@@ -35,3 +37,26 @@ def test_create_combined_bar_chart():
     # Test the second subplot (e.g., 'firepl')
     second_chart = combined_chart.hconcat[1]
     assert second_chart.encoding.x.shorthand == 'firepl', "Second chart x-axis should be mapped to 'firepl'."
+
+
+def test_density_scatter_size_depends_on_grid_not_rows():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'meters': rng.lognormal(5, 0.3, 50_000), 'assess_2022': rng.lognormal(13, 0.3, 50_000)})
+
+    grid = density_grid(df, 'assess_2022', 'meters', bins=20)
+    assert grid['count'].sum() == len(df)
+    assert len(grid) <= 20 * 20
+
+    cells = grid_cells(df['assess_2022'], df['meters'], 20,
+                       (df['assess_2022'].min(), df['assess_2022'].max()), (df['meters'].min(), df['meters'].max()))
+    assert (np.bincount(cells, minlength=400)[:400] == np.histogram2d(
+        df['assess_2022'], df['meters'], bins=20)[0].T.ravel()).all()
+
+    sample = stratified_sample(df, cells, max_per_stratum=2)
+    assert len(sample) <= 2 * len(grid)
+    assert pd.Series(cells[df.index.isin(sample.index)]).value_counts().max() <= 2
+
+    chart = create_density_scatter(df, 'assess_2022', 'meters', "Assessment Value", "Property size", "Density", bins=20)
+    layers = chart.layer
+    assert len(layers[0].data) == len(grid), "The grid layer should hold one row per non-empty cell."
+    assert len(layers[1].data) <= 20 * 20
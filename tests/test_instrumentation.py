@@ -0,0 +1,63 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.clean_data_util import drop_outliers
+from src.instrumentation import configure_metrics, read_metrics, record_rows, step
+
+
+def test_nested_steps_are_written_as_json_lines(tmp_path, monkeypatch):
+    monkeypatch.delenv("HOUSING_METRICS_FILE", raising=False)
+    metrics_file = os.path.join(tmp_path, "metrics", "stages.jsonl")
+    configure_metrics(metrics_file)
+    df = pd.DataFrame({'meters': np.arange(10_000.0), 'assess_2022': np.arange(10_000) * 3000})
+    try:
+        with step('clean') as clean:
+            with step('allocate'):
+                block = np.ones(5_000_000)
+                record_rows(len(block))
+                del block
+            drop_outliers(df, threshold=5000)
+            clean.add_rows(len(df))
+        try:
+            with step('failing'):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+    finally:
+        configure_metrics(None)
+
+    metrics = read_metrics(metrics_file).set_index('step')
+    assert list(metrics.index) == ['clean/allocate', 'clean/drop_outliers', 'clean', 'failing'], \
+        "Children should be written before their parent, under the parent's path."
+    assert metrics.loc['clean/drop_outliers', 'rows'] == 10_000, "Decorated helpers should count the rows of their data."
+    # Peaks are reset at the start of each step, so the sibling step after the allocation doesn't see it
+    assert metrics.loc['clean/allocate', 'peak_rss_mb'] - metrics.loc['clean/drop_outliers', 'peak_rss_mb'] >= 30, \
+        "The peak should include the 40 MB allocation."
+    assert metrics.loc['clean', 'peak_rss_mb'] >= metrics.loc['clean/allocate', 'peak_rss_mb'], \
+        "A parent's peak should include its children's."
+    assert metrics.loc['clean', 'wall_seconds'] >= metrics.loc['clean/allocate', 'wall_seconds']
+    assert metrics.loc['clean', 'rows_per_second'] > 0
+    assert metrics.loc['failing', 'status'] == 'error' and metrics.loc['clean', 'status'] == 'ok'
+    assert metrics['run_id'].nunique() == 1, "Steps of one process should share the run id."
+
+
+def test_parent_peak_survives_a_child_step(tmp_path, monkeypatch):
+    monkeypatch.delenv("HOUSING_METRICS_FILE", raising=False)
+    metrics_file = os.path.join(tmp_path, "stages.jsonl")
+    configure_metrics(metrics_file)
+    try:
+        with step('parent'):
+            block = np.ones(5_000_000)
+            del block
+            with step('child'):
+                pass
+    finally:
+        configure_metrics(None)
+
+    metrics = read_metrics(metrics_file).set_index('step')
+    assert metrics.loc['parent', 'peak_rss_mb'] - metrics.loc['parent/child', 'peak_rss_mb'] >= 30, \
+        "Memory the parent freed before the child started should still count towards the parent's peak."
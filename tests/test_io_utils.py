@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dtype_utils import to_compact
+from src.io_utils import ProcessedWriter, columnar_path, iter_csv_typed, read_csv_typed, read_processed, write_processed
+
+
+def make_housing_df():
+    return pd.DataFrame({
+        'meters': [150.5, 120.0, 98.2],
+        'garage': ['Y', 'N', 'Y'],
+        'assess_2022': [380000, 280000, 250000]
+    })
+
+
+def test_write_and_read_processed(tmp_path):
+    df = make_housing_df()
+    csv_path = os.path.join(tmp_path, "train.csv")
+
+    write_processed(df, csv_path)
+
+    assert os.path.exists(csv_path), "The CSV file should always be written."
+    assert os.path.exists(columnar_path(csv_path)), "The Feather cache should be written next to the CSV file."
+    assert read_processed(csv_path).equals(to_compact(df)), "The processed data should be read back with compact dtypes."
+    assert list(read_processed(csv_path, columns=['garage']).columns) == ['garage'], "Only requested columns should be read."
+
+    # A newer CSV file takes precedence over a stale cache
+    time.sleep(0.01)
+    df.head(1).to_csv(csv_path, index=False)
+    assert len(read_processed(csv_path)) == 1, "A stale Feather cache should be ignored."
+
+
+def test_processed_writer_appends_chunks(tmp_path):
+    df = make_housing_df()
+    csv_path = os.path.join(tmp_path, "clean.csv")
+
+    with ProcessedWriter(csv_path) as writer:
+        writer.write(df.iloc[:2])
+        writer.write(df.iloc[2:])
+
+    assert pd.read_csv(csv_path).equals(df)
+    assert read_processed(csv_path).equals(to_compact(df)), "The processed data should be read back with compact dtypes."
+
+    # Neither an empty first chunk nor an all-missing column may fix null types and drop the cache
+    df = df.assign(bsmt=[None, 'Y', 'N'])
+    with ProcessedWriter(csv_path) as writer:
+        writer.write(df.iloc[:0])
+        writer.write(df.iloc[:1])
+        writer.write(df.iloc[1:])
+
+    assert os.path.exists(columnar_path(csv_path)), "The Feather cache should be kept."
+    assert read_processed(csv_path).equals(to_compact(df))
+
+
+@pytest.mark.parametrize("engine", ["pyarrow", "c"])
+def test_read_csv_typed_projects_columns_and_reports_type_errors(tmp_path, engine):
+    csv_path = os.path.join(tmp_path, "raw.csv")
+    raw = make_housing_df().assign(owner=['a', 'b', 'c'], bsmt=['Y', None, 'N'])
+    raw.to_csv(csv_path, index=False)
+
+    df = read_csv_typed(csv_path, columns=['meters', 'bsmt', 'assess_2022'], engine=engine)
+    assert list(df.columns) == ['meters', 'bsmt', 'assess_2022'], "Only the requested columns should be read, in order."
+    assert df.dtypes.astype(str).tolist() == ['float64', 'object', 'int64'], "Schema dtypes should be applied."
+    assert df['bsmt'].isna().tolist() == [False, True, False], "Missing flags should stay missing."
+
+    chunks = list(iter_csv_typed(csv_path, chunksize=2, columns=['garage', 'meters'], engine=engine))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), raw[['garage', 'meters']])
+
+    raw.assign(assess_2022=['380000', 'unknown', '250000']).to_csv(csv_path, index=False)
+    with pytest.raises(ValueError, match="Type error while parsing"):
+        read_csv_typed(csv_path, columns=['assess_2022'], engine=engine)
@@ -0,0 +1,51 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import RidgeCV
+from sklearn.pipeline import make_pipeline
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.linear_kernel import compile_pipeline
+from src.preprocess_utils import create_preprocessor
+
+
+def make_housing_df(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'meters': rng.normal(150, 40, n)})
+    for flag in ['garage', 'firepl', 'bsmt', 'bdevl']:
+        df[flag] = rng.choice(['Y', 'N'], n)
+    df['assess_2022'] = 2000 * df['meters'] + 40000 * (df['garage'] == 'Y') + rng.normal(0, 20000, n)
+    return df
+
+
+def test_compiled_kernel_matches_pipeline():
+    df = make_housing_df()
+    X, y = df.drop(columns=['assess_2022']), df['assess_2022']
+    pipeline = make_pipeline(create_preprocessor(['garage', 'firepl', 'bsmt', 'bdevl'], ['meters']), RidgeCV()).fit(X, y)
+
+    kernel = compile_pipeline(pipeline)
+
+    assert kernel.table.shape == (16,), "Four Y/N flags should give a 16-entry intercept table."
+    assert np.allclose(kernel.predict(X), pipeline.predict(X), rtol=1e-12, atol=1e-6)
+
+    bad = X.head(1).assign(garage='Z')
+    with pytest.raises(ValueError):
+        kernel.predict(bad)
+
+
+@pytest.mark.parametrize('with_mean, with_std', [(False, True), (True, False), (False, False)])
+def test_compiled_kernel_respects_scaler_options(with_mean, with_std):
+    from sklearn.compose import make_column_transformer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    df = make_housing_df()
+    X, y = df.drop(columns=['assess_2022']), df['assess_2022']
+    preprocessor = make_column_transformer((OneHotEncoder(), ['garage', 'firepl', 'bsmt', 'bdevl']),
+                                           (StandardScaler(with_mean=with_mean, with_std=with_std), ['meters']))
+    pipeline = make_pipeline(preprocessor, RidgeCV()).fit(X, y)
+
+    assert np.allclose(compile_pipeline(pipeline).predict(X), pipeline.predict(X), rtol=1e-12, atol=1e-6), \
+        "Statistics the scaler fitted but doesn't apply should be ignored."
@@ -1,10 +1,16 @@
 import pytest
 import pandas as pd
 
+import gzip
+import hashlib
+import http.client
+import http.server
 import os
+import socket
 import sys
+import threading
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.load_data_util import load_csv
+from src.load_data_util import download_file, load_csv
 
 # load_csv should use pandas to read a CSV from a url then save the raw csv to a given path with a given filename
 
@@ -19,4 +25,116 @@ def test_load_csv():
     load_csv(url, write_to, filename)
     actual = pd.read_csv(os.path.join(write_to, filename))
 
-    assert actual.equals(expected), "CSV file is not being loaded properly"
\ No newline at end of file
+    assert actual.equals(expected), "CSV file is not being loaded properly"
+
+class _FileHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves `content` with an ETag, honouring Range, If-Range and If-None-Match,
+    and drops the connection after `drop_after` bytes once. With
+    `unsatisfiable`, Range requests are answered with 416.
+    """
+    content = b""
+    etag = '"v1"'
+    drop_after = None
+    unsatisfiable = False
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        start = 0
+        byte_range = self.headers.get('Range')
+        if byte_range and self.unsatisfiable:
+            self.send_response(416)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if byte_range and self.headers.get('If-Range') == self.etag:
+            start = int(byte_range.split('=')[1].rstrip('-'))
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(self.content) - 1}/{len(self.content)}")
+        else:
+            self.send_response(200)
+        body = self.content[start:]
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', self.etag)
+        self.end_headers()
+        if self.drop_after is not None:
+            type(self).drop_after, cut = None, self.drop_after
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def file_server():
+    _FileHandler.content = b"meters,garage\n" + b"".join(f"{i}.5,Y\n".encode() for i in range(50_000))
+    _FileHandler.etag, _FileHandler.drop_after, _FileHandler.requests = '"v1"', None, []
+    _FileHandler.unsatisfiable = False
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FileHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/data.csv"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_file_resumes_and_skips_unchanged_files(tmp_path, file_server):
+    path = os.path.join(tmp_path, "raw", "data.csv")
+    checksum = hashlib.sha256(_FileHandler.content).hexdigest()
+
+    # The first response is cut short, so the download resumes with a Range request
+    _FileHandler.drop_after = 100_000
+    result = download_file(file_server, path, sha256=checksum, chunk_size=4096)
+    assert result['status'] == 'resumed', "An interrupted download should be resumed."
+    assert _FileHandler.requests[-1]['Range'] == "bytes=100000-"
+    with open(path, 'rb') as f:
+        assert f.read() == _FileHandler.content, "The resumed file should match the served file."
+    assert not os.path.exists(path + ".part")
+
+    # Unchanged on the server: a conditional request, answered with 304
+    assert download_file(file_server, path)['status'] == 'not_modified'
+    assert _FileHandler.requests[-1]['If-None-Match'] == '"v1"'
+
+    # Changed on the server: downloaded again, and stored compressed if asked
+    _FileHandler.content, _FileHandler.etag = _FileHandler.content + b"1.0,N\n", '"v2"'
+    result = download_file(file_server, path, compress=True)
+    assert result['status'] == 'downloaded' and result['etag'] == '"v2"'
+    with gzip.open(path, 'rb') as f:
+        assert f.read() == _FileHandler.content, "The compressed file should hold the served bytes."
+    assert pd.read_csv(path, compression='gzip').shape == (50_001, 2)
+
+    # Unchanged on the server, but asked for the other format: not answered from the stored file
+    result = download_file(file_server, path)
+    assert result['status'] == 'downloaded' and 'If-None-Match' not in _FileHandler.requests[-1]
+    with open(path, 'rb') as f:
+        assert f.read() == _FileHandler.content, "The file should be stored uncompressed as asked."
+    assert download_file(file_server, path)['status'] == 'not_modified'
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        download_file(file_server, os.path.join(tmp_path, "other.csv"), sha256=checksum)
+
+
+def test_download_file_restarts_on_416_without_using_a_retry(tmp_path, file_server):
+    path = os.path.join(tmp_path, "data.csv")
+
+    # A download cut short with no retries left leaves a partial file behind
+    _FileHandler.drop_after = 100_000
+    with pytest.raises(http.client.IncompleteRead):
+        download_file(file_server, path, retries=0, chunk_size=4096)
+    assert os.path.exists(path + ".part")
+
+    # The server refuses the range: the download starts over even with no retries
+    _FileHandler.unsatisfiable = True
+    result = download_file(file_server, path, retries=0)
+    assert result['status'] == 'downloaded'
+    with open(path, 'rb') as f:
+        assert f.read() == _FileHandler.content
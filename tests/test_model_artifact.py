@@ -0,0 +1,48 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model_artifact import load_artifact, save_artifact
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MODEL_FILE = os.path.join(ROOT, 'results', 'models', 'ridge_pipeline.pickle')
+
+HOUSES = pd.DataFrame({
+    'meters': [174.23, 132.76, 90.82, 68.54, 221.30],
+    'garage': ['Y', 'Y', 'Y', 'N', 'Y'],
+    'firepl': ['Y', 'N', 'N', 'N', 'Y'],
+    'bsmt': ['Y', 'Y', 'N', 'N', 'Y'],
+    'bdevl': ['N', 'Y', 'Y', 'N', 'Y']
+})
+
+
+def test_artifact_round_trip_matches_pipeline(tmp_path):
+    with open(MODEL_FILE, 'rb') as f:
+        pipeline = pickle.load(f)
+    path = os.path.join(tmp_path, 'ridge_pipeline.json')
+
+    artifact = save_artifact(pipeline, path)
+    model = load_artifact(path)
+
+    assert artifact['model']['alpha'] == pipeline[-1].alpha_
+    assert np.allclose(model.predict(HOUSES), pipeline.predict(HOUSES), rtol=1e-12)
+
+    # The loader must not need sklearn
+    code = ("import sys; from src.prediction import Predictor; "
+            f"Predictor({path!r}).predict({HOUSES.iloc[0].to_dict()!r}); "
+            "print('sklearn' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+    artifact['schema_version'] = 99
+    with open(path, 'w') as f:
+        json.dump(artifact, f)
+    with pytest.raises(ValueError):
+        load_artifact(path)
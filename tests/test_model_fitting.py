@@ -5,6 +5,7 @@ import sys
 import pandas as pd
 import pickle
 import tempfile
+import pytest
 from sklearn.linear_model import Ridge
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import make_pipeline
@@ -12,7 +13,7 @@ from sklearn.preprocessing import StandardScaler
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.model_fitting_util import perform_cross_validation_and_save
+from src.model_fitting_util import perform_cross_validation_and_save, cross_validate_models
 
 def test_perform_cross_validation_and_save():
     """
@@ -41,4 +42,116 @@ def test_perform_cross_validation_and_save():
 
         # Verify contents of the results file
         saved_results = pd.read_csv(results_path, index_col=0)
-        assert not saved_results.empty, "Cross-validation results file is empty."
\ No newline at end of file
+        assert not saved_results.empty, "Cross-validation results file is empty."
+
+
+def test_cross_validate_models_matches_cross_validate():
+    """
+    Tests that `cross_validate_models` scores every model on the same folds as `cross_validate`.
+    """
+    from sklearn.datasets import make_regression
+    from sklearn.dummy import DummyRegressor
+    from sklearn.model_selection import cross_validate
+
+    X, y = make_regression(n_samples=100, n_features=5, noise=5, random_state=42)
+
+    results = cross_validate_models(
+        {"ridge": Ridge(), "dummy": DummyRegressor()}, StandardScaler(), X, y, cv=5, n_jobs=2
+    )
+    expected = pd.DataFrame(
+        cross_validate(make_pipeline(StandardScaler(), Ridge()), X, y, cv=5, return_train_score=True)
+    ).agg(['mean', 'std']).round(3).T
+
+    assert set(results) == {"ridge", "dummy"}, "Every model should have results."
+    assert list(results["ridge"].index) == list(expected.index), "Results should have the cross_validate layout."
+    assert results["ridge"].loc[["test_score", "train_score"]].equals(expected.loc[["test_score", "train_score"]])
+
+
+def test_fit_ridge_out_of_core_matches_ridgecv():
+    """
+    Tests that the streamed Ridge trainer reproduces RidgeCV's alpha and coefficients.
+    """
+    import numpy as np
+    from sklearn.compose import make_column_transformer
+    from sklearn.linear_model import RidgeCV
+    from sklearn.preprocessing import OneHotEncoder
+    from src.model_fitting_util import RidgeStatistics, fit_ridge_out_of_core
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'meters': rng.normal(150, 40, 500),
+        'garage': rng.choice(['Y', 'N'], 500),
+    })
+    df['assess_2022'] = 2000 * df['meters'] + 50000 * (df['garage'] == 'Y') + rng.normal(0, 20000, 500)
+    X, y = df.drop(columns=['assess_2022']), df['assess_2022']
+
+    preprocessor = make_column_transformer((OneHotEncoder(), ['garage']), (StandardScaler(), ['meters'])).fit(X)
+    alphas = (1.0, 100.0, 1000.0)
+    expected = make_pipeline(preprocessor, RidgeCV(alphas=alphas)).fit(X, y)
+
+    pipeline = fit_ridge_out_of_core(preprocessor, lambda: (df.iloc[i:i + 64] for i in range(0, len(df), 64)), alphas=alphas)
+
+    assert pipeline[-1].alpha_ == expected[-1].alpha_, "Leave-one-out should pick the same alpha as RidgeCV."
+    assert np.allclose(pipeline[-1].coef_, expected[-1].coef_)
+    assert np.allclose(pipeline.predict(X), expected.predict(X))
+
+    with pytest.raises(ValueError, match="no training rows"):
+        fit_ridge_out_of_core(preprocessor, lambda: iter([]), alphas=alphas)
+    with pytest.raises(ValueError, match="no training rows"):
+        fit_ridge_out_of_core(preprocessor, lambda: iter([df.iloc[:0]]), alphas=alphas)
+
+    # Statistics gathered separately merge into the statistics of the whole
+    design = preprocessor.transform(X)
+    left = RidgeStatistics(design.shape[1]).update(design[:200], y[:200])
+    right = RidgeStatistics(design.shape[1]).update(design[200:], y[200:])
+    whole = RidgeStatistics(design.shape[1]).update(design, y)
+    assert np.allclose(left.merge(right).comoment, whole.comoment)
+
+
+def test_update_saved_model_matches_refit(tmp_path):
+    """
+    Tests that an online update equals a refit on the same preprocessor and bumps the saved model's version.
+    """
+    import json
+    import numpy as np
+    from sklearn.compose import make_column_transformer
+    from sklearn.linear_model import RidgeCV
+    from sklearn.preprocessing import OneHotEncoder
+    from src.model_fitting_util import ridge_statistics
+    from src.online_update import save_model, update_saved_model
+
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'meters': rng.normal(150, 40, 900),
+        'garage': rng.choice(['Y', 'N'], 900),
+    })
+    df['assess_2022'] = 2000 * df['meters'] + 50000 * (df['garage'] == 'Y') + rng.normal(0, 20000, 900)
+    old, new, holdout = df.iloc[:500], df.iloc[500:700], df.iloc[700:]
+
+    preprocessor = make_column_transformer((OneHotEncoder(), ['garage']), (StandardScaler(), ['meters']))
+    pipeline = make_pipeline(preprocessor, RidgeCV(alphas=(1.0, 10.0, 100.0)))
+    pipeline.fit(old.drop(columns=['assess_2022']), old['assess_2022'])
+    save_model(pipeline, ridge_statistics(pipeline[:-1], old), str(tmp_path))
+
+    # An empty increment (e.g. from re-ingesting a known file) leaves the model as it is
+    unchanged = update_saved_model(str(tmp_path), new.iloc[:0])
+    assert unchanged['model_version'] == 1 and unchanged['total_rows'] == 500
+    assert not os.path.exists(os.path.join(tmp_path, "versions")), "An empty update should not archive a version."
+
+    summary = update_saved_model(str(tmp_path), new, train_data=pd.concat([old, new]), holdout=holdout)
+
+    with open(os.path.join(tmp_path, "ridge_pipeline.pickle"), 'rb') as f:
+        updated = pickle.load(f)
+    both = pd.concat([old, new])
+    design = pipeline[:-1].transform(both.drop(columns=['assess_2022']))
+    expected = Ridge(alpha=pipeline[-1].alpha_).fit(design, both['assess_2022'])
+    assert np.allclose(updated[-1].coef_, expected.coef_) and np.isclose(updated[-1].intercept_, expected.intercept_), \
+        "The update should equal a Ridge refit on the same preprocessed features."
+
+    with open(os.path.join(tmp_path, "ridge_pipeline.json")) as f:
+        assert json.load(f)['model_version'] == summary['model_version'] == 2
+    assert os.path.exists(os.path.join(tmp_path, "versions", "ridge_pipeline.v1.pickle"))
+    assert summary['total_rows'] == 700
+    assert abs(summary['holdout_r2_online'] - summary['holdout_r2_refit']) < 0.01
+    assert summary['prediction_gap_relative'] < 0.01
+    assert len(pd.read_csv(os.path.join(tmp_path, "model_updates.csv"))) == 1
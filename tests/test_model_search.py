@@ -0,0 +1,69 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model_search import SEARCH_SPACE, halving_schedule, search_candidates, successive_halving_search
+
+
+def test_halving_schedule():
+    """
+    Tests that the rows per round grow by the factor and end with every row.
+    """
+    assert halving_schedule(30, 27000, factor=3, min_rows=100) == [333, 1000, 3000, 9000, 27000]
+    assert halving_schedule(30, 1000, factor=3, min_rows=200) == [200, 333, 1000], "Rounds below min_rows should be merged."
+    assert halving_schedule(1, 500) == [500]
+
+
+def test_successive_halving_search(tmp_path):
+    """
+    Tests that the search narrows down the candidates and ranks a real model above the dummy baseline.
+    """
+    rng = np.random.default_rng(0)
+    n = 1500
+    df = pd.DataFrame({
+        'meters': rng.normal(150, 40, n),
+        'garage': rng.choice(['Y', 'N'], n),
+        'firepl': rng.choice(['Y', 'N'], n),
+    })
+    df['assess_2022'] = 2000 * df['meters'] + 50000 * (df['garage'] == 'Y') + rng.normal(0, 20000, n)
+
+    candidates = search_candidates(models=['dummy', 'ridge', 'knn'])
+    assert len(candidates) == 1 + 6 + 8
+
+    with pytest.warns(RuntimeWarning, match="n_neighbors"):
+        leaderboard, history = successive_halving_search(df, ['garage', 'firepl'], ['meters'], candidates,
+                                                         min_rows=150, cv=3, n_jobs=2, temp_folder=str(tmp_path))
+
+    rounds = history.groupby('round').agg(candidates=('model', 'size'), n_rows=('n_rows', 'first'))
+    assert rounds['candidates'].is_monotonic_decreasing and rounds['candidates'].iloc[0] == len(candidates)
+    assert rounds['n_rows'].is_monotonic_increasing and rounds['n_rows'].iloc[-1] == n
+    assert len(leaderboard) == len(candidates) and list(leaderboard['rank']) == list(range(1, len(candidates) + 1))
+    assert leaderboard.iloc[0]['model'] == 'ridge' and leaderboard.iloc[0]['n_rows'] == n
+    failed = leaderboard['mean_test_score'].isna()
+    assert set(leaderboard[failed]['params']) == {'{"n_neighbors": 150, "weights": "distance"}', '{"n_neighbors": 150, "weights": "uniform"}'}, \
+        "Candidates that fail to fit (150 neighbours of 100 rows) should score NaN."
+    assert failed.iloc[-2:].all(), "Candidates that fail to fit should rank last."
+    assert leaderboard[failed]['error'].str.contains("n_neighbors").all(), "The error should be recorded."
+    assert leaderboard[~failed]['error'].isna().all()
+    assert leaderboard[~failed].iloc[-1]['model'] == 'dummy', "The dummy baseline should be the worst fitted model."
+    assert os.listdir(tmp_path) == [], "The shared data files should be removed."
+
+
+def test_candidate_failing_on_one_fold_scores_nan(tmp_path):
+    """
+    Tests that a candidate failing on a single fold is not ranked by its other folds.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'meters': rng.normal(150, 40, 151), 'garage': rng.choice(['Y', 'N'], 151)})
+    df['assess_2022'] = 2000 * df['meters'] + rng.normal(0, 20000, 151)
+
+    # With 3 folds of 151 rows, the first fold trains on 100 rows and the others on 101
+    space = {'knn': (SEARCH_SPACE['knn'][0], {'n_neighbors': [101]})}
+    with pytest.warns(RuntimeWarning, match="1 of 3 folds"):
+        leaderboard, _ = successive_halving_search(df, ['garage'], ['meters'], search_candidates(space),
+                                                   min_rows=10, cv=3, n_jobs=1, temp_folder=str(tmp_path))
+    assert np.isnan(leaderboard.loc[0, 'mean_test_score'])
@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline_runner import Stage, code_files, run_pipeline, stage_fingerprint
+
+
+def make_stages(scale):
+    copy = "open('out.txt', 'w').write(str(int(open('in.txt').read()) * {scale}))"
+    return [Stage(name="double",
+                  command=[sys.executable, "-c", copy.format(scale=scale)],
+                  inputs=["in.txt"],
+                  outputs=["out.txt"],
+                  params={"scale": scale})]
+
+
+def test_run_pipeline_skips_cached_stages(tmp_path):
+    work = str(tmp_path)
+    cache = os.path.join(work, "cache")
+    with open(os.path.join(work, "in.txt"), "w") as f:
+        f.write("21")
+
+    assert run_pipeline(make_stages(2), cache, cwd=work) == {"double": "ran"}
+    assert run_pipeline(make_stages(2), cache, cwd=work) == {"double": "cached"}, "Unchanged stages should be skipped."
+
+    # Cached outputs are restored when missing
+    os.remove(os.path.join(work, "out.txt"))
+    assert run_pipeline(make_stages(2), cache, cwd=work) == {"double": "cached"}
+    assert open(os.path.join(work, "out.txt")).read() == "42"
+
+    # Changing a parameter or an input invalidates the stage
+    assert run_pipeline(make_stages(3), cache, cwd=work) == {"double": "ran"}
+    with open(os.path.join(work, "in.txt"), "w") as f:
+        f.write("1")
+    assert run_pipeline(make_stages(3), cache, cwd=work) == {"double": "ran"}
+    assert run_pipeline(make_stages(3), cache, cwd=work, force={"double"}) == {"double": "ran"}
+
+    stages = make_stages(3)
+    stages[0].always_run = True
+    assert run_pipeline(stages, cache, cwd=work) == {"double": "ran"}, "Stages marked always_run should never be skipped."
+
+
+def test_fingerprint_follows_src_imports(tmp_path):
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    files = code_files([os.path.join(root, "scripts", "clean_data.py")], root)
+
+    assert os.path.join(root, "src", "clean_data_util.py") in files
+    assert os.path.join(root, "src", "validation_utils.py") in files, "Imports should be followed recursively."
+
+    script = tmp_path / "stage.py"
+    script.write_text("from src import io_utils\nfrom src.online_update import model_paths\n")
+    files = code_files([str(script)], root)
+    assert os.path.join(root, "src", "io_utils.py") in files, "`from src import x` should count x as a dependency."
+    assert os.path.join(root, "src", "online_update.py") in files
+
+    stage = Stage(name="clean", command=["python"], code=["scripts/clean_data.py"])
+    assert stage_fingerprint(stage, root) == stage_fingerprint(stage, root)
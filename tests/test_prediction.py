@@ -1,7 +1,13 @@
+import os
+import pickle
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
+import numpy as np
 import pandas as pd
-from src.prediction import make_predictions
+from src import prediction
+from src.prediction import Predictor, make_predictions
+from src.instrumentation import configure_metrics, read_metrics
 
 class TestMakePredictions(unittest.TestCase):
 
@@ -37,5 +43,65 @@ class TestMakePredictions(unittest.TestCase):
         self.assertEqual(result_df['Predicted_Values'].iloc[0], 100000, "First prediction should be 100000")
         self.assertEqual(result_df['Predicted_Values'].iloc[1], 200000, "Second prediction should be 200000")
 
+
+class FixedModel:
+    """A picklable stand-in model that predicts a constant per row."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, X):
+        return np.full(len(X), self.value)
+
+
+class TestPredictor(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_file = os.path.join(self.temp_dir.name, 'model.pickle')
+        with open(self.model_file, 'wb') as f:
+            pickle.dump(FixedModel(1.0), f)
+
+    def tearDown(self):
+        prediction._MODEL_CACHE.clear()
+        self.temp_dir.cleanup()
+
+    def test_model_is_loaded_once(self):
+        first = Predictor(self.model_file)
+        with patch('pickle.load') as mock_load:
+            second = Predictor(self.model_file)
+        mock_load.assert_not_called()
+        self.assertIs(first.pipeline, second.pipeline, "The cached model should be reused")
+
+        # A rewritten model file is picked up
+        with open(self.model_file, 'wb') as f:
+            pickle.dump(FixedModel(2.0), f)
+        os.utime(self.model_file, (0, 0))
+        self.assertEqual(first.refresh().predict({'meters': 100.0})[0], 2.0)
+        self.assertEqual(len(prediction._MODEL_CACHE), 1, "Stale versions should be evicted")
+
+    def test_accepts_dicts_frames_and_arrays(self):
+        predictor = Predictor(self.model_file)
+        house = {'meters': 174.23, 'garage': 'Y', 'firepl': 'Y', 'bsmt': 'Y', 'bdevl': 'N'}
+
+        self.assertEqual(len(predictor.predict(house)), 1)
+        self.assertEqual(len(predictor.predict(pd.DataFrame([house, house]))), 2)
+        self.assertEqual(len(predictor.predict(np.array([list(house.values())] * 3, dtype=object))), 3)
+
+        frame = pd.DataFrame([house])
+        result_df = make_predictions(self.model_file, frame)
+        self.assertNotIn('Predicted_Values', frame.columns, "The caller's DataFrame should not be modified")
+        self.assertIn('Predicted_Values', result_df.columns)
+
+        metrics_file = os.path.join(self.temp_dir.name, 'stages.jsonl')
+        with patch.dict(os.environ, {'HOUSING_METRICS_FILE': metrics_file}):
+            configure_metrics()
+        try:
+            make_predictions(self.model_file, {name: [value] * 10 for name, value in house.items()})
+        finally:
+            configure_metrics(None)
+        self.assertEqual(read_metrics(metrics_file)['rows'].tolist(), [10], "A dict of columns should count its properties")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,33 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.quantile_sketch import QuantileSketch
+
+
+def test_sketch_quantiles_are_close():
+    rng = np.random.default_rng(42)
+    values = rng.lognormal(mean=12, sigma=0.5, size=200_000)
+
+    sketch = QuantileSketch(k=512, seed=0)
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+
+    estimates = sketch.quantile([0.25, 0.5, 0.75])
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+
+    assert sketch.n == len(values)
+    assert np.allclose(ranks, [0.25, 0.5, 0.75], atol=0.01), "Estimated quantiles should be within 1% rank error."
+    assert sum(len(level) for level in sketch.levels) < 5 * 512, "The sketch should stay small."
+
+
+def test_sketch_merge_and_count_outside():
+    left = QuantileSketch(k=64, seed=0).update(np.arange(1000))
+    right = QuantileSketch(k=64, seed=1).update(np.append(np.arange(1000, 2000), np.nan))
+
+    merged = left.merge(right)
+
+    assert merged.n == 2000, "NaNs should be ignored and counts should add up."
+    assert abs(merged.count_outside(100, 1899) - 200) <= 40
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.prediction import Predictor, make_predictions
+from src.scoring_server import ScoringServer, http_request
+
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '..', 'results', 'models', 'ridge_pipeline.pickle')
+
+HOUSES = [
+    {'meters': 174.23, 'garage': 'Y', 'firepl': 'Y', 'bsmt': 'Y', 'bdevl': 'N'},
+    {'meters': 132.76, 'garage': 'Y', 'firepl': 'N', 'bsmt': 'Y', 'bdevl': 'Y'},
+    {'meters': 68.54, 'garage': 'N', 'firepl': 'N', 'bsmt': 'N', 'bdevl': 'N'},
+] * 10
+
+
+async def exercise_server():
+    server = ScoringServer(Predictor(MODEL_FILE), max_batch_size=16, max_wait_ms=20)
+    listener = await server.start("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+
+    async def post(house):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        response = await http_request(reader, writer, 'POST', '/predict', house)
+        writer.close()
+        return response
+
+    responses = await asyncio.gather(*(post(house) for house in HOUSES))
+    bad = await post({'meters': 100.0})
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, metrics = await http_request(reader, writer, 'GET', '/metrics')
+    writer.close()
+    await server.stop(listener)
+    return responses, bad, metrics
+
+
+def test_concurrent_requests_are_batched():
+    responses, bad, metrics = asyncio.run(exercise_server())
+    expected = make_predictions(MODEL_FILE, {key: [house[key] for house in HOUSES] for key in HOUSES[0]})
+
+    assert [status for status, _ in responses] == [200] * len(HOUSES)
+    assert all(abs(body['prediction'] - value) < 0.01 for (_, body), value in zip(responses, expected['Predicted_Values']))
+    assert bad[0] == 400, "A property with missing features should be rejected."
+    assert metrics['requests'] == len(HOUSES) + 1
+    assert metrics['batches'] < len(HOUSES), "Concurrent requests should share predict calls."
+    assert metrics['latency_ms']['p50'] is not None
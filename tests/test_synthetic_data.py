@@ -0,0 +1,41 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.synthetic_data import SyntheticModel, fit_synthetic_model, generate_frame, write_synthetic_csv
+from src.validation_utils import HOUSING_SCHEMA, validate
+
+CLEAN_DATA = os.path.join(os.path.dirname(__file__), '..', 'data', 'processed', 'Clean_2023_Property_Tax_Assessment.csv')
+
+
+def test_synthetic_data_matches_the_real_data_and_injects_errors(tmp_path):
+    real = pd.read_csv(CLEAN_DATA)
+    model_file = os.path.join(tmp_path, "model.json")
+    fit_synthetic_model(real).save(model_file)
+    model = SyntheticModel.load(model_file)
+
+    synthetic = generate_frame(model, 200_000, np.random.default_rng(0))
+    assert list(synthetic.columns) == HOUSING_SCHEMA.columns, "Synthetic data should have the raw schema."
+    assert validate(synthetic, HOUSING_SCHEMA)[0].dtype_mismatches == {}, "Clean synthetic data should have the raw dtypes."
+    for column in ['meters', 'assess_2022']:
+        assert abs(synthetic[column].median() / real[column].median() - 1) < 0.02, f"Median of {column} should match."
+    premium = lambda df: df.groupby('garage')['assess_2022'].median().pct_change().iloc[-1]
+    assert abs(premium(synthetic) - premium(real)) < 0.05, "The garage premium should be kept."
+    assert abs(synthetic[['meters', 'assess_2022']].corr('spearman').iloc[0, 1]
+               - real[['meters', 'assess_2022']].corr('spearman').iloc[0, 1]) < 0.03, "Size and value should stay correlated."
+
+    path = os.path.join(tmp_path, "raw.csv")
+    written = write_synthetic_csv(model, path, 25_000, chunksize=10_000, seed=1,
+                                  duplicate_rate=0.05, nan_rate=0.01, outlier_rate=0.01)
+    raw = pd.read_csv(path)
+    assert written == len(raw) == 25_000, "Every chunk should be written."
+    report, _ = validate(raw, HOUSING_SCHEMA)
+    assert 0.04 < report.duplicate_rows / len(raw) < 0.08, "About 5% of rows should be duplicates."
+    assert all(0.005 < rate < 0.015 for rate in report.missing_rates.values()), "About 1% of each column should be missing."
+    assert (raw['assess_2022'] > 20 * real['assess_2022'].median()).sum() > 50, "Outliers should be injected."
+    write_synthetic_csv(model, path, 25_000, chunksize=10_000, seed=1,
+                        duplicate_rate=0.05, nan_rate=0.01, outlier_rate=0.01)
+    pd.testing.assert_frame_equal(pd.read_csv(path), raw, obj="Output with the same seed")
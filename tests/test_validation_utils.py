@@ -0,0 +1,64 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.validation_utils import HOUSING_SCHEMA, Validator, find_duplicates, validate
+
+
+def make_housing_df():
+    return pd.DataFrame({
+        'meters': [150.5, 120.0, 98.2, 150.5],
+        'garage': ['Y', 'N', 'Y', 'Y'],
+        'firepl': ['Y', 'N', 'N', 'Y'],
+        'bsmt': ['Y', 'Y', 'N', 'Y'],
+        'bdevl': ['N', 'Y', 'N', 'N'],
+        'assess_2022': [380000, 280000, 250000, 380000]
+    })
+
+
+def test_validate_reports_every_check():
+    df = make_housing_df()
+    df.loc[1, 'garage'] = 'Z'
+
+    report, keep = validate(df, HOUSING_SCHEMA)
+
+    assert report.n_rows == 4
+    assert report.duplicate_rows == 1, "The repeated last row should be flagged as a duplicate."
+    assert keep.tolist() == [True, True, True, False], "Only first occurrences should be kept."
+    assert report.unexpected_levels == {'garage': {'Z'}}, "Expected 'Z' to be flagged as an unexpected level."
+    assert report.dtype_mismatches == {}, "All columns have the expected dtypes."
+    assert not report.passed
+
+
+def test_validator_accumulates_over_chunks():
+    df = make_housing_df()
+    df.loc[2, 'meters'] = np.nan
+
+    validator = Validator(HOUSING_SCHEMA)
+    keeps = [validator.update(df.iloc[:2]), validator.update(df.iloc[2:])]
+    report = validator.report
+
+    assert np.concatenate(keeps).tolist() == [True, True, True, False], "Duplicates across chunks should be flagged."
+    assert report.missing_counts['meters'] == 1
+    assert report.dtype_mismatches == {}, "A missing value should not be reported as a dtype mismatch."
+    assert any("missingness" in line for line in report.summary())
+
+
+def test_find_duplicates(tmp_path):
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2 ** 63, 5000, dtype=np.uint64)
+    hashes[rng.integers(0, 5000, 400)] = hashes[rng.integers(0, 5000, 400)]
+    hash_file = os.path.join(tmp_path, "hashes.bin")
+    hashes.tofile(hash_file)
+    index_path = os.path.join(tmp_path, "index.npy")
+
+    # Small chunks spread the hashes over several partition files
+    duplicates = find_duplicates(hash_file, str(tmp_path), chunksize=600, index_path=index_path)
+
+    expected = np.flatnonzero(pd.Series(hashes).duplicated().to_numpy())
+    assert np.array_equal(duplicates, expected), "Every occurrence but the first should be a duplicate."
+    assert np.array_equal(np.load(index_path), np.unique(hashes)), "The index should hold the sorted unique hashes."
+    assert sorted(os.listdir(tmp_path)) == ["hashes.bin", "index.npy"], "Partition files should be removed."